@@ -12,6 +12,7 @@ from typing import Dict, Any
 
 from aetheriq.core.security import SecurityManager, SecurityConfig
 from aetheriq.core.analytics import AnalyticsEngine
+from aetheriq.core.backpressure import QueueFullError
 from aetheriq.core.workflow import WorkflowEngine
 from aetheriq.core.compliance import ComplianceManager, ComplianceConfig
 from aetheriq.config import get_default_config
@@ -60,6 +61,14 @@ async def validation_exception_handler(request, exc):
         content={"detail": exc.errors()}
     )
 
+@app.exception_handler(QueueFullError)
+async def queue_full_exception_handler(request, exc):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))}
+    )
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     logger.error(f"Unhandled exception: {str(exc)}")
@@ -2,7 +2,7 @@
 Configuration management for AetherIQ
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pydantic import BaseSettings
 from dataclasses import dataclass
 import os
@@ -30,7 +30,18 @@ class AnalyticsSettings(BaseSettings):
     batch_size: int = 1000
     processing_interval_seconds: int = 60
     data_retention_days: int = 90
+    minute_rollup_retention_days: int = 7  # Day rollups are kept for data_retention_days
+    hour_rollup_retention_days: int = 30
     max_processing_time_seconds: int = 300
+    ingest_method: str = "auto"  # "copy" (Postgres COPY), "insert" (multi-row INSERT) or "auto"
+    queue_size: int = 10000  # Items buffered in memory before the overflow policy applies
+    overflow_policy: str = "reject"  # "reject" (429), "spill" (to spill_path) or "sample"
+    spill_path: str = "var/analytics/spill.jsonl"
+    max_attempts: int = 5  # Failed writes of a spilled item before it is dead-lettered
+    dead_letter_path: str = "var/analytics/dead-letter.jsonl"
+    sample_rate: float = 0.1  # Fraction admitted by the sample policy once the queue is 80% full
+    consumers: int = 4  # Parallel queue consumers, each with its own DB write thread
+    batch_linger_seconds: float = 0.5
     metrics: Dict[str, Any] = {
         "workflow_execution": {
             "enabled": True,
@@ -51,6 +62,34 @@ class WorkflowSettings(BaseSettings):
     max_concurrent_workflows: int = 10
     max_task_retries: int = 3
     task_timeout_seconds: int = 300
+    dispatch_backend: str = "local"  # "local" or "postgres" (LISTEN/NOTIFY)
+    dispatch_channel: str = "workflow_pending"
+    reconcile_interval_seconds: int = 60
+    reconcile_batch_size: int = 1000
+    state_log_dir: str = "var/workflow-state"  # Intent log for write-behind state
+    state_flush_interval_seconds: float = 0.5
+    state_log_fsync: bool = False
+    execution_mode: str = "local"  # "local" or "distributed" (shared work queue)
+    work_queue_backend: str = "memory"  # "memory" (single process) or "postgres"
+    node_id: Optional[str] = None  # Defaults to hostname-pid
+    run_task_worker: bool = True  # Claim tasks from the work queue on this node
+    worker_concurrency: int = 4
+    task_lease_seconds: int = 30
+    task_heartbeat_seconds: int = 10
+    task_max_attempts: int = 3
+    resume_stale_after_seconds: int = 900  # Requeue running workflows without a heartbeat for this long
+    workflow_heartbeat_seconds: int = 60  # How often a node marks its running workflows as alive
+    task_cache_size: int = 1024  # Memoized idempotent task results; 0 disables
+    task_cache_ttl_seconds: int = 3600
+    task_cache_dir: Optional[str] = None  # Persist memoized results to this directory
+    tenant_max_concurrent_workflows: Optional[int] = None  # Per-owner cap; None for no cap
+    tenant_concurrency_limits: Dict[str, int] = {}  # Owner id -> cap override
+    tenant_weights: Dict[str, float] = {}  # Owner id -> fair share weight (default 1.0)
+    thread_pool_workers: int = 8
+    process_pool_workers: int = os.cpu_count() or 1
+    shared_memory_threshold_bytes: int = 1 << 20
+    task_pools: Dict[str, Any] = {}  # Extra named pools: {"mode", "max_workers", "max_concurrency"}
+    task_execution: Dict[str, str] = {}  # Task type -> pool name; unlisted types run inline
     default_task_handlers: Dict[str, Any] = {
         "system_check": {
             "enabled": True,
@@ -69,6 +108,8 @@ class WorkflowSettings(BaseSettings):
 class ComplianceSettings(BaseSettings):
     """Compliance configuration settings"""
     retention_period_days: int = 365
+    retention_days: int = 90  # Compliance check rows
+    audit_retention_days: int = 365  # Audit log rows
     audit_log_enabled: bool = True
     auto_remediation_enabled: bool = True
     compliance_frameworks: Dict[str, Any] = {
@@ -137,15 +178,51 @@ def load_config_from_env() -> AppConfig:
             batch_size=int(os.getenv("ANALYTICS_BATCH_SIZE", "1000")),
             processing_interval_seconds=int(os.getenv("ANALYTICS_PROCESSING_INTERVAL", "60")),
             data_retention_days=int(os.getenv("ANALYTICS_RETENTION_DAYS", "90")),
-            max_processing_time_seconds=int(os.getenv("ANALYTICS_MAX_PROCESSING_TIME", "300"))
+            minute_rollup_retention_days=int(os.getenv("ANALYTICS_MINUTE_ROLLUP_RETENTION_DAYS", "7")),
+            hour_rollup_retention_days=int(os.getenv("ANALYTICS_HOUR_ROLLUP_RETENTION_DAYS", "30")),
+            max_processing_time_seconds=int(os.getenv("ANALYTICS_MAX_PROCESSING_TIME", "300")),
+            ingest_method=os.getenv("ANALYTICS_INGEST_METHOD", "auto"),
+            queue_size=int(os.getenv("ANALYTICS_QUEUE_SIZE", "10000")),
+            overflow_policy=os.getenv("ANALYTICS_OVERFLOW_POLICY", "reject"),
+            spill_path=os.getenv("ANALYTICS_SPILL_PATH", "var/analytics/spill.jsonl"),
+            max_attempts=int(os.getenv("ANALYTICS_MAX_ATTEMPTS", "5")),
+            dead_letter_path=os.getenv("ANALYTICS_DEAD_LETTER_PATH", "var/analytics/dead-letter.jsonl"),
+            sample_rate=float(os.getenv("ANALYTICS_SAMPLE_RATE", "0.1")),
+            consumers=int(os.getenv("ANALYTICS_CONSUMERS", "4")),
+            batch_linger_seconds=float(os.getenv("ANALYTICS_BATCH_LINGER_SECONDS", "0.5"))
         ),
         workflow=WorkflowSettings(
             max_concurrent_workflows=int(os.getenv("MAX_CONCURRENT_WORKFLOWS", "10")),
             max_task_retries=int(os.getenv("MAX_TASK_RETRIES", "3")),
-            task_timeout_seconds=int(os.getenv("TASK_TIMEOUT_SECONDS", "300"))
+            task_timeout_seconds=int(os.getenv("TASK_TIMEOUT_SECONDS", "300")),
+            dispatch_backend=os.getenv("WORKFLOW_DISPATCH_BACKEND", "local"),
+            dispatch_channel=os.getenv("WORKFLOW_DISPATCH_CHANNEL", "workflow_pending"),
+            reconcile_interval_seconds=int(os.getenv("WORKFLOW_RECONCILE_INTERVAL", "60")),
+            state_log_dir=os.getenv("WORKFLOW_STATE_LOG_DIR", "var/workflow-state"),
+            state_flush_interval_seconds=float(os.getenv("WORKFLOW_STATE_FLUSH_INTERVAL_SECONDS", "0.5")),
+            state_log_fsync=os.getenv("WORKFLOW_STATE_LOG_FSYNC", "false").lower() == "true",
+            execution_mode=os.getenv("WORKFLOW_EXECUTION_MODE", "local"),
+            work_queue_backend=os.getenv("WORKFLOW_WORK_QUEUE_BACKEND", "memory"),
+            node_id=os.getenv("WORKFLOW_NODE_ID") or None,
+            run_task_worker=os.getenv("WORKFLOW_RUN_TASK_WORKER", "true").lower() == "true",
+            worker_concurrency=int(os.getenv("WORKFLOW_WORKER_CONCURRENCY", "4")),
+            task_lease_seconds=int(os.getenv("WORKFLOW_TASK_LEASE_SECONDS", "30")),
+            task_heartbeat_seconds=int(os.getenv("WORKFLOW_TASK_HEARTBEAT_SECONDS", "10")),
+            task_max_attempts=int(os.getenv("WORKFLOW_TASK_MAX_ATTEMPTS", "3")),
+            resume_stale_after_seconds=int(os.getenv("WORKFLOW_RESUME_STALE_AFTER_SECONDS", "900")),
+            workflow_heartbeat_seconds=int(os.getenv("WORKFLOW_HEARTBEAT_SECONDS", "60")),
+            task_cache_size=int(os.getenv("WORKFLOW_TASK_CACHE_SIZE", "1024")),
+            task_cache_ttl_seconds=int(os.getenv("WORKFLOW_TASK_CACHE_TTL_SECONDS", "3600")),
+            task_cache_dir=os.getenv("WORKFLOW_TASK_CACHE_DIR") or None,
+            tenant_max_concurrent_workflows=int(os.getenv("TENANT_MAX_CONCURRENT_WORKFLOWS", "0")) or None,
+            thread_pool_workers=int(os.getenv("WORKFLOW_THREAD_POOL_WORKERS", "8")),
+            process_pool_workers=int(os.getenv("WORKFLOW_PROCESS_POOL_WORKERS", str(os.cpu_count() or 1))),
+            shared_memory_threshold_bytes=int(os.getenv("WORKFLOW_SHARED_MEMORY_THRESHOLD_BYTES", str(1 << 20)))
         ),
         compliance=ComplianceSettings(
             retention_period_days=int(os.getenv("COMPLIANCE_RETENTION_DAYS", "365")),
+            retention_days=int(os.getenv("COMPLIANCE_CHECK_RETENTION_DAYS", "90")),
+            audit_retention_days=int(os.getenv("AUDIT_RETENTION_DAYS", "365")),
             audit_log_enabled=os.getenv("AUDIT_LOG_ENABLED", "true").lower() == "true",
             auto_remediation_enabled=os.getenv("AUTO_REMEDIATION_ENABLED", "true").lower() == "true"
         ),
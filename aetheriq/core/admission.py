@@ -0,0 +1,167 @@
+"""
+Tenant-fair, priority-aware admission control for workflow execution
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import time
+
+from prometheus_client import Gauge, Histogram
+
+admission_queue_depth = Gauge(
+    "workflow_admission_queue_depth",
+    "Workflows waiting for an execution slot"
+)
+
+admission_wait_seconds = Histogram(
+    "workflow_admission_wait_seconds",
+    "Time workflows spend queued before admission",
+    ["priority"],
+    buckets=[0.01, 0.05, 0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600]
+)
+
+@dataclass
+class AdmissionEntry:
+    """Workflow waiting for an execution slot"""
+    workflow_id: str
+    tenant: str
+    priority: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+class _TenantQueue:
+    """Per-tenant state: priority heap, running count and stride pass"""
+
+    def __init__(self, weight: float, limit: Optional[int]):
+        self.stride = 1.0 / weight
+        self.limit = limit
+        self.pass_value = 0.0
+        self.running = 0
+        self.heap: List[Tuple[int, int, AdmissionEntry]] = []
+
+    def eligible(self) -> bool:
+        return bool(self.heap) and (self.limit is None or self.running < self.limit)
+
+class AdmissionQueue:
+    """Weighted fair queue in front of the workflow execution slots.
+
+    Tenants are served by stride scheduling: every admission advances the
+    tenant's pass by 1/weight and the eligible tenant with the lowest pass
+    goes next, so busy tenants share slots in proportion to their weights
+    and a tenant with a deep backlog cannot starve the others. Within a
+    tenant, higher priority workflows are admitted first (FIFO among equal
+    priorities). Tenants at their concurrency cap are skipped until one of
+    their workflows finishes.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        tenant_max_concurrency: Optional[int] = None,
+        tenant_limits: Optional[Dict[str, int]] = None,
+        tenant_weights: Optional[Dict[str, float]] = None
+    ):
+        self.max_concurrency = max_concurrency
+        self.tenant_max_concurrency = tenant_max_concurrency
+        self.tenant_limits = tenant_limits or {}
+        self.tenant_weights = tenant_weights or {}
+        self.running = 0
+        self._tenants: Dict[str, _TenantQueue] = {}
+        self._queued: Dict[str, AdmissionEntry] = {}
+        self._sequence = itertools.count()
+        self._changed = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def __contains__(self, workflow_id: Any) -> bool:
+        return str(workflow_id) in self._queued
+
+    def _tenant(self, tenant: str) -> _TenantQueue:
+        state = self._tenants.get(tenant)
+        if state is None:
+            state = self._tenants[tenant] = _TenantQueue(
+                self.tenant_weights.get(tenant, 1.0),
+                self.tenant_limits.get(tenant, self.tenant_max_concurrency)
+            )
+        return state
+
+    def submit(self, entry: AdmissionEntry) -> bool:
+        """Queue a workflow; returns False if it is already queued"""
+        if entry.workflow_id in self._queued:
+            return False
+        state = self._tenant(entry.tenant)
+        if not state.heap:
+            # A tenant returning from idle starts level with the active
+            # tenants instead of cashing in credit from its idle time
+            active = [t.pass_value for t in self._tenants.values() if t.heap]
+            if active:
+                state.pass_value = max(state.pass_value, min(active))
+        heapq.heappush(state.heap, (-entry.priority, next(self._sequence), entry))
+        self._queued[entry.workflow_id] = entry
+        admission_queue_depth.set(len(self._queued))
+        self._changed.set()
+        return True
+
+    def discard(self, workflow_id: Any) -> bool:
+        """Drop a queued workflow, e.g. when it is cancelled"""
+        entry = self._queued.pop(str(workflow_id), None)
+        if entry is None:
+            return False
+        state = self._tenants[entry.tenant]
+        state.heap = [item for item in state.heap if item[2] is not entry]
+        heapq.heapify(state.heap)
+        if not state.running and not state.heap:
+            del self._tenants[entry.tenant]
+        admission_queue_depth.set(len(self._queued))
+        return True
+
+    def _pick(self) -> Optional[AdmissionEntry]:
+        if self.running >= self.max_concurrency:
+            return None
+        candidates = [state for state in self._tenants.values() if state.eligible()]
+        if not candidates:
+            return None
+        state = min(candidates, key=lambda s: s.pass_value)
+        _, _, entry = heapq.heappop(state.heap)
+        state.pass_value += state.stride
+        state.running += 1
+        self.running += 1
+        del self._queued[entry.workflow_id]
+        admission_queue_depth.set(len(self._queued))
+        admission_wait_seconds.labels(priority=str(entry.priority)).observe(
+            time.monotonic() - entry.enqueued_at
+        )
+        return entry
+
+    async def next(self) -> AdmissionEntry:
+        """Wait until a queued workflow can be admitted and take its slot"""
+        while True:
+            entry = self._pick()
+            if entry is not None:
+                return entry
+            self._changed.clear()
+            await self._changed.wait()
+
+    def release(self, tenant: str) -> None:
+        """Free the slot held by a finished (or unclaimable) workflow"""
+        state = self._tenants.get(tenant)
+        if state is not None and state.running:
+            state.running -= 1
+            self.running -= 1
+            if not state.running and not state.heap:
+                del self._tenants[tenant]
+        self._changed.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queued),
+            "running": self.running,
+            "max_concurrency": self.max_concurrency,
+            "tenants": {
+                tenant: {"queued": len(state.heap), "running": state.running}
+                for tenant, state in self._tenants.items()
+            }
+        }
@@ -6,16 +6,19 @@ Processes and analyzes enterprise data for insights and optimization
 from typing import Dict, List, Optional, Any
 import logging
 from datetime import datetime, timedelta
-import pandas as pd
-import numpy as np
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
 from sqlalchemy.orm import Session
 
-from aetheriq.db.session import get_db
+from aetheriq.core.backpressure import BoundedIngestQueue, QueueFullError
+from aetheriq.core.ingest import BulkIngestor
+from aetheriq.core.retention import RetentionManager, RetentionPolicy
+from aetheriq.core.rollups import RollupStore
+from aetheriq.db.session import SessionLocal
 from aetheriq.crud.base import CRUDBase
-from aetheriq.db.models import Analytics as AnalyticsModel
-from aetheriq.schemas.base import Analytics, AnalyticsCreate
+from aetheriq.db.models import Analytics as AnalyticsModel, AnalyticsRollup
+from aetheriq.schemas.base import Analytics
 
 @dataclass
 class AnalyticsConfig:
@@ -25,6 +28,13 @@ class AnalyticsConfig:
     metrics: List[str] = None
     thresholds: Dict[str, float] = None
 
+OUTCOME_MESSAGES = {
+    "queued": "Data queued for processing",
+    "spilled": "Data spilled to disk for processing",
+    "sampled_out": "Data dropped by load-shedding sampling",
+    "dropped": "Data dropped, processing queue is full"
+}
+
 class AnalyticsEngine:
     """Analytics engine for data processing and insights"""
 
@@ -37,7 +47,37 @@ class AnalyticsEngine:
         self.data_retention_days = config.get("data_retention_days", 90)
         self.max_processing_time = config.get("max_processing_time_seconds", 300)
         self.crud = CRUDBase[AnalyticsModel, Analytics, Analytics](AnalyticsModel)
-        self.processing_queue: asyncio.Queue = asyncio.Queue()
+        # Fine rollups are only needed for recent ranges; reports of older
+        # ranges are served from coarser buckets
+        rollup_retention_days = {
+            "minute": config.get("minute_rollup_retention_days", 7),
+            "hour": config.get("hour_rollup_retention_days", 30),
+            "day": self.data_retention_days
+        }
+        self.rollups = RollupStore(AnalyticsRollup, retention_days=rollup_retention_days)
+        self.retention = RetentionManager(SessionLocal, [
+            RetentionPolicy(AnalyticsModel.__tablename__, "timestamp", self.data_retention_days, interval="day")
+        ] + [
+            RetentionPolicy(AnalyticsRollup.__tablename__, "bucket_start", days, where={"resolution": resolution})
+            for resolution, days in rollup_retention_days.items()
+        ])
+        self.ingestor = BulkIngestor(
+            AnalyticsModel,
+            method=config.get("ingest_method", "auto"),
+            chunk_size=self.batch_size
+        )
+        self.processing_queue = BoundedIngestQueue(
+            "analytics",
+            maxsize=config.get("queue_size", 10000),
+            overflow=config.get("overflow_policy", "reject"),
+            spill_path=config.get("spill_path", "var/analytics/spill.jsonl"),
+            sample_rate=config.get("sample_rate", 0.1),
+            max_attempts=config.get("max_attempts", 5),
+            dead_letter_path=config.get("dead_letter_path", "var/analytics/dead-letter.jsonl")
+        )
+        self.consumers = config.get("consumers", 4)
+        self.batch_linger = config.get("batch_linger_seconds", 0.5)
+        self.executor: Optional[ThreadPoolExecutor] = None
         self.is_processing = False
         self.background_tasks = []
 
@@ -45,9 +85,12 @@ class AnalyticsEngine:
         """Initialize analytics engine"""
         self.logger.info("Initializing Analytics Engine")
         self.is_processing = True
-        self.background_tasks.append(
-            asyncio.create_task(self._process_queue())
-        )
+        # One DB write thread per consumer so batches are written in parallel
+        self.executor = ThreadPoolExecutor(max_workers=self.consumers, thread_name_prefix="analytics-ingest")
+        for _ in range(self.consumers):
+            self.background_tasks.append(
+                asyncio.create_task(self._process_queue())
+            )
         self.background_tasks.append(
             asyncio.create_task(self._cleanup_old_data())
         )
@@ -59,6 +102,9 @@ class AnalyticsEngine:
         for task in self.background_tasks:
             task.cancel()
         await asyncio.gather(*self.background_tasks, return_exceptions=True)
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
 
     async def process_data(
         self,
@@ -70,21 +116,23 @@ class AnalyticsEngine:
             # Validate and preprocess data
             processed_data = self._preprocess_data(data, data_type)
             
-            # Add to processing queue
-            await self.processing_queue.put({
+            # Add to processing queue; raises QueueFullError under the reject policy
+            outcome = self.processing_queue.put({
                 "data": processed_data,
                 "type": data_type,
                 "timestamp": datetime.utcnow()
             })
 
             return {
-                "status": "success",
-                "message": "Data queued for processing",
+                "status": "success" if outcome in ("queued", "spilled") else "dropped",
+                "message": OUTCOME_MESSAGES[outcome],
                 "data": {
                     "queue_size": self.processing_queue.qsize(),
                     "type": data_type
                 }
             }
+        except QueueFullError:
+            raise
         except Exception as e:
             self.logger.error(f"Error processing data: {str(e)}")
             return {
@@ -103,29 +151,10 @@ class AnalyticsEngine:
             start = datetime.fromisoformat(start_date) if start_date else datetime.utcnow() - timedelta(days=7)
             end = datetime.fromisoformat(end_date) if end_date else datetime.utcnow()
 
-            # Get data from database
-            db = next(get_db())
-            data = self.crud.get_multi(
-                db,
-                skip=0,
-                limit=self.batch_size,
-                timestamp_gte=start,
-                timestamp_lte=end
-            )
-
-            # Process data into DataFrame
-            df = pd.DataFrame([
-                {
-                    "metric_name": item.metric_name,
-                    "metric_value": item.metric_value,
-                    "timestamp": item.timestamp,
-                    **item.metadata
-                }
-                for item in data
-            ])
-
-            # Generate insights
-            insights = self._generate_insights(df)
+            # Served from the per-minute/hour/day rollups, so the cost depends
+            # on the length of the range, not on how many events it holds
+            with SessionLocal() as db:
+                report = self.rollups.report(db, start, end)
 
             return {
                 "status": "success",
@@ -134,9 +163,7 @@ class AnalyticsEngine:
                         "start": start.isoformat(),
                         "end": end.isoformat()
                     },
-                    "metrics": self._calculate_metrics(df),
-                    "insights": insights,
-                    "trends": self._analyze_trends(df)
+                    **report
                 }
             }
         except Exception as e:
@@ -200,134 +227,58 @@ class AnalyticsEngine:
             "duration": data.get("duration", 0)
         }
 
-    def _calculate_metrics(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Calculate analytics metrics"""
-        metrics = {}
-        
-        # Calculate basic statistics for numeric columns
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        for col in numeric_cols:
-            metrics[col] = {
-                "mean": df[col].mean(),
-                "median": df[col].median(),
-                "std": df[col].std(),
-                "min": df[col].min(),
-                "max": df[col].max()
-            }
-
-        # Calculate frequencies for categorical columns
-        categorical_cols = df.select_dtypes(include=['object']).columns
-        for col in categorical_cols:
-            metrics[f"{col}_distribution"] = df[col].value_counts().to_dict()
-
-        return metrics
-
-    def _generate_insights(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Generate insights from data"""
-        insights = []
-
-        # Analyze trends
-        for col in df.select_dtypes(include=[np.number]).columns:
-            trend = np.polyfit(range(len(df)), df[col].fillna(0), 1)[0]
-            if abs(trend) > 0.1:  # Significant trend threshold
-                insights.append({
-                    "type": "trend",
-                    "metric": col,
-                    "trend": "increasing" if trend > 0 else "decreasing",
-                    "magnitude": abs(trend)
-                })
-
-        # Detect anomalies
-        for col in df.select_dtypes(include=[np.number]).columns:
-            mean = df[col].mean()
-            std = df[col].std()
-            anomalies = df[col][abs(df[col] - mean) > 2 * std]
-            if len(anomalies) > 0:
-                insights.append({
-                    "type": "anomaly",
-                    "metric": col,
-                    "count": len(anomalies),
-                    "threshold": mean + 2 * std
-                })
-
-        return insights
-
-    def _analyze_trends(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Analyze trends in data"""
-        trends = {}
-
-        # Time-based trends
-        if 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df.set_index('timestamp', inplace=True)
-            
-            # Daily trends
-            daily = df.resample('D').mean()
-            trends['daily'] = daily.to_dict()
-
-            # Weekly trends
-            weekly = df.resample('W').mean()
-            trends['weekly'] = weekly.to_dict()
-
-            # Monthly trends
-            monthly = df.resample('M').mean()
-            trends['monthly'] = monthly.to_dict()
-
-        return trends
-
     async def _process_queue(self) -> None:
         """Process analytics queue"""
         while self.is_processing:
             try:
-                # Process items in batches
-                batch = []
-                try:
-                    while len(batch) < self.batch_size:
-                        item = await asyncio.wait_for(
-                            self.processing_queue.get(),
-                            timeout=self.processing_interval
-                        )
-                        batch.append(item)
-                except asyncio.TimeoutError:
-                    pass
-
+                batch = await self.processing_queue.get_batch(
+                    self.batch_size,
+                    timeout=self.processing_interval,
+                    linger=self.batch_linger
+                )
                 if batch:
-                    # Process batch
-                    db = next(get_db())
-                    analytics_items = [
-                        AnalyticsCreate(
-                            metric_name=item["type"],
-                            metric_value=item["data"],
-                            timestamp=item["timestamp"]
-                        )
-                        for item in batch
-                    ]
-                    self.crud.bulk_create(db, objs_in=analytics_items)
+                    # COPY/INSERT and the rollup upsert block, so they run in this consumer's thread
+                    try:
+                        await asyncio.get_running_loop().run_in_executor(self.executor, self._ingest_batch, batch)
+                        self.processing_queue.ack(batch)
+                    except Exception:
+                        if self.processing_queue.overflow == "spill":
+                            # Keep the batch for a later attempt rather than losing it;
+                            # items that keep failing end up in the dead-letter file
+                            self.processing_queue.retry(batch)
+                        raise
 
             except Exception as e:
                 self.logger.error(f"Error processing analytics queue: {str(e)}")
                 await asyncio.sleep(1)
 
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """Depth, lag and outcome counts of the processing queue"""
+        return {**self.processing_queue.stats(), "consumers": self.consumers}
+
+    def _ingest_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Store raw rows and fold the batch into the rollups in one transaction"""
+        rows = [
+            {
+                "metric_name": item["type"],
+                "metric_value": item["data"],
+                "timestamp": item["timestamp"]
+            }
+            for item in batch
+        ]
+        with SessionLocal() as db:
+            self.ingestor.ingest(db, rows)
+            self.rollups.apply(db, batch)
+            db.commit()
+
     async def _cleanup_old_data(self) -> None:
-        """Clean up old analytics data"""
+        """Expire analytics data older than the retention period"""
         while self.is_processing:
             try:
-                # Delete data older than retention period
-                cutoff_date = datetime.utcnow() - timedelta(days=self.data_retention_days)
-                db = next(get_db())
-                old_records = self.crud.get_multi(
-                    db,
-                    timestamp_lt=cutoff_date
-                )
-                if old_records:
-                    self.crud.bulk_delete(
-                        db,
-                        ids=[record.id for record in old_records]
-                    )
-                    self.logger.info(f"Cleaned up {len(old_records)} old analytics records")
-
+                # Drops whole daily partitions instead of deleting rows one by one
+                await asyncio.get_running_loop().run_in_executor(None, self.retention.run_once)
             except Exception as e:
                 self.logger.error(f"Error cleaning up old analytics data: {str(e)}")
 
             # Wait before next cleanup
-            await asyncio.sleep(24 * 3600)  # Run daily 
\ No newline at end of file
+            await asyncio.sleep(24 * 3600)  # Run daily
@@ -3,22 +3,54 @@ AetherIQ Automation Engine
 Handles AI-powered automation of enterprise processes
 """
 
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 import logging
 from datetime import datetime
 import json
+import os
+import time
+import uuid
+
+from aetheriq.core.pipeline import (
+    Batch, Pipeline, Stage, StageFactory, compile_steps, passthrough_stage, transformation_stage
+)
+from aetheriq.core.registry import FileWorkflowStore, WorkflowRegistry
+from aetheriq.core.rolling import RollingStats
+
+DEFAULT_WORKFLOW_STORE_DIR = os.getenv("AUTOMATION_WORKFLOW_STORE_DIR", "var/automation-workflows")
 
 class AutomationEngine:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self.active_workflows: Dict[str, Dict] = {}
+        # Finished workflows past max_workflows move to this directory
+        store_dir = config.get('workflow_store_dir') or DEFAULT_WORKFLOW_STORE_DIR
+        self.active_workflows = WorkflowRegistry(
+            max_entries=config.get('max_workflows', 10000),
+            shards=config.get('registry_shards', 16),
+            store=FileWorkflowStore(store_dir),
+            serialize=self._serialize_workflow,
+            deserialize=self._deserialize_workflow
+        )
+        self.stats_window_seconds = config.get('stats_window_seconds', 300)
+        self.stats_buckets = config.get('stats_buckets', 12)
+        self.rolling_stats = self._new_rolling_stats()
         self.automation_stats: Dict[str, Any] = {
             'total_tasks': 0,
             'successful_tasks': 0,
             'failed_tasks': 0,
             'average_processing_time': 0
         }
+        self.batch_size = config.get('batch_size', 1000)
+        self.step_registry: Dict[str, StageFactory] = {
+            'ai_analysis': self._run_ai_analysis,
+            'data_transformation': self._transform_data,
+            'system_integration': self._integrate_with_system
+        }
+
+    def register_step(self, step_type: str, factory: StageFactory) -> None:
+        """Register a step type; the factory turns a step config into a streaming stage"""
+        self.step_registry[step_type] = factory
 
     async def initialize(self) -> None:
         """Initialize the automation engine"""
@@ -30,19 +62,58 @@ class AutomationEngine:
 
     async def create_workflow(self, workflow_config: Dict[str, Any]) -> str:
         """Create a new automation workflow"""
-        workflow_id = f"wf_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # The random suffix keeps ids unique when many workflows are created per second
+        workflow_id = f"wf_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex}"
         self.active_workflows[workflow_id] = {
             'config': workflow_config,
+            'pipeline': compile_steps(workflow_config.get('steps', []), self.step_registry, self.batch_size),
             'status': 'created',
             'created_at': datetime.now(),
             'last_run': None,
             'stats': {
                 'runs': 0,
                 'success_rate': 100.0
-            }
+            },
+            'rolling': self._new_rolling_stats()
         }
         return workflow_id
 
+    def _new_rolling_stats(self) -> RollingStats:
+        return RollingStats(self.stats_window_seconds, self.stats_buckets)
+
+    def _serialize_workflow(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
+        """Storable form of an evicted workflow; the pipeline is recompiled on load"""
+        return {
+            'config': workflow['config'],
+            'status': workflow['status'],
+            'created_at': workflow['created_at'].isoformat(),
+            'last_run': workflow['last_run'].isoformat() if workflow['last_run'] else None,
+            'stats': {'runs': workflow['stats']['runs'], 'success_rate': workflow['stats']['success_rate']}
+        }
+
+    def _deserialize_workflow(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        config = record['config']
+        return {
+            'config': config,
+            'pipeline': compile_steps(config.get('steps', []), self.step_registry, self.batch_size),
+            'status': record['status'],
+            'created_at': datetime.fromisoformat(record['created_at']),
+            'last_run': datetime.fromisoformat(record['last_run']) if record['last_run'] else None,
+            'stats': record['stats'],
+            # Window samples are not persisted; they would be stale by the time a workflow is reloaded
+            'rolling': self._new_rolling_stats()
+        }
+
+    def _record_execution(self, workflow: Dict[str, Any], duration: float, success: bool) -> None:
+        workflow['stats']['runs'] += 1
+        workflow['rolling'].record(duration, success)
+        self.rolling_stats.record(duration, success)
+
+        stats = self.automation_stats
+        stats['total_tasks'] += 1
+        stats['successful_tasks' if success else 'failed_tasks'] += 1
+        stats['average_processing_time'] += (duration - stats['average_processing_time']) / stats['total_tasks']
+
     async def execute_workflow(self, workflow_id: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a workflow with given input data"""
         if workflow_id not in self.active_workflows:
@@ -51,60 +122,88 @@ class AutomationEngine:
         workflow = self.active_workflows[workflow_id]
         workflow['status'] = 'running'
         workflow['last_run'] = datetime.now()
+        start = time.perf_counter()
 
         try:
             # Execute workflow steps
-            result = await self._process_workflow_steps(workflow['config'], input_data)
-            
-            # Update statistics
-            workflow['stats']['runs'] += 1
-            self.automation_stats['total_tasks'] += 1
-            self.automation_stats['successful_tasks'] += 1
+            result = await self._process_workflow_steps(workflow['pipeline'], input_data)
             
+            self._record_execution(workflow, time.perf_counter() - start, True)
             workflow['status'] = 'completed'
             return result
         except Exception as e:
             self.logger.error(f"Workflow execution failed: {str(e)}")
+            self._record_execution(workflow, time.perf_counter() - start, False)
             workflow['status'] = 'failed'
-            self.automation_stats['failed_tasks'] += 1
             raise
 
-    async def _process_workflow_steps(self, config: Dict[str, Any], input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process individual workflow steps"""
-        result = input_data.copy()
-        
-        for step in config.get('steps', []):
-            step_type = step.get('type')
-            if step_type == 'ai_analysis':
-                result = await self._run_ai_analysis(step, result)
-            elif step_type == 'data_transformation':
-                result = await self._transform_data(step, result)
-            elif step_type == 'system_integration':
-                result = await self._integrate_with_system(step, result)
-            
+    def stream_workflow(self, workflow_id: str, records: Any) -> AsyncIterator[Batch]:
+        """Stream records (any iterable or async iterable) through a workflow's steps.
+
+        Output batches are yielded as they leave the last step, so neither
+        the input nor the output is ever held in memory as a whole.
+        """
+        if workflow_id not in self.active_workflows:
+            raise ValueError(f"Workflow {workflow_id} not found")
+        return self.active_workflows[workflow_id]['pipeline'].stream(records)
+
+    async def _process_workflow_steps(self, pipeline: Pipeline, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the compiled steps over the input.
+
+        Inputs with a ``records`` field stream those records through the
+        steps. A list of records comes back as a list; any other iterable is
+        consumed without collecting the output, and only its count is
+        returned (use ``stream_workflow`` to receive the records). Without
+        ``records`` the input itself is processed as a single record.
+        """
+        if 'records' not in input_data:
+            result = {}
+            async for batch in pipeline.stream([input_data]):
+                result = batch[-1]
+            return result
+
+        records = input_data['records']
+        result = {key: value for key, value in input_data.items() if key != 'records'}
+        collected: Optional[List[Dict[str, Any]]] = [] if isinstance(records, list) else None
+        count = 0
+        async for batch in pipeline.stream(records):
+            count += len(batch)
+            if collected is not None:
+                collected.extend(batch)
+        if collected is not None:
+            result['records'] = collected
+        result['records_processed'] = count
         return result
 
-    async def _run_ai_analysis(self, step: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    def _run_ai_analysis(self, step: Dict[str, Any]) -> Stage:
         """Run AI analysis on the data"""
         # Implement AI analysis logic
-        return data
+        return passthrough_stage(step)
 
-    async def _transform_data(self, step: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    def _transform_data(self, step: Dict[str, Any]) -> Stage:
         """Transform data according to step configuration"""
-        # Implement data transformation logic
-        return data
+        return transformation_stage(step)
 
-    async def _integrate_with_system(self, step: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    def _integrate_with_system(self, step: Dict[str, Any]) -> Stage:
         """Integrate with external systems"""
         # Implement system integration logic
-        return data
+        return passthrough_stage(step)
 
     def get_workflow_status(self, workflow_id: str) -> Dict[str, Any]:
         """Get current status of a workflow"""
         if workflow_id not in self.active_workflows:
             raise ValueError(f"Workflow {workflow_id} not found")
-        return self.active_workflows[workflow_id]
+        workflow = self.active_workflows[workflow_id]
+        window = workflow['rolling'].summary()
+        if window['executions']:
+            workflow['stats']['success_rate'] = window['success_rate']
+        workflow['stats']['window'] = window
+        return workflow
 
     def get_automation_stats(self) -> Dict[str, Any]:
         """Get automation statistics"""
-        return self.automation_stats.copy() 
\ No newline at end of file
+        stats = self.automation_stats.copy()
+        stats['window'] = self.rolling_stats.summary()
+        stats['workflows_in_memory'] = len(self.active_workflows)
+        stats['workflows_evicted'] = self.active_workflows.evictions
+        return stats
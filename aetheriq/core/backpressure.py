@@ -0,0 +1,307 @@
+"""
+Bounded ingest queue with configurable overflow handling
+"""
+
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import random
+
+from prometheus_client import Counter, Gauge
+
+from aetheriq.core.state import decode_datetime, encode_datetime
+
+OVERFLOW_POLICIES = ("reject", "spill", "sample")
+
+# Prometheus metrics
+ingest_queue_depth = Gauge(
+    'ingest_queue_depth',
+    'Items waiting in an ingest queue, in memory and spilled to disk',
+    ['queue']
+)
+
+ingest_queue_lag = Gauge(
+    'ingest_queue_lag_seconds',
+    'Age of the oldest item in the last batch taken from an ingest queue',
+    ['queue']
+)
+
+ingest_queue_items_total = Counter(
+    'ingest_queue_items_total',
+    'Ingest queue items by outcome (queued, rejected, spilled, sampled_out, dropped, replayed, dead_lettered)',
+    ['queue', 'outcome']
+)
+
+class QueueFullError(Exception):
+    """Raised by ``put`` when the queue is full and the overflow policy is reject"""
+
+    def __init__(self, queue: str, depth: int, retry_after: float):
+        super().__init__(f"Queue {queue} is full ({depth} items)")
+        self.depth = depth
+        self.retry_after = retry_after
+
+class BoundedIngestQueue:
+    """In-memory queue of at most ``maxsize`` items for several async consumers.
+
+    What happens when a producer finds it full depends on ``overflow``:
+    ``reject`` raises QueueFullError so the caller can answer 429,
+    ``spill`` appends the item to a JSONL file that consumers drain once
+    the in-memory queue runs dry, and ``sample`` starts admitting only a
+    ``sample_rate`` fraction of items once depth passes
+    ``sample_watermark`` and drops everything at ``maxsize``. Consumers
+    ``ack`` a batch once it is stored, and only then does the spill file's
+    recorded offset move past its items, so a spill file left over from a
+    previous run is picked up on start with everything not yet confirmed.
+    Consumers hand items they failed to write to ``retry``; an item that
+    has failed ``max_attempts`` times goes to ``dead_letter_path`` instead
+    of back into the spill file.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 10000,
+        overflow: str = "reject",
+        spill_path: Optional[str] = None,
+        sample_rate: float = 0.1,
+        sample_watermark: float = 0.8,
+        retry_after: float = 1.0,
+        timestamp_key: str = "timestamp",
+        rng: Callable[[], float] = random.random,
+        max_attempts: int = 5,
+        dead_letter_path: Optional[str] = None
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow}; expected one of {', '.join(OVERFLOW_POLICIES)}")
+        if overflow == "spill" and not spill_path:
+            raise ValueError("The spill overflow policy needs a spill_path")
+        self.name = name
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self.sample_rate = sample_rate
+        self.sample_threshold = int(maxsize * sample_watermark)
+        self.retry_after = retry_after
+        self.timestamp_key = timestamp_key
+        self.rng = rng
+        self.max_attempts = max_attempts
+        self.dead_letter_path = dead_letter_path or (f"{spill_path}.dead" if spill_path else None)
+        self.logger = logging.getLogger(__name__)
+        self._items: Deque[Dict[str, Any]] = deque()
+        self._not_empty = asyncio.Event()
+        self._spill_writer = None
+        self._spill_reader = None
+        self._spill_pending = 0
+        self._spill_offset = 0
+        # [end offset, acked] per line read back from the spill file, in file order
+        self._unacked: Deque[List[Any]] = deque()
+        self._unacked_items: Dict[int, List[Any]] = {}
+        self._depth = ingest_queue_depth.labels(queue=name)
+        self._lag = ingest_queue_lag.labels(queue=name)
+        self.counts: Dict[str, int] = {}
+        if spill_path and os.path.exists(spill_path):
+            if os.path.exists(self._offset_path):
+                with open(self._offset_path) as f:
+                    self._spill_offset = int(f.read() or 0)
+            with open(spill_path) as f:
+                f.seek(self._spill_offset)
+                self._spill_pending = sum(1 for line in f if line.strip())
+            if self._spill_pending:
+                self.logger.info(f"Recovered {self._spill_pending} spilled items for queue {name}")
+
+    @property
+    def _offset_path(self) -> str:
+        return f"{self.spill_path}.offset"
+
+    def qsize(self) -> int:
+        return len(self._items) + self._spill_pending
+
+    def _count(self, outcome: str, n: int = 1) -> None:
+        self.counts[outcome] = self.counts.get(outcome, 0) + n
+        ingest_queue_items_total.labels(queue=self.name, outcome=outcome).inc(n)
+
+    def put(self, item: Dict[str, Any]) -> str:
+        """Offer one item without blocking; returns what happened to it"""
+        depth = len(self._items)
+        if depth >= self.maxsize:
+            if self.overflow == "reject":
+                self._count("rejected")
+                raise QueueFullError(self.name, self.qsize(), self.retry_after)
+            if self.overflow == "spill":
+                self.spill([item])
+                return "spilled"
+            self._count("dropped")
+            return "dropped"
+        if self.overflow == "sample" and depth >= self.sample_threshold and self.rng() >= self.sample_rate:
+            self._count("sampled_out")
+            return "sampled_out"
+        self._items.append(item)
+        self._not_empty.set()
+        self._count("queued")
+        self._depth.set(self.qsize())
+        return "queued"
+
+    def spill(self, items: List[Dict[str, Any]]) -> None:
+        """Append items to the spill file; consumers pick them up later"""
+        if self._spill_writer is None:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            self._spill_writer = open(self.spill_path, "a")
+        for item in items:
+            self._spill_writer.write(json.dumps(item, default=encode_datetime) + "\n")
+        self._spill_writer.flush()
+        self._spill_pending += len(items)
+        self._count("spilled", len(items))
+        self._not_empty.set()
+        self._depth.set(self.qsize())
+
+    def retry(self, items: List[Dict[str, Any]]) -> int:
+        """Spill items whose write failed for another attempt; returns how many were dead-lettered"""
+        retry, dead = [], []
+        for item in items:
+            item = {**item, "attempts": item.get("attempts", 0) + 1}
+            (dead if item["attempts"] >= self.max_attempts else retry).append(item)
+        if retry:
+            self.spill(retry)
+        if dead:
+            self._dead_letter(dead)
+        # The new copies stand in for the originals now
+        self.ack(items)
+        return len(dead)
+
+    def ack(self, items: List[Dict[str, Any]]) -> None:
+        """Confirm that a batch from ``get_batch`` is stored, so a restart will not replay it"""
+        for item in items:
+            entry = self._unacked_items.pop(id(item), None)
+            if entry is not None:
+                entry[1] = True
+        self._commit_spill_offset()
+
+    def _commit_spill_offset(self) -> None:
+        offset = None
+        while self._unacked and self._unacked[0][1]:
+            offset = self._unacked.popleft()[0]
+        if self._unacked or self._spill_pending:
+            if offset is not None:
+                # Remember how far everything is stored so a restart does not replay it
+                self._spill_offset = offset
+                with open(self._offset_path, "w") as f:
+                    f.write(str(offset))
+            return
+        if self._spill_reader is None:
+            return
+        # Everything spilled has been stored; start the next spill afresh
+        self._spill_offset = 0
+        for handle in (self._spill_reader, self._spill_writer):
+            if handle is not None:
+                handle.close()
+        self._spill_reader = self._spill_writer = None
+        for path in (self.spill_path, self._offset_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _dead_letter(self, items: List[Dict[str, Any]]) -> None:
+        os.makedirs(os.path.dirname(self.dead_letter_path) or ".", exist_ok=True)
+        with open(self.dead_letter_path, "a") as f:
+            for item in items:
+                f.write(json.dumps(item, default=encode_datetime) + "\n")
+        self._count("dead_lettered", len(items))
+        self.logger.error(
+            f"Moved {len(items)} items of queue {self.name} to {self.dead_letter_path} "
+            f"after {self.max_attempts} failed attempts"
+        )
+
+    def _read_spill(self, n: int) -> List[Dict[str, Any]]:
+        if self._spill_reader is None:
+            self._spill_reader = open(self.spill_path)
+            self._spill_reader.seek(self._spill_offset)
+        items = []
+        lines = 0
+        while lines < n:
+            line = self._spill_reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            lines += 1
+            entry = [self._spill_reader.tell(), False]
+            self._unacked.append(entry)
+            try:
+                item = json.loads(line, object_hook=decode_datetime)
+            except ValueError:
+                # Torn line from a crash mid-append; nothing to store
+                self.logger.warning(f"Skipping undecodable line in spill file {self.spill_path}")
+                entry[1] = True
+                continue
+            self._unacked_items[id(item)] = entry
+            items.append(item)
+        self._spill_pending = max(self._spill_pending - lines, 0)
+        self._commit_spill_offset()
+        if items:
+            self._count("replayed", len(items))
+        return items
+
+    def _take(self, n: int) -> List[Dict[str, Any]]:
+        batch = []
+        while self._items and len(batch) < n:
+            batch.append(self._items.popleft())
+        if len(batch) < n and self._spill_pending:
+            batch.extend(self._read_spill(n - len(batch)))
+        if not self.qsize():
+            self._not_empty.clear()
+        return batch
+
+    async def _wait(self, timeout: float) -> bool:
+        try:
+            while not self.qsize():
+                self._not_empty.clear()
+                await asyncio.wait_for(self._not_empty.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def get_batch(self, max_items: int, timeout: float, linger: float = 0.0) -> List[Dict[str, Any]]:
+        """Wait up to ``timeout`` for work, then collect up to ``max_items``.
+
+        After the first item, keeps collecting for at most ``linger`` seconds
+        so light traffic still forms reasonably sized batches.
+        """
+        if not await self._wait(timeout):
+            return []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + linger
+        batch = self._take(max_items)
+        while len(batch) < max_items:
+            remaining = deadline - loop.time()
+            if remaining <= 0 or not await self._wait(remaining):
+                break
+            batch.extend(self._take(max_items - len(batch)))
+        self._depth.set(self.qsize())
+        self._observe_lag(batch)
+        return batch
+
+    def _observe_lag(self, batch: List[Dict[str, Any]]) -> None:
+        stamps = [item.get(self.timestamp_key) for item in batch]
+        stamps = [ts for ts in stamps if isinstance(ts, datetime)]
+        if stamps:
+            self._lag.set((datetime.utcnow() - min(stamps)).total_seconds())
+
+    def lag_seconds(self) -> float:
+        """Age of the oldest item still in memory"""
+        if not self._items:
+            return 0.0
+        ts = self._items[0].get(self.timestamp_key)
+        return (datetime.utcnow() - ts).total_seconds() if isinstance(ts, datetime) else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": len(self._items),
+            "spilled_pending": self._spill_pending,
+            "maxsize": self.maxsize,
+            "overflow": self.overflow,
+            "lag_seconds": self.lag_seconds(),
+            "items": dict(self.counts)
+        }
@@ -16,9 +16,10 @@ from uuid import UUID, uuid4
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
-from aetheriq.db.session import get_db
+from aetheriq.core.retention import RetentionManager, RetentionPolicy
+from aetheriq.db.session import SessionLocal, get_db
 from aetheriq.crud.base import CRUDBase
-from aetheriq.db.models import ComplianceCheck as ComplianceCheckModel
+from aetheriq.db.models import AuditLog as AuditLogModel, ComplianceCheck as ComplianceCheckModel
 from aetheriq.schemas.base import ComplianceCheck, ComplianceCheckCreate
 
 class ComplianceStatus(str, Enum):
@@ -72,6 +73,11 @@ class ComplianceManager:
         self.remediation_actions: List[Dict] = []
         self.check_interval = config.get("check_interval_seconds", 3600)
         self.retention_days = config.get("retention_days", 90)
+        self.audit_retention_days = config.get("audit_retention_days", 365)
+        self.retention = RetentionManager(SessionLocal, [
+            RetentionPolicy(ComplianceCheckModel.__tablename__, "created_at", self.retention_days),
+            RetentionPolicy(AuditLogModel.__tablename__, "timestamp", self.audit_retention_days)
+        ])
         self.crud = CRUDBase[ComplianceCheckModel, ComplianceCheck, ComplianceCheck](ComplianceCheckModel)
         self.rules: Dict[str, ComplianceRule] = {}
         self.is_running = False
@@ -358,23 +364,11 @@ class ComplianceManager:
             await asyncio.sleep(self.check_interval)
 
     async def _cleanup_old_checks(self) -> None:
-        """Clean up old compliance checks"""
+        """Expire compliance checks and audit logs older than their retention periods"""
         while self.is_running:
             try:
-                # Delete checks older than retention period
-                cutoff_date = datetime.utcnow() - timedelta(days=self.retention_days)
-                db = next(get_db())
-                old_checks = self.crud.get_multi(
-                    db,
-                    timestamp_lt=cutoff_date
-                )
-                if old_checks:
-                    self.crud.bulk_delete(
-                        db,
-                        ids=[check.id for check in old_checks]
-                    )
-                    self.logger.info(f"Cleaned up {len(old_checks)} old compliance checks")
-
+                # Drops whole monthly partitions instead of deleting rows one by one
+                await asyncio.get_running_loop().run_in_executor(None, self.retention.run_once)
             except Exception as e:
                 self.logger.error(f"Error cleaning up old compliance checks: {str(e)}")
 
@@ -0,0 +1,119 @@
+"""
+Dispatch channels that wake the workflow engine when workflows are created
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+import asyncio
+import logging
+import re
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+_CHANNEL_PATTERN = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+class WorkflowDispatcher(ABC):
+    """Pluggable channel carrying ids of workflows that are ready to run.
+
+    Delivery is best effort: a lost message only delays a workflow until the
+    engine's reconciliation sweep picks it up, and claiming is done with row
+    locks, so duplicate deliveries are harmless.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+
+    async def stop(self) -> None:
+        pass
+
+    def _deliver(self, workflow_id: str) -> None:
+        """Hand an id to the engine; safe to call from any thread"""
+        if self._queue is None or self._loop is None:
+            return
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, workflow_id)
+
+    @abstractmethod
+    def publish(self, db: Session, workflow_id: Any) -> None:
+        """Announce a committed pending workflow"""
+        pass
+
+    async def next_workflow(self) -> str:
+        """Wait for the next announced workflow id"""
+        return await self._queue.get()
+
+class LocalDispatcher(WorkflowDispatcher):
+    """In-process dispatch; other workers learn about work from the sweep"""
+
+    def publish(self, db: Session, workflow_id: Any) -> None:
+        self._deliver(str(workflow_id))
+
+class PostgresDispatcher(WorkflowDispatcher):
+    """Dispatch through Postgres LISTEN/NOTIFY so every worker wakes up"""
+
+    def __init__(self, database_url: str, channel: str = "workflow_pending"):
+        super().__init__()
+        if not _CHANNEL_PATTERN.match(channel):
+            raise ValueError(f"Invalid notification channel: {channel}")
+        self.database_url = database_url
+        self.channel = channel
+        self._connection = None
+
+    async def start(self) -> None:
+        await super().start()
+        import psycopg2
+        import psycopg2.extensions
+
+        self._connection = psycopg2.connect(self.database_url)
+        self._connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with self._connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+        self._loop.add_reader(self._connection.fileno(), self._drain_notifications)
+        self.logger.info(f"Listening for workflows on channel {self.channel}")
+
+    def _drain_notifications(self) -> None:
+        try:
+            self._connection.poll()
+        except Exception as e:
+            self.logger.error(f"Workflow notification listener failed: {str(e)}")
+            self._loop.remove_reader(self._connection.fileno())
+            return
+        while self._connection.notifies:
+            notification = self._connection.notifies.pop(0)
+            self._deliver(notification.payload)
+
+    async def stop(self) -> None:
+        if self._connection is not None:
+            try:
+                self._loop.remove_reader(self._connection.fileno())
+            finally:
+                self._connection.close()
+                self._connection = None
+
+    def publish(self, db: Session, workflow_id: Any) -> None:
+        # pg_notify is transactional, listeners only hear about committed rows
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": self.channel, "payload": str(workflow_id)}
+        )
+        db.commit()
+
+def create_dispatcher(config: Any) -> WorkflowDispatcher:
+    """Build the dispatcher named by the workflow configuration"""
+    backend = config.get("dispatch_backend", "local")
+    if backend == "postgres":
+        database_url = config.get("database_url")
+        if not database_url:
+            from aetheriq.db.session import database_url
+        return PostgresDispatcher(database_url, config.get("dispatch_channel", "workflow_pending"))
+    if backend == "local":
+        return LocalDispatcher()
+    raise ValueError(f"Unknown dispatch backend: {backend}")
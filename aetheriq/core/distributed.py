@@ -0,0 +1,483 @@
+"""
+Distributed execution of workflow tasks through a shared work queue
+"""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+from sqlalchemy import case
+from sqlalchemy.orm import Session
+
+@dataclass
+class TaskMessage:
+    """A ready task published for any worker to run"""
+    workflow_id: str
+    task_id: str
+    task_type: str
+    config: Dict[str, Any]
+    origin: str = ""  # Node that published the task; its own workers take it first
+    id: str = field(default_factory=lambda: str(uuid4()))
+    attempts: int = 0
+
+@dataclass
+class TaskOutcome:
+    """Result of a finished task message"""
+    message_id: str
+    ok: bool
+    result: Any = None
+    error: Optional[str] = None
+
+def default_node_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+class WorkQueue(ABC):
+    """Shared queue of ready tasks with leased claims.
+
+    A claim leases a message to one worker for ``lease_seconds``. Workers
+    extend their leases with ``heartbeat``; a message whose lease runs out
+    (the worker died or stalled) becomes claimable again until it has been
+    attempted ``max_attempts`` times. Each worker prefers messages its own
+    node published and otherwise steals from other nodes' backlogs, so idle
+    nodes drain busy ones. All methods are blocking and thread-safe.
+    """
+
+    max_attempts = 3
+
+    @abstractmethod
+    def publish(self, message: TaskMessage) -> None:
+        """Make a message claimable"""
+        pass
+
+    @abstractmethod
+    def claim(self, node_id: str, worker_id: str, lease_seconds: float) -> Optional[TaskMessage]:
+        """Lease the next message, preferring this node's own; None if nothing is ready"""
+        pass
+
+    @abstractmethod
+    def heartbeat(self, worker_id: str, message_ids: Iterable[str], lease_seconds: float) -> Set[str]:
+        """Extend leases; returns the ids whose lease this worker has lost"""
+        pass
+
+    @abstractmethod
+    def complete(self, worker_id: str, outcome: TaskOutcome) -> bool:
+        """Record an outcome; False if the lease was lost meanwhile"""
+        pass
+
+    @abstractmethod
+    def outcomes(self, message_ids: Iterable[str]) -> Dict[str, TaskOutcome]:
+        """Outcomes of the given messages that have finished"""
+        pass
+
+    @abstractmethod
+    def forget(self, message_ids: Iterable[str]) -> None:
+        """Drop messages and their outcomes once the publisher is done with them"""
+        pass
+
+class InMemoryWorkQueue(WorkQueue):
+    """Process-local work queue, for tests and single-node deployments.
+
+    Ready messages are kept in one deque per origin node. A node takes from
+    the head of its own deque and steals from the tail of the longest other
+    deque, the usual work-stealing split that keeps owners and thieves apart.
+    """
+
+    def __init__(self, max_attempts: int = 3):
+        self.max_attempts = max_attempts
+        self._ready: Dict[str, Deque[str]] = {}
+        self._messages: Dict[str, TaskMessage] = {}
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._outcomes: Dict[str, TaskOutcome] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, message: TaskMessage) -> None:
+        with self._lock:
+            self._messages[message.id] = message
+            self._ready.setdefault(message.origin, deque()).append(message.id)
+
+    def _requeue_expired(self, now: float) -> None:
+        for message_id, (_, expires) in list(self._leases.items()):
+            if expires > now:
+                continue
+            del self._leases[message_id]
+            message = self._messages[message_id]
+            if message.attempts >= self.max_attempts:
+                self._outcomes[message_id] = TaskOutcome(
+                    message_id, False, error=f"Lease expired after {message.attempts} attempts"
+                )
+            else:
+                self._ready.setdefault(message.origin, deque()).appendleft(message_id)
+
+    def claim(self, node_id: str, worker_id: str, lease_seconds: float) -> Optional[TaskMessage]:
+        now = time.monotonic()
+        with self._lock:
+            self._requeue_expired(now)
+            own = self._ready.get(node_id)
+            if own:
+                message_id = own.popleft()
+            else:
+                victims = [queue for queue in self._ready.values() if queue]
+                if not victims:
+                    return None
+                message_id = max(victims, key=len).pop()
+            message = self._messages[message_id]
+            message.attempts += 1
+            self._leases[message_id] = (worker_id, now + lease_seconds)
+            return message
+
+    def heartbeat(self, worker_id: str, message_ids: Iterable[str], lease_seconds: float) -> Set[str]:
+        lost = set()
+        expires = time.monotonic() + lease_seconds
+        with self._lock:
+            for message_id in message_ids:
+                lease = self._leases.get(message_id)
+                if lease is None or lease[0] != worker_id:
+                    lost.add(message_id)
+                else:
+                    self._leases[message_id] = (worker_id, expires)
+        return lost
+
+    def complete(self, worker_id: str, outcome: TaskOutcome) -> bool:
+        with self._lock:
+            lease = self._leases.get(outcome.message_id)
+            if lease is None or lease[0] != worker_id:
+                return False
+            del self._leases[outcome.message_id]
+            self._outcomes[outcome.message_id] = outcome
+            return True
+
+    def outcomes(self, message_ids: Iterable[str]) -> Dict[str, TaskOutcome]:
+        with self._lock:
+            return {
+                message_id: self._outcomes[message_id]
+                for message_id in message_ids if message_id in self._outcomes
+            }
+
+    def forget(self, message_ids: Iterable[str]) -> None:
+        with self._lock:
+            for message_id in message_ids:
+                message = self._messages.pop(message_id, None)
+                self._leases.pop(message_id, None)
+                self._outcomes.pop(message_id, None)
+                if message is not None:
+                    queue = self._ready.get(message.origin)
+                    if queue and message_id in queue:
+                        queue.remove(message_id)
+
+    def depth(self) -> int:
+        with self._lock:
+            return sum(len(queue) for queue in self._ready.values())
+
+class PostgresWorkQueue(WorkQueue):
+    """Work queue in the workflow_task_queue table, shared by every node.
+
+    Claims lock one row with FOR UPDATE SKIP LOCKED, preferring rows the
+    claiming node published, so concurrent claimers never block each other.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_attempts: int = 3):
+        from aetheriq.db.models import TaskQueueItem
+
+        self.session_factory = session_factory
+        self.max_attempts = max_attempts
+        self.model = TaskQueueItem
+
+    def publish(self, message: TaskMessage) -> None:
+        with self.session_factory() as db:
+            db.add(self.model(
+                id=UUID(message.id),
+                workflow_id=UUID(message.workflow_id),
+                task_id=message.task_id,
+                task_type=message.task_type,
+                config=message.config,
+                origin=message.origin,
+                status="queued",
+                attempts=0
+            ))
+            db.commit()
+
+    def claim(self, node_id: str, worker_id: str, lease_seconds: float) -> Optional[TaskMessage]:
+        Item = self.model
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            while True:
+                item = db.query(Item)\
+                    .filter(
+                        (Item.status == "queued") |
+                        ((Item.status == "leased") & (Item.lease_expires_at < now))
+                    )\
+                    .order_by(case((Item.origin == node_id, 0), else_=1), Item.created_at)\
+                    .with_for_update(skip_locked=True)\
+                    .first()
+                if item is None:
+                    db.rollback()
+                    return None
+                if item.attempts >= self.max_attempts:
+                    item.status = "failed"
+                    item.error = f"Lease expired after {item.attempts} attempts"
+                    item.leased_by = None
+                    db.commit()
+                    continue
+                item.status = "leased"
+                item.attempts += 1
+                item.leased_by = worker_id
+                item.lease_expires_at = now + timedelta(seconds=lease_seconds)
+                db.commit()
+                return TaskMessage(
+                    workflow_id=str(item.workflow_id),
+                    task_id=item.task_id,
+                    task_type=item.task_type,
+                    config=item.config or {},
+                    origin=item.origin,
+                    id=str(item.id),
+                    attempts=item.attempts
+                )
+
+    def heartbeat(self, worker_id: str, message_ids: Iterable[str], lease_seconds: float) -> Set[str]:
+        Item = self.model
+        message_ids = set(message_ids)
+        if not message_ids:
+            return set()
+        with self.session_factory() as db:
+            kept = db.query(Item.id)\
+                .filter(Item.id.in_(_uuids(message_ids)), Item.leased_by == worker_id, Item.status == "leased")\
+                .with_for_update()\
+                .all()
+            kept_ids = {str(row.id) for row in kept}
+            if kept_ids:
+                db.query(Item)\
+                    .filter(Item.id.in_(_uuids(kept_ids)))\
+                    .update(
+                        {"lease_expires_at": datetime.utcnow() + timedelta(seconds=lease_seconds)},
+                        synchronize_session=False
+                    )
+            db.commit()
+        return message_ids - kept_ids
+
+    def complete(self, worker_id: str, outcome: TaskOutcome) -> bool:
+        Item = self.model
+        with self.session_factory() as db:
+            updated = db.query(Item)\
+                .filter(Item.id == UUID(outcome.message_id), Item.leased_by == worker_id, Item.status == "leased")\
+                .update(
+                    {
+                        "status": "done" if outcome.ok else "failed",
+                        # Results the JSON column cannot hold are stored as text
+                        "result": json.loads(json.dumps(outcome.result, default=str)),
+                        "error": outcome.error,
+                        "lease_expires_at": None
+                    },
+                    synchronize_session=False
+                )
+            db.commit()
+        return updated == 1
+
+    def outcomes(self, message_ids: Iterable[str]) -> Dict[str, TaskOutcome]:
+        Item = self.model
+        message_ids = list(message_ids)
+        if not message_ids:
+            return {}
+        with self.session_factory() as db:
+            rows = db.query(Item.id, Item.status, Item.result, Item.error)\
+                .filter(Item.id.in_(_uuids(message_ids)), Item.status.in_(["done", "failed"]))\
+                .all()
+        return {
+            str(row.id): TaskOutcome(str(row.id), row.status == "done", row.result, row.error)
+            for row in rows
+        }
+
+    def forget(self, message_ids: Iterable[str]) -> None:
+        Item = self.model
+        message_ids = list(message_ids)
+        if not message_ids:
+            return
+        with self.session_factory() as db:
+            db.query(Item).filter(Item.id.in_(_uuids(message_ids))).delete(synchronize_session=False)
+            db.commit()
+
+def _uuids(message_ids: Iterable[str]) -> List[UUID]:
+    return [UUID(message_id) for message_id in message_ids]
+
+def create_work_queue(config: Any) -> WorkQueue:
+    """Build the work queue named by the workflow configuration"""
+    backend = config.get("work_queue_backend", "memory")
+    max_attempts = config.get("task_max_attempts", 3)
+    if backend == "postgres":
+        from aetheriq.db.session import SessionLocal
+        return PostgresWorkQueue(SessionLocal, max_attempts=max_attempts)
+    if backend == "memory":
+        return InMemoryWorkQueue(max_attempts=max_attempts)
+    raise ValueError(f"Unknown work queue backend: {backend}")
+
+class RemoteTaskRunner:
+    """Publishes tasks for remote workers and waits for their outcomes.
+
+    One poll loop fetches the outcomes of every outstanding task in a
+    single call, however many workflows are waiting.
+    """
+
+    def __init__(self, queue: WorkQueue, node_id: str, poll_interval: float = 0.05):
+        self.queue = queue
+        self.node_id = node_id
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+        self._waiting: Dict[str, asyncio.Future] = {}
+        self._poller: Optional[asyncio.Task] = None
+
+    async def run(self, workflow_id: Any, task_id: Any, task_type: str, config: Dict[str, Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        message = TaskMessage(str(workflow_id), str(task_id), task_type, config, origin=self.node_id)
+        await loop.run_in_executor(None, self.queue.publish, message)
+        future = loop.create_future()
+        self._waiting[message.id] = future
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll())
+        try:
+            outcome = await future
+        finally:
+            self._waiting.pop(message.id, None)
+            # Also withdraws the message if we stopped waiting (timeout, cancel)
+            await loop.run_in_executor(None, self.queue.forget, [message.id])
+        if not outcome.ok:
+            raise RuntimeError(outcome.error or "Remote task failed")
+        return outcome.result
+
+    async def _poll(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._waiting:
+            try:
+                finished = await loop.run_in_executor(None, self.queue.outcomes, list(self._waiting))
+            except Exception as e:
+                self.logger.error(f"Error polling task outcomes: {str(e)}")
+                finished = {}
+            for message_id, outcome in finished.items():
+                future = self._waiting.pop(message_id, None)
+                if future is not None and not future.done():
+                    future.set_result(outcome)
+            await asyncio.sleep(self.poll_interval)
+
+class TaskWorker:
+    """Claims task messages and runs them with locally registered handlers.
+
+    Up to ``concurrency`` messages run at once. While they run, their
+    leases are renewed every ``heartbeat_interval`` seconds; a message
+    whose lease was lost (e.g. after a long pause) is cancelled locally,
+    since another worker now owns it.
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        handlers: Dict[str, Callable],
+        node_id: Optional[str] = None,
+        concurrency: int = 4,
+        lease_seconds: float = 30,
+        heartbeat_interval: float = 10,
+        idle_interval: float = 0.05,
+        run: Optional[Callable[[str, Callable, Dict[str, Any]], Awaitable[Any]]] = None
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.node_id = node_id or default_node_id()
+        self.worker_id = f"{self.node_id}-{uuid4().hex[:8]}"
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_interval = idle_interval
+        self._run = run or self._run_inline
+        self.logger = logging.getLogger(__name__)
+        self.completed = 0
+        self._active: Dict[str, asyncio.Task] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @staticmethod
+    async def _run_inline(task_type: str, handler: Callable, config: Dict[str, Any]) -> Any:
+        result = handler(config)
+        return await result if asyncio.iscoroutine(result) else result
+
+    async def start(self) -> None:
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._tasks = [
+            asyncio.create_task(self._claim_loop()),
+            asyncio.create_task(self._heartbeat_loop())
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks + list(self._active.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._active.values(), return_exceptions=True)
+        self._tasks = []
+
+    async def _claim_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            try:
+                message = await loop.run_in_executor(
+                    None, self.queue.claim, self.node_id, self.worker_id, self.lease_seconds
+                )
+            except Exception as e:
+                self.logger.error(f"Error claiming task: {str(e)}")
+                message = None
+            if message is None:
+                self._slots.release()
+                await asyncio.sleep(self.idle_interval)
+                continue
+            task = asyncio.create_task(self._execute(message))
+            self._active[message.id] = task
+
+    async def _execute(self, message: TaskMessage) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            handler = self.handlers.get(message.task_type)
+            if handler is None:
+                outcome = TaskOutcome(message.id, False, error=f"No handler registered for task type: {message.task_type}")
+            else:
+                try:
+                    result = await self._run(message.task_type, handler, message.config)
+                    outcome = TaskOutcome(message.id, True, result)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    outcome = TaskOutcome(message.id, False, error=str(e))
+            if not await loop.run_in_executor(None, self.queue.complete, self.worker_id, outcome):
+                self.logger.warning(f"Lease on task {message.task_id} was lost before it completed")
+            else:
+                self.completed += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.logger.error(f"Error completing task {message.task_id}: {str(e)}")
+        finally:
+            self._active.pop(message.id, None)
+            self._slots.release()
+
+    async def _heartbeat_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if not self._active:
+                continue
+            try:
+                lost = await loop.run_in_executor(
+                    None, self.queue.heartbeat, self.worker_id, list(self._active), self.lease_seconds
+                )
+            except Exception as e:
+                self.logger.error(f"Error renewing task leases: {str(e)}")
+                continue
+            for message_id in lost:
+                task = self._active.get(message_id)
+                if task is not None:
+                    self.logger.warning(f"Lease on task message {message_id} lost, cancelling local run")
+                    task.cancel()
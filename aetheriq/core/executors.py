@@ -0,0 +1,221 @@
+"""
+Execution pools for workflow task handlers
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import functools
+import inspect
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+
+import numpy as np
+
+class ExecutionMode(str, Enum):
+    """Where a task handler runs"""
+    INLINE = "inline"  # On the event loop, for async I/O-bound handlers
+    THREAD = "thread"  # In a thread pool, for blocking I/O or GIL-releasing code
+    PROCESS = "process"  # In a process pool, for CPU-bound handlers
+
+@dataclass
+class PoolConfig:
+    """Execution pool definition"""
+    mode: ExecutionMode
+    max_workers: int = 4
+    max_concurrency: Optional[int] = None  # Defaults to max_workers; unlimited for inline
+
+@dataclass
+class TaskExecutionPolicy:
+    """Execution policy of one task type"""
+    pool: str = "inline"
+
+DEFAULT_POOLS = {
+    "inline": {"mode": ExecutionMode.INLINE},
+    "thread": {"mode": ExecutionMode.THREAD, "max_workers": 8},
+    "process": {"mode": ExecutionMode.PROCESS, "max_workers": os.cpu_count() or 1},
+}
+
+# Arrays at least this large are returned from worker processes via shared memory
+SHARED_MEMORY_THRESHOLD_BYTES = 1 << 20
+
+@dataclass
+class SharedArrayRef:
+    """Placeholder for an array a worker process left in shared memory"""
+    name: str
+    shape: tuple
+    dtype: str
+
+def _run_sync(handler: Callable, config: Dict[str, Any]) -> Any:
+    if inspect.iscoroutinefunction(handler):
+        return asyncio.run(handler(config))
+    return handler(config)
+
+def _export_arrays(value: Any, threshold: int) -> Any:
+    """Move large arrays of a result into shared memory segments"""
+    if isinstance(value, np.ndarray) and value.nbytes >= threshold:
+        segment = shared_memory.SharedMemory(create=True, size=value.nbytes)
+        np.ndarray(value.shape, dtype=value.dtype, buffer=segment.buf)[...] = value
+        ref = SharedArrayRef(segment.name, value.shape, value.dtype.str)
+        # The parent owns the segment from here on
+        resource_tracker.unregister(segment._name, "shared_memory")
+        segment.close()
+        return ref
+    if isinstance(value, dict):
+        return {key: _export_arrays(item, threshold) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_export_arrays(item, threshold) for item in value)
+    return value
+
+def _run_in_process(handler: Callable, config: Dict[str, Any], threshold: int) -> Any:
+    """Entry point inside the worker process"""
+    return _export_arrays(_run_sync(handler, config), threshold)
+
+class SharedResult:
+    """Segments backing a result whose arrays are views into shared memory"""
+
+    def __init__(self):
+        self.segments: List[shared_memory.SharedMemory] = []
+
+    def attach(self, value: Any) -> Any:
+        if isinstance(value, SharedArrayRef):
+            segment = shared_memory.SharedMemory(name=value.name)
+            self.segments.append(segment)
+            return np.ndarray(value.shape, dtype=np.dtype(value.dtype), buffer=segment.buf)
+        if isinstance(value, dict):
+            return {key: self.attach(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(self.attach(item) for item in value)
+        return value
+
+    def release(self) -> None:
+        for segment in self.segments:
+            segment.unlink()
+            try:
+                segment.close()
+            except BufferError:
+                # Views are still referenced; the mapping goes away with them
+                pass
+        self.segments = []
+
+class TaskExecutorPools:
+    """Named execution pools with per-pool concurrency limits.
+
+    Thread and process pools are created on first use. Handlers sent to a
+    process pool must be module-level functions and their configs must be
+    picklable. Arrays in process results above the shared memory threshold
+    come back as zero-copy views; call ``release`` with the result once the
+    workflow no longer needs it.
+    """
+
+    def __init__(
+        self,
+        pools: Optional[Dict[str, Dict[str, Any]]] = None,
+        shared_memory_threshold: int = SHARED_MEMORY_THRESHOLD_BYTES
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.shared_memory_threshold = shared_memory_threshold
+        self.pools: Dict[str, PoolConfig] = {}
+        for name, pool_config in {**DEFAULT_POOLS, **(pools or {})}.items():
+            pool_config = dict(pool_config)
+            pool_config["mode"] = ExecutionMode(pool_config["mode"])
+            self.pools[name] = PoolConfig(**pool_config)
+        self._executors: Dict[str, Executor] = {}
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._shared_results: Dict[int, SharedResult] = {}
+        self._lock = threading.Lock()
+
+    def _executor(self, name: str, pool: PoolConfig) -> Executor:
+        executor = self._executors.get(name)
+        if executor is None:
+            with self._lock:
+                executor = self._executors.get(name)
+                if executor is None:
+                    if pool.mode == ExecutionMode.PROCESS:
+                        executor = ProcessPoolExecutor(
+                            max_workers=pool.max_workers,
+                            mp_context=multiprocessing.get_context("spawn")
+                        )
+                    else:
+                        executor = ThreadPoolExecutor(
+                            max_workers=pool.max_workers,
+                            thread_name_prefix=f"task-{name}"
+                        )
+                    self._executors[name] = executor
+        return executor
+
+    def _limit(self, name: str, pool: PoolConfig) -> Optional[asyncio.Semaphore]:
+        limit = pool.max_concurrency
+        if limit is None and pool.mode != ExecutionMode.INLINE:
+            limit = pool.max_workers
+        if limit is None:
+            return None
+        semaphore = self._limits.get(name)
+        if semaphore is None:
+            semaphore = self._limits[name] = asyncio.Semaphore(limit)
+        return semaphore
+
+    async def run(
+        self,
+        handler: Callable,
+        config: Dict[str, Any],
+        policy: Optional[TaskExecutionPolicy] = None
+    ) -> Any:
+        """Run a handler in the pool named by its policy"""
+        name = (policy or TaskExecutionPolicy()).pool
+        pool = self.pools.get(name)
+        if pool is None:
+            raise ValueError(f"Unknown execution pool: {name}")
+
+        semaphore = self._limit(name, pool)
+        if semaphore is None:
+            return await self._dispatch(name, pool, handler, config)
+        async with semaphore:
+            return await self._dispatch(name, pool, handler, config)
+
+    async def _dispatch(self, name: str, pool: PoolConfig, handler: Callable, config: Dict[str, Any]) -> Any:
+        if pool.mode == ExecutionMode.INLINE:
+            result = handler(config)
+            return await result if inspect.isawaitable(result) else result
+
+        loop = asyncio.get_running_loop()
+        if pool.mode == ExecutionMode.THREAD:
+            return await loop.run_in_executor(
+                self._executor(name, pool),
+                functools.partial(_run_sync, handler, config)
+            )
+
+        try:
+            pickle.dumps((handler, config))
+        except Exception as e:
+            raise ValueError(f"Handler and config for process pool {name} must be picklable: {str(e)}")
+        result = await loop.run_in_executor(
+            self._executor(name, pool),
+            functools.partial(_run_in_process, handler, config, self.shared_memory_threshold)
+        )
+        shared = SharedResult()
+        result = shared.attach(result)
+        if shared.segments:
+            self._shared_results[id(result)] = shared
+        return result
+
+    def release(self, result: Any) -> None:
+        """Free shared memory behind a process pool result"""
+        shared = self._shared_results.pop(id(result), None)
+        if shared is not None:
+            shared.release()
+
+    def shutdown(self, wait: bool = True) -> None:
+        for shared in self._shared_results.values():
+            shared.release()
+        self._shared_results.clear()
+        with self._lock:
+            for executor in self._executors.values():
+                executor.shutdown(wait=wait)
+            self._executors.clear()
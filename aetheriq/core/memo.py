@@ -0,0 +1,212 @@
+"""
+Content-addressed memoization of idempotent workflow task results
+"""
+
+from collections import OrderedDict
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+import copy
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+
+import numpy as np
+from prometheus_client import Counter
+
+task_cache_requests = Counter(
+    "workflow_task_cache_requests_total",
+    "Idempotent task result cache lookups by result (hit, miss)",
+    ["result"]
+)
+
+MISSING = object()
+
+# Types whose repr() spells out the whole value
+_REPR_TYPES = (date, datetime, dt_time, timedelta, Decimal, Enum, UUID, bytes, np.generic)
+
+class _Uncacheable(Exception):
+    """An input has no faithful canonical form, so its task cannot be keyed"""
+
+def _canonical_default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        # repr() elides the middle of large arrays, hash the data instead
+        digest = hashlib.blake2b(np.ascontiguousarray(value).tobytes(), digest_size=16).hexdigest()
+        return {"__ndarray__": [value.dtype.str, list(value.shape), digest]}
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if isinstance(value, _REPR_TYPES):
+        return repr(value)
+    if type(value).__module__.split(".")[0] == "pandas":
+        return _canonical_pandas(value)
+    raise _Uncacheable(type(value).__name__)
+
+def _canonical_pandas(value: Any) -> Any:
+    import pandas as pd
+
+    if not isinstance(value, (pd.DataFrame, pd.Series)):
+        raise _Uncacheable(type(value).__name__)
+    # repr() elides the middle rows as well, hash every row with its index
+    rows = pd.util.hash_pandas_object(value, index=True).to_numpy()
+    digest = hashlib.blake2b(rows.tobytes(), digest_size=16).hexdigest()
+    if isinstance(value, pd.DataFrame):
+        return {"__dataframe__": [[repr(c) for c in value.columns], [str(d) for d in value.dtypes], digest]}
+    return {"__series__": [repr(value.name), str(value.dtype), digest]}
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=_canonical_default)
+
+class TaskResultCache:
+    """LRU/TTL cache of task results keyed by what the task computes from.
+
+    The key is a hash of the task type, its config and the outputs of its
+    upstream tasks, so a task that reruns with the same inputs is answered
+    from the cache whichever workflow it belongs to. Values are deep-copied
+    on the way in and out, so callers never share mutable results. With
+    ``path`` set, entries are also pickled to that directory and survive a
+    restart; the directory is bounded by ``max_entries`` as well.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._disk_entries = 0
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._disk_entries = len(self._disk_files())
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, task_type: str, config: Dict[str, Any], upstream: List[Any]) -> Optional[str]:
+        """Content hash of a task's inputs, or None when an input cannot be hashed faithfully"""
+        try:
+            payload = _canonical({"type": task_type, "config": config, "upstream": upstream})
+        except _Uncacheable as e:
+            self.logger.debug(f"Not caching {task_type} task, {e} inputs have no canonical form")
+            return None
+        return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+    def get(self, key: str) -> Any:
+        """Cached result for key, or MISSING"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None and self.path:
+                entry = self._load(key, now)
+                if entry is not None:
+                    self._entries[key] = entry
+                    self._evict()
+            if entry is None:
+                self.misses += 1
+                task_cache_requests.labels(result="miss").inc()
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+        task_cache_requests.labels(result="hit").inc()
+        return copy.deepcopy(entry[0])
+
+    def put(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        # Detaches the cached copy from shared memory views and later mutation
+        entry = (copy.deepcopy(value), time.time() + self.ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+            if self.path:
+                self._store(key, entry)
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.pkl")
+
+    def _disk_files(self) -> List[str]:
+        return [os.path.join(self.path, name) for name in os.listdir(self.path) if name.endswith(".pkl")]
+
+    def _load(self, key: str, now: float) -> Optional[Tuple[Any, float]]:
+        try:
+            with open(self._file(key), "rb") as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Discarding unreadable task cache entry {key}: {str(e)}")
+            entry = (None, 0.0)
+        if entry[1] <= now:
+            self._remove(self._file(key))
+            return None
+        return entry
+
+    def _store(self, key: str, entry: Tuple[Any, float]) -> None:
+        target = self._file(key)
+        temp = f"{target}.{os.getpid()}.tmp"
+        try:
+            existed = os.path.exists(target)
+            with open(temp, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp, target)
+        except Exception as e:
+            self.logger.warning(f"Could not persist task cache entry {key}: {str(e)}")
+            self._remove(temp)
+            return
+        if not existed:
+            self._disk_entries += 1
+        if self._disk_entries > self.max_entries:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Drop the least recently written files down to 90% of the bound"""
+        files = sorted(self._disk_files(), key=lambda name: os.stat(name).st_mtime)
+        excess = len(files) - int(self.max_entries * 0.9)
+        for name in files[:max(excess, 0)]:
+            self._remove(name)
+        self._disk_entries = len(files) - max(excess, 0)
+
+    def _remove(self, name: str) -> None:
+        try:
+            os.remove(name)
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self.path:
+                for name in self._disk_files():
+                    self._remove(name)
+                self._disk_entries = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "disk_entries": self._disk_entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
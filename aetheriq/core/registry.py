@@ -0,0 +1,143 @@
+"""
+Bounded, sharded registry of automation workflows
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+import zlib
+
+# Workflows in any other status may still be executed and are never evicted
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+# Entries examined per insert, so shards full of pinned workflows stay cheap
+EVICTION_SCAN_LIMIT = 32
+
+class FileWorkflowStore:
+    """Keeps evicted workflows as one JSON document per workflow"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _file(self, workflow_id: str) -> str:
+        return os.path.join(self.path, f"{workflow_id}.json")
+
+    def save(self, workflow_id: str, record: Dict[str, Any]) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        temp = f"{self._file(workflow_id)}.tmp"
+        with open(temp, "w") as f:
+            json.dump(record, f, default=str)
+        os.replace(temp, self._file(workflow_id))
+
+    def load(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._file(workflow_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+class WorkflowRegistry:
+    """In-memory workflow table split into independently locked shards.
+
+    Each shard keeps its workflows in LRU order and holds at most
+    ``max_entries / shards`` of them. When a shard is full the least
+    recently used finished workflow is handed to ``store`` (through
+    ``serialize``) and dropped from memory; lookups of an evicted id load
+    it back through ``deserialize``. Workflows that are not finished are
+    never evicted, so a shard may temporarily exceed its share; each insert
+    examines at most ``scan_limit`` entries from the LRU end and moves the
+    pinned ones it passes to the MRU end. Without a store nothing is
+    evicted, since an evicted workflow could not be found again.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        shards: int = 16,
+        store: Optional[Any] = None,
+        serialize: Callable[[Dict[str, Any]], Dict[str, Any]] = dict,
+        deserialize: Callable[[Dict[str, Any]], Dict[str, Any]] = dict,
+        pinned: Callable[[Dict[str, Any]], bool] = lambda workflow: workflow.get("status") not in TERMINAL_STATUSES,
+        scan_limit: int = EVICTION_SCAN_LIMIT
+    ):
+        self.shard_capacity = max(1, max_entries // shards)
+        self.store = store
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.pinned = pinned
+        self.scan_limit = scan_limit
+        self.logger = logging.getLogger(__name__)
+        self.evictions = 0
+        self._shards: List[Tuple["OrderedDict[str, Dict[str, Any]]", threading.Lock]] = [
+            (OrderedDict(), threading.Lock()) for _ in range(shards)
+        ]
+
+    def _shard(self, workflow_id: str):
+        return self._shards[zlib.crc32(workflow_id.encode()) % len(self._shards)]
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries, _ in self._shards)
+
+    def __contains__(self, workflow_id: str) -> bool:
+        return self.get(workflow_id) is not None
+
+    def __getitem__(self, workflow_id: str) -> Dict[str, Any]:
+        workflow = self.get(workflow_id)
+        if workflow is None:
+            raise KeyError(workflow_id)
+        return workflow
+
+    def __setitem__(self, workflow_id: str, workflow: Dict[str, Any]) -> None:
+        entries, lock = self._shard(workflow_id)
+        with lock:
+            entries[workflow_id] = workflow
+            entries.move_to_end(workflow_id)
+            self._evict(entries, workflow_id)
+
+    def get(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        entries, lock = self._shard(workflow_id)
+        with lock:
+            workflow = entries.get(workflow_id)
+            if workflow is not None:
+                entries.move_to_end(workflow_id)
+                return workflow
+            if self.store is None:
+                return None
+            record = self.store.load(workflow_id)
+            if record is None:
+                return None
+            workflow = self.deserialize(record)
+            entries[workflow_id] = workflow
+            self._evict(entries, workflow_id)
+            return workflow
+
+    def _evict(self, entries: "OrderedDict[str, Dict[str, Any]]", keep: str) -> None:
+        """Evict from the LRU end; ``keep`` was just stored or loaded for a caller"""
+        if self.store is None:
+            return
+        budget = min(len(entries), self.scan_limit)
+        while len(entries) > self.shard_capacity and budget > 0:
+            budget -= 1
+            workflow_id = next(iter(entries))
+            workflow = entries[workflow_id]
+            if workflow_id == keep or self.pinned(workflow):
+                # Out of the way of the next scan; pinned workflows are in use anyway
+                entries.move_to_end(workflow_id)
+                continue
+            try:
+                self.store.save(workflow_id, self.serialize(workflow))
+            except Exception as e:
+                self.logger.error(f"Could not store evicted workflow {workflow_id}, keeping it: {str(e)}")
+                entries.move_to_end(workflow_id)
+                continue
+            del entries[workflow_id]
+            self.evictions += 1
+
+    def ids(self) -> Iterator[str]:
+        """Ids of the workflows currently in memory"""
+        for entries, lock in self._shards:
+            with lock:
+                keys = list(entries)
+            yield from keys
@@ -0,0 +1,232 @@
+"""
+Partition-based data retention for time-series tables
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import os
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+RETENTION_MODE = os.getenv("RETENTION_MODE", "drop")  # "drop" or "detach" (keep for archiving)
+RETENTION_PREMAKE_PARTITIONS = int(os.getenv("RETENTION_PREMAKE_PARTITIONS", "3"))
+
+INTERVALS = ("day", "month")
+
+@dataclass
+class RetentionPolicy:
+    """Keep rows of ``table`` whose ``column`` is newer than ``retention_days``.
+
+    ``where`` limits the policy to rows with these column values, so one
+    table can keep different kinds of rows for different periods; such
+    policies always expire rows with DELETE, never whole partitions.
+    """
+    table: str
+    column: str
+    retention_days: int
+    interval: str = "month"  # Partition width: "day" or "month"
+    where: Optional[Dict[str, Any]] = None
+
+    @property
+    def name(self) -> str:
+        if not self.where:
+            return self.table
+        return f"{self.table}[{', '.join(f'{k}={v}' for k, v in sorted(self.where.items()))}]"
+
+def partition_start(ts: datetime, interval: str) -> datetime:
+    if interval == "day":
+        return datetime(ts.year, ts.month, ts.day)
+    return datetime(ts.year, ts.month, 1)
+
+def next_partition_start(start: datetime, interval: str) -> datetime:
+    if interval == "day":
+        return start + timedelta(days=1)
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+def partition_name(table: str, start: datetime, interval: str) -> str:
+    return f"{table}_p{start.strftime('%Y%m%d' if interval == 'day' else '%Y%m')}"
+
+def parse_partition(table: str, name: str, interval: str) -> Optional[Tuple[datetime, datetime]]:
+    """Bounds [start, end) of a partition created by the manager, None for any other child"""
+    prefix = f"{table}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        start = datetime.strptime(name[len(prefix):], "%Y%m%d" if interval == "day" else "%Y%m")
+    except ValueError:
+        return None
+    return start, next_partition_start(start, interval)
+
+class RetentionManager:
+    """Creates upcoming partitions and expires old ones for range-partitioned tables.
+
+    On Postgres tables partitioned by range on the policy column, expiry
+    detaches every partition whose whole range is older than the cutoff
+    and drops it (``mode="drop"``) or leaves it as a standalone table for
+    archiving (``mode="detach"``); either way the cost is a catalog change,
+    not a row scan. Partitions are pre-created ``premake`` intervals ahead
+    so new rows rarely land in the default partition, which is trimmed with
+    one set-based DELETE, as is any table that is not partitioned (e.g. SQLite).
+    Rows that did land in the default partition for a range that is being
+    created are moved into the new partition, and a failure to create
+    partitions never stops expiry.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        policies: List[RetentionPolicy],
+        mode: str = RETENTION_MODE,
+        premake: int = RETENTION_PREMAKE_PARTITIONS
+    ):
+        if mode not in ("drop", "detach"):
+            raise ValueError(f"Unknown retention mode {mode}; expected drop or detach")
+        for policy in policies:
+            if policy.interval not in INTERVALS:
+                raise ValueError(f"Unknown partition interval {policy.interval} for {policy.table}")
+        self.session_factory = session_factory
+        self.policies = policies
+        self.mode = mode
+        self.premake = premake
+        self.logger = logging.getLogger(__name__)
+
+    def _is_partitioned(self, db: Session, table: str) -> bool:
+        if db.get_bind().dialect.name != "postgresql":
+            return False
+        return db.execute(
+            text("SELECT relkind FROM pg_class WHERE relname = :table AND relkind = 'p'"),
+            {"table": table}
+        ).first() is not None
+
+    def _partitions(self, db: Session, table: str) -> List[str]:
+        return list(db.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :table"
+            ),
+            {"table": table}
+        ).scalars())
+
+    def _default_partition(self, db: Session, table: str) -> Optional[str]:
+        return db.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :table AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT'"
+            ),
+            {"table": table}
+        ).scalar()
+
+    def ensure_partitions(self, policy: RetentionPolicy, db: Session, now: datetime) -> List[str]:
+        """Create the current partition and the next ``premake`` ones if missing"""
+        existing = set(self._partitions(db, policy.table))
+        default = self._default_partition(db, policy.table)
+        created = []
+        start = partition_start(now, policy.interval)
+        for _ in range(self.premake + 1):
+            end = next_partition_start(start, policy.interval)
+            name = partition_name(policy.table, start, policy.interval)
+            if name not in existing:
+                self._create_partition(policy, db, name, start, end, default)
+                created.append(name)
+            start = end
+        return created
+
+    def _create_partition(
+        self,
+        policy: RetentionPolicy,
+        db: Session,
+        name: str,
+        start: datetime,
+        end: datetime,
+        default: Optional[str]
+    ) -> None:
+        bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        in_range = f'"{policy.column}" >= :start AND "{policy.column}" < :end'
+        stranded = default is not None and db.execute(
+            text(f'SELECT 1 FROM "{default}" WHERE {in_range} LIMIT 1'),
+            {"start": start, "end": end}
+        ).first() is not None
+        if not stranded:
+            db.execute(text(f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{policy.table}" FOR VALUES {bounds}'))
+            db.commit()
+            return
+        # Postgres refuses a partition whose range has rows in the default
+        # partition, so move them over with the default detached, in one transaction
+        db.execute(text(f'ALTER TABLE "{policy.table}" DETACH PARTITION "{default}"'))
+        db.execute(text(f'CREATE TABLE "{name}" PARTITION OF "{policy.table}" FOR VALUES {bounds}'))
+        moved = db.execute(
+            text(f'WITH moved AS (DELETE FROM "{default}" WHERE {in_range} RETURNING *) INSERT INTO "{name}" SELECT * FROM moved'),
+            {"start": start, "end": end}
+        ).rowcount
+        db.execute(text(f'ALTER TABLE "{policy.table}" ATTACH PARTITION "{default}" DEFAULT'))
+        db.commit()
+        self.logger.warning(f"Moved {moved} rows of {policy.table} from {default} into new partition {name}")
+
+    def expire(self, policy: RetentionPolicy, db: Session, now: datetime) -> Dict[str, Any]:
+        """Remove data older than the policy's cutoff; returns what was done"""
+        cutoff = now - timedelta(days=policy.retention_days)
+        result: Dict[str, Any] = {"cutoff": cutoff.isoformat(), "partitions": [], "rows_deleted": 0}
+        targets = [policy.table]
+        if not policy.where and self._is_partitioned(db, policy.table):
+            targets = []
+            for name in sorted(self._partitions(db, policy.table)):
+                bounds = parse_partition(policy.table, name, policy.interval)
+                if bounds is None:
+                    # Default (or foreign) partition: trim it row-wise below
+                    targets.append(name)
+                    continue
+                if bounds[1] <= cutoff:
+                    db.execute(text(f'ALTER TABLE "{policy.table}" DETACH PARTITION "{name}"'))
+                    if self.mode == "drop":
+                        db.execute(text(f'DROP TABLE "{name}"'))
+                    db.commit()
+                    result["partitions"].append(name)
+        where = policy.where or {}
+        conditions = "".join(f' AND "{column}" = :where_{i}' for i, column in enumerate(where))
+        params = {f"where_{i}": value for i, value in enumerate(where.values())}
+        for target in targets:
+            deleted = db.execute(
+                text(f'DELETE FROM "{target}" WHERE "{policy.column}" < :cutoff{conditions}'),
+                {"cutoff": cutoff, **params}
+            ).rowcount
+            db.commit()
+            result["rows_deleted"] += max(deleted or 0, 0)
+        return result
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+        """Pre-create partitions and apply every policy"""
+        now = now or datetime.utcnow()
+        report = {}
+        with self.session_factory() as db:
+            for policy in self.policies:
+                created = []
+                partition_error = None
+                try:
+                    if not policy.where and self._is_partitioned(db, policy.table):
+                        created = self.ensure_partitions(policy, db, now)
+                except Exception as e:
+                    # Expiry does not depend on the new partitions, keep going
+                    db.rollback()
+                    partition_error = str(e)
+                    self.logger.error(f"Creating partitions failed for {policy.name}: {partition_error}")
+                try:
+                    report[policy.name] = {**self.expire(policy, db, now), "created": created}
+                    if partition_error:
+                        report[policy.name]["partition_error"] = partition_error
+                    self.logger.info(
+                        f"Retention for {policy.name}: {len(report[policy.name]['partitions'])} partitions "
+                        f"{'dropped' if self.mode == 'drop' else 'detached'}, "
+                        f"{report[policy.name]['rows_deleted']} rows deleted"
+                    )
+                except Exception as e:
+                    db.rollback()
+                    self.logger.error(f"Retention failed for {policy.name}: {str(e)}")
+                    report[policy.name] = {"error": str(e)}
+        return report
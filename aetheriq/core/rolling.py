@@ -0,0 +1,78 @@
+"""
+Rolling execution statistics over sliding time windows
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, Optional
+import time
+
+import numpy as np
+
+# Upper bounds (seconds) of the latency histogram bins; the last bin is overflow
+LATENCY_BOUNDS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300]
+
+_COUNT, _SUCCESS, _LATENCY_SUM = 0, 1, 2
+_BINS = 3
+
+class RollingStats:
+    """Success rate and latency histogram over a sliding window.
+
+    The window is a ring of ``buckets`` time slices. Recording an execution
+    touches one slice (resetting it first if it belongs to an earlier lap of
+    the ring) and one histogram bin, so the cost is O(1) however busy the
+    workflow is. Reads sum the slices still inside the window.
+    """
+
+    def __init__(self, window_seconds: float = 300, buckets: int = 12, clock=time.monotonic):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = window_seconds / buckets
+        self.clock = clock
+        self._slots = np.zeros((buckets, _BINS + len(LATENCY_BOUNDS) + 1), dtype=np.float64)
+        self._epochs = np.full(buckets, -1, dtype=np.int64)
+
+    def _slot(self, now: float) -> np.ndarray:
+        epoch = int(now // self.bucket_seconds)
+        index = epoch % len(self._epochs)
+        if self._epochs[index] != epoch:
+            self._slots[index] = 0
+            self._epochs[index] = epoch
+        return self._slots[index]
+
+    def record(self, duration: float, success: bool, now: Optional[float] = None) -> None:
+        slot = self._slot(self.clock() if now is None else now)
+        slot[_COUNT] += 1
+        slot[_SUCCESS] += success
+        slot[_LATENCY_SUM] += duration
+        slot[_BINS + bisect_left(LATENCY_BOUNDS, duration)] += 1
+
+    def _window(self, now: float) -> np.ndarray:
+        oldest = int(now // self.bucket_seconds) - len(self._epochs) + 1
+        return self._slots[self._epochs >= oldest].sum(axis=0)
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Any]:
+        totals = self._window(self.clock() if now is None else now)
+        count = int(totals[_COUNT])
+        histogram = totals[_BINS:]
+        return {
+            "window_seconds": self.window_seconds,
+            "executions": count,
+            "success_rate": totals[_SUCCESS] / count * 100 if count else 100.0,
+            "average_latency": totals[_LATENCY_SUM] / count if count else 0.0,
+            "p50_latency": _quantile(histogram, 0.5),
+            "p95_latency": _quantile(histogram, 0.95),
+            "p99_latency": _quantile(histogram, 0.99),
+            "latency_histogram": {
+                _label(i): int(n) for i, n in enumerate(histogram) if n
+            }
+        }
+
+def _label(index: int) -> str:
+    return f"le_{LATENCY_BOUNDS[index]}" if index < len(LATENCY_BOUNDS) else "overflow"
+
+def _quantile(histogram: np.ndarray, q: float) -> Optional[float]:
+    """Upper bound of the bin holding the q-th quantile"""
+    total = histogram.sum()
+    if not total:
+        return None
+    index = int(np.searchsorted(np.cumsum(histogram), q * total))
+    return LATENCY_BOUNDS[index] if index < len(LATENCY_BOUNDS) else float("inf")
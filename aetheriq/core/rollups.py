@@ -0,0 +1,320 @@
+"""
+Continuous time-series rollups for analytics metrics
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import math
+
+from sqlalchemy import and_, bindparam, func, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from aetheriq.core.stats import RunningStats, TDigest
+
+# Coarsest first; reports cover a range with as many coarse buckets as fit
+RESOLUTIONS: List[Tuple[str, timedelta]] = [
+    ("day", timedelta(days=1)),
+    ("hour", timedelta(hours=1)),
+    ("minute", timedelta(minutes=1))
+]
+EVENTS_FIELD = "_events"
+KEY_COLUMNS = ("resolution", "bucket_start", "metric_name", "field")
+_EPOCH = datetime(1970, 1, 1)
+
+def floor_time(ts: datetime, step: timedelta) -> datetime:
+    return _EPOCH + ((ts - _EPOCH) // step) * step
+
+def ceil_time(ts: datetime, step: timedelta) -> datetime:
+    floored = floor_time(ts, step)
+    return floored if floored == ts else floored + step
+
+def cover(
+    start: datetime,
+    end: datetime,
+    resolutions: List[Tuple[str, timedelta]] = RESOLUTIONS,
+    horizons: Optional[Dict[str, datetime]] = None
+) -> List[Tuple[str, datetime, datetime]]:
+    """Split the minute-aligned range [start, end) into the fewest rollup buckets.
+
+    Returns (resolution, low, high) segments: whole days in the middle,
+    whole hours next to them and minutes only at the ragged edges, so the
+    number of rows read grows with the number of days, not with the data.
+
+    ``horizons`` maps a resolution to its oldest retained bucket. An edge
+    older than the finer resolution's horizon is widened to a whole bucket
+    of the coarser one, so the segments may extend past [start, end) but
+    never ask for rows that retention has deleted.
+    """
+    if start >= end:
+        return []
+    name, step = resolutions[0]
+    if len(resolutions) == 1:
+        return [(name, start, end)]
+    horizon = (horizons or {}).get(resolutions[1][0])
+    if horizon is not None:
+        # The finer resolutions cannot serve anything before their horizon
+        if start < horizon:
+            start = floor_time(start, step)
+        if floor_time(end, step) < horizon:
+            end = ceil_time(end, step)
+    low, high = ceil_time(start, step), floor_time(end, step)
+    if low >= high:
+        return cover(start, end, resolutions[1:], horizons)
+    return (
+        cover(start, low, resolutions[1:], horizons)
+        + [(name, low, high)]
+        + cover(high, end, resolutions[1:], horizons)
+    )
+
+def numeric_fields(data: Dict[str, Any]) -> Dict[str, float]:
+    """Numeric top-level values of a processed analytics payload"""
+    values = {}
+    for source in (data.get("raw_data") or {}, data):
+        if not isinstance(source, dict):
+            continue
+        for key, value in source.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+                values[key] = float(value)
+    return values
+
+class RollupStore:
+    """Maintains per-minute, per-hour and per-day aggregates of analytics values.
+
+    Each (resolution, bucket, metric, field) row keeps count, sum, sum of
+    squares, min and max, which is enough to merge buckets and derive mean,
+    standard deviation and extremes for any range without raw rows, plus a
+    t-digest sketch that merges into approximate quantiles for the range.
+
+    ``retention_days`` gives how long each resolution is kept; ranges
+    reaching past a resolution's retention are served from coarser buckets.
+    """
+
+    def __init__(self, model, compression: float = 100, retention_days: Optional[Dict[str, int]] = None):
+        self.model = model
+        self.table = model.__table__
+        self.compression = compression
+        self.retention_days = retention_days or {}
+
+    def segments(self, start: datetime, end: datetime, now: Optional[datetime] = None) -> List[Tuple[str, datetime, datetime]]:
+        """Rollup segments covering [start, end), widened to whole minutes and to retained buckets"""
+        now = now or datetime.utcnow()
+        horizons = {resolution: now - timedelta(days=days) for resolution, days in self.retention_days.items()}
+        return cover(floor_time(start, timedelta(minutes=1)), ceil_time(end, timedelta(minutes=1)), horizons=horizons)
+
+    def aggregate(self, items: Iterable[Dict[str, Any]]) -> Dict[Tuple[str, datetime, str, str], List[Any]]:
+        """Fold queued items into rollup deltas, keyed by (resolution, bucket_start, metric, field).
+
+        Each delta is [count, sum, mean, m2, min, max, values], with mean and
+        m2 (sum of squared deviations) kept by Welford's update so the
+        variance of large, tightly clustered values survives; the values
+        feed the bucket's digest.
+        """
+        deltas: Dict[Tuple[str, datetime, str, str], List[Any]] = {}
+        for item in items:
+            values = numeric_fields(item["data"])
+            values[EVENTS_FIELD] = 1.0
+            for resolution, step in RESOLUTIONS:
+                bucket = floor_time(item["timestamp"], step)
+                for field, value in values.items():
+                    key = (resolution, bucket, item["type"], field)
+                    delta = deltas.get(key)
+                    if delta is None:
+                        deltas[key] = [1, value, value, 0.0, value, value, [value]]
+                    else:
+                        delta[0] += 1
+                        delta[1] += value
+                        diff = value - delta[2]
+                        delta[2] += diff / delta[0]
+                        delta[3] += diff * (value - delta[2])
+                        delta[4] = min(delta[4], value)
+                        delta[5] = max(delta[5], value)
+                        delta[6].append(value)
+        return deltas
+
+    def apply(self, db: Session, items: Iterable[Dict[str, Any]]) -> int:
+        """Merge a batch of queued items into the rollups; returns the rows touched"""
+        deltas = self.aggregate(items)
+        if not deltas:
+            return 0
+        rows = [
+            {
+                "resolution": resolution, "bucket_start": bucket, "metric_name": metric, "field": field,
+                "count": count, "sum": total, "mean": mean, "m2": m2, "min": low, "max": high
+            }
+            # Key order keeps concurrent writers locking rows in the same order
+            for (resolution, bucket, metric, field), (count, total, mean, m2, low, high, _) in sorted(deltas.items())
+        ]
+        t = self.table
+        if db.bind.dialect.name == "postgresql":
+            stmt = pg_insert(t)
+            least, greatest = func.least, func.greatest
+        else:
+            stmt = sqlite_insert(t)
+            # SQLite's multi-argument min/max are scalar functions
+            least, greatest = func.min, func.max
+        # Chan's parallel merge of (count, mean, m2); every right-hand side reads the stored row
+        shift = stmt.excluded.mean - t.c.mean
+        total = t.c.count + stmt.excluded.count
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["resolution", "bucket_start", "metric_name", "field"],
+            set_={
+                "count": total,
+                "sum": t.c.sum + stmt.excluded.sum,
+                "mean": t.c.mean + shift * stmt.excluded.count / total,
+                "m2": t.c.m2 + stmt.excluded.m2 + shift * shift * t.c.count * stmt.excluded.count / total,
+                "min": least(t.c.min, stmt.excluded.min),
+                "max": greatest(t.c.max, stmt.excluded.max)
+            }
+        )
+        db.execute(stmt, rows)
+        self._merge_digests(db, deltas)
+        return len(rows)
+
+    def _merge_digests(self, db: Session, deltas: Dict[Tuple[str, datetime, str, str], List[Any]]) -> None:
+        """Fold the batch's values into the stored digests.
+
+        Runs after the upsert, which holds the row locks until commit, so
+        the read-merge-write cannot interleave with another writer.
+        """
+        t = self.table
+        keys = [key for key in sorted(deltas) if key[3] != EVENTS_FIELD]
+        updates = []
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            stored = {
+                tuple(row[:4]): row[4]
+                for row in db.execute(
+                    select(*(t.c[name] for name in KEY_COLUMNS), t.c.digest)
+                    .where(tuple_(*(t.c[name] for name in KEY_COLUMNS)).in_(chunk))
+                )
+            }
+            for key in chunk:
+                digest = TDigest.from_dict(stored.get(key)) if stored.get(key) else TDigest(self.compression)
+                digest.update_many(deltas[key][6])
+                updates.append({**{f"_{name}": value for name, value in zip(KEY_COLUMNS, key)}, "digest": digest.to_dict()})
+        if updates:
+            db.execute(
+                update(t)
+                .where(and_(*(t.c[name] == bindparam(f"_{name}") for name in KEY_COLUMNS)))
+                .values(digest=bindparam("digest")),
+                updates
+            )
+
+    def buckets(
+        self,
+        db: Session,
+        start: datetime,
+        end: datetime,
+        segments: Optional[List[Tuple[str, datetime, datetime]]] = None
+    ) -> List[Any]:
+        """Rollup rows covering [start, end), widened as in ``segments``"""
+        m = self.model
+        if segments is None:
+            segments = self.segments(start, end)
+        if not segments:
+            return []
+        return db.execute(
+            select(
+                m.resolution, m.bucket_start, m.metric_name, m.field,
+                m.count, m.sum, m.mean, m.m2, m.min, m.max, m.digest
+            )
+            .where(or_(*(
+                and_(m.resolution == resolution, m.bucket_start >= low, m.bucket_start < high)
+                for resolution, low, high in segments
+            )))
+            .order_by(m.bucket_start)
+        ).all()
+
+    def report(self, db: Session, start: datetime, end: datetime) -> Dict[str, Any]:
+        """Metrics, trends and insights for a range, in one pass over its rollup rows.
+
+        Per field, bucket moments merge into exact count/mean/std/min/max,
+        bucket digests merge into approximate quantiles, and bucket means
+        feed a count-weighted regression on time for the trend slope. The
+        report's ``period`` is the range actually covered, which is wider
+        than requested where old edges only survive in coarser buckets.
+        """
+        steps = dict(RESOLUTIONS)
+        segments = self.segments(start, end)
+        values: Dict[Tuple[str, str], RunningStats] = {}
+        digests: Dict[Tuple[str, str], TDigest] = {}
+        slopes: Dict[Tuple[str, str], RunningStats] = {}
+        periods = {"daily": defaultdict(dict), "weekly": defaultdict(dict), "monthly": defaultdict(dict)}
+
+        for row in self.buckets(db, start, end, segments):
+            key = (row.metric_name, row.field)
+            stats = values.get(key)
+            if stats is None:
+                stats = values[key] = RunningStats()
+            stats.merge(RunningStats.from_moments(row.count, row.mean, row.m2, row.min, row.max))
+            if row.field == EVENTS_FIELD:
+                continue
+            if row.digest:
+                digests.setdefault(key, TDigest(self.compression)).merge(TDigest.from_dict(row.digest))
+            midpoint = row.bucket_start + steps[row.resolution] / 2
+            slopes.setdefault(key, RunningStats()).update(
+                row.mean, x=(midpoint - start).total_seconds() / 3600, weight=row.count
+            )
+            name = f"{row.metric_name}.{row.field}"
+            day = row.bucket_start.date()
+            week = day - timedelta(days=day.weekday())
+            for period, period_key in (("daily", day.isoformat()), ("weekly", week.isoformat()), ("monthly", day.strftime("%Y-%m"))):
+                acc = periods[period][name].setdefault(period_key, [0, 0.0])
+                acc[0] += row.count
+                acc[1] += row.sum
+
+        metrics: Dict[str, Any] = {}
+        insights: List[Dict[str, Any]] = []
+        for (metric, field), stats in values.items():
+            entry = metrics.setdefault(metric, {"events": 0, "fields": {}})
+            if field == EVENTS_FIELD:
+                entry["events"] = int(stats.count)
+                continue
+            digest = digests.get((metric, field))
+            entry["fields"][field] = _describe(stats, digest)
+            insights.extend(_insights(f"{metric}.{field}", stats, digest, slopes[(metric, field)]))
+
+        trends = {
+            period: {name: {key: acc[1] / acc[0] for key, acc in sorted(buckets.items())} for name, buckets in by_name.items()}
+            for period, by_name in periods.items()
+        }
+        report = {"metrics": metrics, "trends": trends, "insights": insights}
+        if segments and (segments[0][1] < start or segments[-1][2] > end):
+            report["period"] = {"start": segments[0][1].isoformat(), "end": segments[-1][2].isoformat()}
+        return report
+
+def _describe(stats: RunningStats, digest: Optional[TDigest]) -> Dict[str, Any]:
+    described = {
+        "count": int(stats.count),
+        "mean": stats.mean,
+        "std": stats.std,
+        "min": stats.min,
+        "max": stats.max
+    }
+    if digest is not None:
+        described.update({f"p{int(q * 100)}": digest.quantile(q) for q in (0.5, 0.9, 0.99)})
+    return described
+
+def _insights(name: str, stats: RunningStats, digest: Optional[TDigest], trend: RunningStats) -> List[Dict[str, Any]]:
+    """Trend (change per hour) and 2-sigma anomaly insights for one field"""
+    insights = []
+    if abs(trend.slope) > 0.1:  # Significant trend threshold
+        insights.append({
+            "type": "trend",
+            "metric": name,
+            "trend": "increasing" if trend.slope > 0 else "decreasing",
+            "magnitude": abs(trend.slope)
+        })
+    # Estimated from the digest's CDF, so no second pass over values is needed
+    anomalies = round(stats.anomaly_count(digest)) if digest is not None else 0
+    if anomalies > 0:
+        insights.append({
+            "type": "anomaly",
+            "metric": name,
+            "count": anomalies,
+            "threshold": stats.mean + 2 * stats.std
+        })
+    return insights
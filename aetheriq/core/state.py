@@ -0,0 +1,258 @@
+"""
+Write-behind persistence of workflow and task state transitions
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+class StateWriter:
+    """Coalesces state transitions in memory and writes them in batches.
+
+    ``record`` merges the changed fields into the pending row for that id,
+    so a task that goes pending -> running -> completed between two flushes
+    costs a single UPDATE. Pending rows are flushed every ``flush_interval``
+    seconds (or on ``flush``) as one executemany UPDATE per table and field
+    set, in one transaction. Rows queued with ``append`` are inserted in
+    the same transaction; they need a deterministic primary key, since
+    inserts skip ids that already exist so a replayed row is not duplicated.
+
+    Every transition is appended to an intent log before it is acknowledged.
+    The log rotates at each flush and a segment is deleted only after its
+    transitions are committed, so leftover segments are replayed on start.
+    Log lines are flushed to the OS on write, which survives a process
+    crash; set ``sync`` to fsync each record and survive a host crash too.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        models: Dict[str, Any],
+        log_dir: str = "var/workflow-state",
+        flush_interval: float = 0.5,
+        sync: bool = False
+    ):
+        self.session_factory = session_factory
+        self.models = models
+        self.log_dir = log_dir
+        self.flush_interval = flush_interval
+        self.sync = sync
+        self.logger = logging.getLogger(__name__)
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._inserts: List[Tuple[str, Dict[str, Any]]] = []
+        self._segments: List[str] = []
+        self._log = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _open_segment(self) -> None:
+        os.makedirs(self.log_dir, exist_ok=True)
+        path = os.path.join(self.log_dir, f"state-{time.time_ns()}.log")
+        self._log = open(path, "a")
+        self._segments.append(path)
+
+    def record(self, kind: str, row_id: Any, **fields: Any) -> None:
+        """Log a transition and merge it into the pending row"""
+        if kind not in self.models:
+            raise ValueError(f"Unknown state kind: {kind}")
+        with self._lock:
+            self._write_log({"kind": kind, "id": str(row_id), "fields": fields})
+            self._pending.setdefault((kind, str(row_id)), {}).update(fields)
+
+    def append(self, kind: str, values: Dict[str, Any]) -> None:
+        """Log a new row and queue it for insertion"""
+        if kind not in self.models:
+            raise ValueError(f"Unknown state kind: {kind}")
+        with self._lock:
+            self._write_log({"kind": kind, "op": "insert", "values": values})
+            self._inserts.append((kind, values))
+
+    def _write_log(self, entry: Dict[str, Any]) -> None:
+        if self._log is None:
+            self._open_segment()
+        self._log.write(json.dumps(entry, default=_encode) + "\n")
+        self._log.flush()
+        if self.sync:
+            os.fsync(self._log.fileno())
+
+    def pending(self) -> int:
+        return len(self._pending) + len(self._inserts)
+
+    def recover(self) -> int:
+        """Load transitions from intent log segments left by a previous run"""
+        recovered: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        inserts: List[Tuple[str, Dict[str, Any]]] = []
+        segments = []
+        count = 0
+        for path in sorted(glob.glob(os.path.join(self.log_dir, "state-*.log"))):
+            if path in self._segments:
+                continue
+            segments.append(path)
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn final line from the crash
+                        continue
+                    model = self.models.get(entry["kind"])
+                    if model is None:
+                        continue
+                    if entry.get("op") == "insert":
+                        inserts.append((entry["kind"], _decode(model, entry["values"])))
+                    else:
+                        recovered.setdefault((entry["kind"], entry["id"]), {}).update(_decode(model, entry["fields"]))
+                    count += 1
+
+        with self._lock:
+            # Transitions recorded by this process are newer
+            for key, fields in self._pending.items():
+                recovered.setdefault(key, {}).update(fields)
+            self._pending = recovered
+            self._inserts = inserts + self._inserts
+            self._segments = segments + self._segments
+        if count:
+            self.logger.info(f"Recovered {count} workflow state transitions from {len(segments)} log segments")
+        return count
+
+    def flush(self) -> int:
+        """Write every pending transition in one transaction; returns rows written"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending and not self._inserts:
+                    return 0
+                batch, self._pending = self._pending, {}
+                inserts, self._inserts = self._inserts, []
+                segments, self._segments = self._segments, []
+                if self._log is not None:
+                    self._log.close()
+                    self._log = None
+
+            try:
+                self._write(batch, inserts)
+            except Exception as e:
+                self.logger.error(
+                    f"Failed to flush {len(batch) + len(inserts)} state transitions, will retry: {str(e)}"
+                )
+                with self._lock:
+                    # Newer transitions recorded meanwhile win over the failed batch
+                    for key, fields in self._pending.items():
+                        batch.setdefault(key, {}).update(fields)
+                    self._pending = batch
+                    self._inserts = inserts + self._inserts
+                    self._segments = segments + self._segments
+                raise
+
+            for path in segments:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            return len(batch) + len(inserts)
+
+    def _write(self, batch: Dict[Tuple[str, str], Dict[str, Any]], inserts: List[Tuple[str, Dict[str, Any]]]) -> None:
+        new_rows: Dict[str, List[Dict[str, Any]]] = {}
+        for kind, values in inserts:
+            new_rows.setdefault(kind, []).append(values)
+
+        groups: Dict[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        for (kind, row_id), fields in batch.items():
+            groups.setdefault((kind, tuple(sorted(fields))), []).append(
+                {"_id": _coerce_id(self.models[kind], row_id), **fields}
+            )
+
+        session = self.session_factory()
+        try:
+            for kind, rows in new_rows.items():
+                table = self.models[kind].__table__
+                if session.get_bind().dialect.name == "postgresql":
+                    statement = pg_insert(table).on_conflict_do_nothing(index_elements=["id"])
+                else:
+                    statement = insert(table).prefix_with("OR IGNORE", dialect="sqlite")
+                session.execute(statement, rows)
+            for (kind, field_names), rows in groups.items():
+                table = self.models[kind].__table__
+                statement = update(table)\
+                    .where(table.c.id == bindparam("_id"))\
+                    .values({name: bindparam(name) for name in field_names})
+                session.execute(statement, rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    async def flush_async(self) -> int:
+        return await asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    async def start(self) -> None:
+        self.recover()
+        try:
+            await self.flush_async()
+        except Exception:
+            pass
+        self._task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush_async()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush_async()
+            except Exception:
+                # Logged by flush; the transitions stay pending
+                pass
+
+def _coerce_id(model: Any, row_id: str) -> Any:
+    if getattr(model.__table__.c.id.type, "as_uuid", False):
+        return UUID(row_id)
+    return row_id
+
+def encode_datetime(value: Any) -> Any:
+    """``json.dumps`` default: datetimes become tagged objects, anything else its str()"""
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    return str(value)
+
+def decode_datetime(value: Dict[str, Any]) -> Any:
+    """``json.loads`` object hook reversing ``encode_datetime``"""
+    if "__datetime__" in value and len(value) == 1:
+        return datetime.fromisoformat(value["__datetime__"])
+    return value
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return {"__enum__": value.name}
+    return encode_datetime(value)
+
+def _decode(model: Any, fields: Dict[str, Any]) -> Dict[str, Any]:
+    decoded = {}
+    for key, value in fields.items():
+        if isinstance(value, dict) and "__datetime__" in value:
+            value = decode_datetime(value)
+        elif isinstance(value, dict) and "__enum__" in value:
+            value = model.__table__.c[key].type.enum_class[value["__enum__"]]
+        elif isinstance(value, str) and getattr(model.__table__.c[key].type, "as_uuid", False):
+            value = UUID(value)
+        decoded[key] = value
+    return decoded
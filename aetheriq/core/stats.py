@@ -0,0 +1,225 @@
+"""
+Single-pass streaming statistics and mergeable quantile sketches
+"""
+
+from typing import Any, Dict, Optional
+import math
+
+import numpy as np
+
+class RunningStats:
+    """Count, mean, variance, min/max and least-squares slope, updated incrementally.
+
+    ``update`` is a weighted Welford step; ``update_many`` reduces a whole
+    array with numpy and folds it in with the parallel (Chan) merge, so
+    either way every value is visited once. The slope regresses values on
+    ``x`` (the running index when no ``x`` is given). Weights are frequency
+    weights, so a bucket mean with weight n counts as n observations.
+    """
+
+    def __init__(self):
+        self.count = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.mean_x = 0.0
+        self.m2_x = 0.0
+        self.c_xy = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @classmethod
+    def from_moments(cls, count: float, mean: float, m2: float, low: float, high: float) -> "RunningStats":
+        """Stats of a group known only by its count, mean and sum of squared deviations"""
+        stats = cls()
+        if count:
+            stats.count = float(count)
+            stats.mean = mean
+            stats.m2 = max(m2, 0.0)
+            stats.min, stats.max = low, high
+        return stats
+
+    def update(self, value: float, x: Optional[float] = None, weight: float = 1.0) -> None:
+        if x is None:
+            x = self.count
+        total = self.count + weight
+        dx = x - self.mean_x
+        dy = value - self.mean
+        self.mean_x += dx * weight / total
+        self.mean += dy * weight / total
+        self.m2 += weight * dy * (value - self.mean)
+        self.m2_x += weight * dx * (x - self.mean_x)
+        self.c_xy += weight * dx * (value - self.mean)
+        self.count = total
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def update_many(self, values, xs=None, weights=None) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if not values.size:
+            return
+        if xs is None:
+            xs = self.count + np.arange(values.size, dtype=np.float64)
+        xs = np.asarray(xs, dtype=np.float64)
+        weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=np.float64)
+        batch = RunningStats()
+        batch.count = weights.sum()
+        batch.mean = float(np.dot(weights, values) / batch.count)
+        batch.mean_x = float(np.dot(weights, xs) / batch.count)
+        dy = values - batch.mean
+        dx = xs - batch.mean_x
+        batch.m2 = float(np.dot(weights, dy * dy))
+        batch.m2_x = float(np.dot(weights, dx * dx))
+        batch.c_xy = float(np.dot(weights, dx * dy))
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other: "RunningStats") -> None:
+        if not other.count:
+            return
+        if not self.count:
+            self.__dict__.update(other.__dict__)
+            return
+        total = self.count + other.count
+        dy = other.mean - self.mean
+        dx = other.mean_x - self.mean_x
+        factor = self.count * other.count / total
+        self.m2 += other.m2 + dy * dy * factor
+        self.m2_x += other.m2_x + dx * dx * factor
+        self.c_xy += other.c_xy + dx * dy * factor
+        self.mean += dy * other.count / total
+        self.mean_x += dx * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(self.variance, 0.0))
+
+    @property
+    def slope(self) -> float:
+        return self.c_xy / self.m2_x if self.m2_x > 0 else 0.0
+
+    def anomaly_count(self, digest: "TDigest", sigmas: float = 2.0) -> float:
+        """Estimated number of values more than ``sigmas`` std from the mean"""
+        if not self.count or not self.std:
+            return 0.0
+        low, high = self.mean - sigmas * self.std, self.mean + sigmas * self.std
+        return digest.count * (digest.cdf(low) + 1.0 - digest.cdf(high))
+
+class TDigest:
+    """Merging t-digest (Dunning) for approximate quantiles over unbounded streams.
+
+    Values are buffered and compressed into at most about ``compression``
+    centroids whose size is bounded by the arcsine scale function, which
+    keeps the tails precise. Digests merge, so per-bucket sketches can be
+    combined into a sketch for any range, and serialize to plain dicts.
+    """
+
+    def __init__(self, compression: float = 100, buffer_size: Optional[int] = None):
+        self.compression = compression
+        self.buffer_size = buffer_size or int(compression * 10)
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer_means = []
+        self._buffer_weights = []
+        self._buffered = 0
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum()) + sum(float(w.sum()) for w in self._buffer_weights)
+
+    def update(self, value: float, weight: float = 1.0) -> None:
+        self.update_many(np.array([value], dtype=np.float64), np.array([weight], dtype=np.float64))
+
+    def update_many(self, values, weights=None) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if not values.size:
+            return
+        weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=np.float64)
+        self._buffer_means.append(values)
+        self._buffer_weights.append(weights)
+        self._buffered += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if self._buffered >= self.buffer_size:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> None:
+        other._compress()
+        if other.weights.size:
+            self._buffer_means.append(other.means)
+            self._buffer_weights.append(other.weights)
+            self._buffered += other.means.size
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            if self._buffered >= self.buffer_size:
+                self._compress()
+
+    def _compress(self) -> None:
+        if not self._buffered:
+            return
+        means = np.concatenate([self.means] + self._buffer_means)
+        weights = np.concatenate([self.weights] + self._buffer_weights)
+        self._buffer_means, self._buffer_weights, self._buffered = [], [], 0
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # Arcsine scale: a centroid may span at most one unit of k
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / math.pi * np.arcsin(np.clip(2 * q - 1, -1, 1))
+        groups = np.floor(k - k[0]).astype(np.int64)
+        merged_weights = np.bincount(groups, weights=weights)
+        merged_sums = np.bincount(groups, weights=weights * means)
+        keep = merged_weights > 0
+        self.weights = merged_weights[keep]
+        self.means = merged_sums[keep] / self.weights
+
+    def _curve(self):
+        self._compress()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        total = float(self.weights.sum())
+        return (
+            np.concatenate(([self.min], self.means, [self.max])),
+            np.concatenate(([0.0], centers, [total])),
+            total
+        )
+
+    def quantile(self, q: float) -> Optional[float]:
+        means, positions, total = self._curve()
+        if not total:
+            return None
+        return float(np.interp(q * total, positions, means))
+
+    def cdf(self, value: float) -> float:
+        means, positions, total = self._curve()
+        if not total:
+            return 0.0
+        return float(np.interp(value, means, positions)) / total
+
+    def to_dict(self) -> Dict[str, Any]:
+        self._compress()
+        return {
+            "compression": self.compression,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist(),
+            "min": self.min if self.weights.size else None,
+            "max": self.max if self.weights.size else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "TDigest":
+        digest = cls((data or {}).get("compression", 100))
+        if data and data.get("weights"):
+            digest.means = np.asarray(data["means"], dtype=np.float64)
+            digest.weights = np.asarray(data["weights"], dtype=np.float64)
+            digest.min = data["min"]
+            digest.max = data["max"]
+        return digest
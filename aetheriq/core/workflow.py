@@ -9,14 +9,24 @@ import json
 import logging
 from enum import Enum
 from dataclasses import dataclass
-from uuid import UUID, uuid4
+from uuid import UUID, uuid4, uuid5
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException
 
-from aetheriq.db.session import get_db
+from aetheriq.core.admission import AdmissionEntry, AdmissionQueue
+from aetheriq.core.dag import TaskGraph, run_task_graph
+from aetheriq.core.dispatch import WorkflowDispatcher, create_dispatcher
+from aetheriq.core.distributed import RemoteTaskRunner, TaskWorker, create_work_queue, default_node_id
+from aetheriq.core.memo import MISSING, TaskResultCache
+from aetheriq.core.executors import DEFAULT_POOLS, TaskExecutionPolicy, TaskExecutorPools
+from aetheriq.core.state import StateWriter
+from aetheriq.db.session import SessionLocal
 from aetheriq.crud.base import CRUDBase
-from aetheriq.db.models import Workflow as WorkflowModel
+from aetheriq.db.models import Workflow as WorkflowModel, WorkflowTask as WorkflowTaskModel
+from aetheriq.db.models import WorkflowCheckpoint
+from aetheriq.db.models import WorkflowStatus as DBWorkflowStatus
 from aetheriq.schemas.base import Workflow, WorkflowCreate, WorkflowUpdate
 
 class WorkflowStatus(str, Enum):
@@ -52,6 +62,11 @@ class WorkflowTask:
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     retry_count: int = 0
+    idempotent: bool = False
+    cache_hit: bool = False
+
+# Checkpoint ids are derived from workflow and task ids so a replayed insert is a no-op
+CHECKPOINT_NAMESPACE = UUID("5c1f6a8e-3d2b-4f0a-9b7e-1a4c2d6e8f90")
 
 class WorkflowEngine:
     """Workflow engine for managing and executing automation tasks"""
@@ -63,23 +78,92 @@ class WorkflowEngine:
         self.max_concurrent_workflows = config.get("max_concurrent_workflows", 10)
         self.max_task_retries = config.get("max_task_retries", 3)
         self.task_timeout = config.get("task_timeout_seconds", 300)
+        self.reconcile_interval = config.get("reconcile_interval_seconds", 60)
+        self.reconcile_batch_size = config.get("reconcile_batch_size", 1000)
+        self.resume_stale_after = config.get("resume_stale_after_seconds", 900)
+        self.heartbeat_interval = config.get("workflow_heartbeat_seconds", 60)
+        self.dispatcher: WorkflowDispatcher = create_dispatcher(config)
         self.crud = CRUDBase[WorkflowModel, Workflow, WorkflowUpdate](WorkflowModel)
         self.active_workflows: Dict[str, asyncio.Task] = {}
         self.task_registry: Dict[str, callable] = {}
+        self.executor_pools = TaskExecutorPools(
+            {
+                "thread": {"mode": "thread", "max_workers": config.get("thread_pool_workers", 8)},
+                "process": {"mode": "process", "max_workers": config.get("process_pool_workers", DEFAULT_POOLS["process"]["max_workers"])},
+                **config.get("task_pools", {})
+            },
+            shared_memory_threshold=config.get("shared_memory_threshold_bytes", 1 << 20)
+        )
+        self.task_policies: Dict[str, TaskExecutionPolicy] = {
+            task_type: TaskExecutionPolicy(pool)
+            for task_type, pool in config.get("task_execution", {}).items()
+        }
         self.is_running = False
         self.background_tasks = []
+        self.state = StateWriter(
+            SessionLocal,
+            {"workflow": WorkflowModel, "task": WorkflowTaskModel, "checkpoint": WorkflowCheckpoint},
+            log_dir=config.get("state_log_dir", "var/workflow-state"),
+            flush_interval=config.get("state_flush_interval_seconds", 0.5),
+            sync=config.get("state_log_fsync", False)
+        )
+        self.result_cache = TaskResultCache(
+            max_entries=config.get("task_cache_size", 1024),
+            ttl=config.get("task_cache_ttl_seconds", 3600),
+            path=config.get("task_cache_dir")
+        )
+        self.idempotent_task_types = set()
+
+        # Distributed mode publishes ready tasks to a shared work queue; every
+        # node runs a worker that claims tasks from it, including other nodes' tasks
+        self.node_id = config.get("node_id") or default_node_id()
+        self.work_queue = None
+        self.remote_tasks: Optional[RemoteTaskRunner] = None
+        self.task_worker: Optional[TaskWorker] = None
+        if config.get("execution_mode", "local") == "distributed":
+            self.work_queue = create_work_queue(config)
+            self.remote_tasks = RemoteTaskRunner(self.work_queue, self.node_id)
+            if config.get("run_task_worker", True):
+                self.task_worker = TaskWorker(
+                    self.work_queue,
+                    self.task_registry,
+                    node_id=self.node_id,
+                    concurrency=config.get("worker_concurrency", 4),
+                    lease_seconds=config.get("task_lease_seconds", 30),
+                    heartbeat_interval=config.get("task_heartbeat_seconds", 10),
+                    run=self._run_handler
+                )
+        self.admission = AdmissionQueue(
+            self.max_concurrent_workflows,
+            tenant_max_concurrency=config.get("tenant_max_concurrent_workflows"),
+            tenant_limits=config.get("tenant_concurrency_limits", {}),
+            tenant_weights=config.get("tenant_weights", {})
+        )
 
     async def initialize(self) -> None:
         """Initialize workflow engine"""
         self.logger.info("Initializing Workflow Engine")
         self.is_running = True
+        await self.state.start()
+        await self.dispatcher.start()
+        self.background_tasks.append(
+            asyncio.create_task(self._dispatch_workflows())
+        )
+        self.background_tasks.append(
+            asyncio.create_task(self._admit_workflows())
+        )
         self.background_tasks.append(
             asyncio.create_task(self._process_pending_workflows())
         )
         self.background_tasks.append(
             asyncio.create_task(self._monitor_active_workflows())
         )
+        self.background_tasks.append(
+            asyncio.create_task(self._heartbeat_active_workflows())
+        )
         await self._register_default_tasks()
+        if self.task_worker is not None:
+            await self.task_worker.start()
 
     async def shutdown(self) -> None:
         """Shutdown workflow engine"""
@@ -95,6 +179,34 @@ class WorkflowEngine:
         for task in self.background_tasks:
             task.cancel()
         await asyncio.gather(*self.background_tasks, return_exceptions=True)
+        await self.dispatcher.stop()
+        if self.task_worker is not None:
+            await self.task_worker.stop()
+        self.executor_pools.shutdown(wait=False)
+        await self.state.stop()
+
+    def register_task_handler(
+        self,
+        task_type: str,
+        handler: callable,
+        pool: Optional[str] = None,
+        idempotent: bool = False
+    ) -> None:
+        """Register a task handler, optionally bound to an execution pool.
+
+        Handlers for the "process" pool (or any pool with mode "process")
+        must be module-level functions taking a picklable config. Results of
+        idempotent handlers are memoized on their config and upstream outputs.
+        """
+        if pool is not None:
+            if pool not in self.executor_pools.pools:
+                raise ValueError(f"Unknown execution pool: {pool}")
+            self.task_policies[task_type] = TaskExecutionPolicy(pool)
+        if idempotent:
+            self.idempotent_task_types.add(task_type)
+        else:
+            self.idempotent_task_types.discard(task_type)
+        self.task_registry[task_type] = handler
 
     async def create_workflow(
         self,
@@ -116,12 +228,15 @@ class WorkflowEngine:
                     config=task_data.get("config", {}),
                     dependencies=task_data.get("dependencies", []),
                     timeout=task_data.get("timeout", self.task_timeout),
-                    retries=task_data.get("retries", self.max_task_retries)
+                    retries=task_data.get("retries", self.max_task_retries),
+                    idempotent=task_data.get("idempotent", False)
                 )
                 workflow_tasks.append(task)
 
+            # Reject unknown dependencies and cycles before persisting
+            self._build_task_graph(workflow_tasks)
+
             # Create workflow in database
-            db = next(get_db())
             workflow = WorkflowCreate(
                 id=workflow_id,
                 name=name,
@@ -130,7 +245,11 @@ class WorkflowEngine:
                 metadata=metadata or {},
                 created_at=datetime.utcnow()
             )
-            db_workflow = self.crud.create(db, obj_in=workflow)
+            with SessionLocal() as db:
+                self.crud.create(db, obj_in=workflow)
+
+                # Wake a worker now instead of waiting for the next sweep
+                self.dispatcher.publish(db, workflow_id)
 
             return {
                 "status": "success",
@@ -138,6 +257,13 @@ class WorkflowEngine:
                 "message": "Workflow created successfully"
             }
 
+        except ValueError as e:
+            self.logger.error(f"Invalid workflow definition: {str(e)}")
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid workflow definition: {str(e)}"
+            )
+
         except Exception as e:
             self.logger.error(f"Error creating workflow: {str(e)}")
             raise HTTPException(
@@ -148,27 +274,21 @@ class WorkflowEngine:
     async def execute_workflow(self, workflow_id: Union[str, UUID]) -> Dict[str, Any]:
         """Execute a workflow"""
         try:
-            db = next(get_db())
-            workflow = self.crud.get(db, id=workflow_id)
-            if not workflow:
-                raise ValueError(f"Workflow {workflow_id} not found")
-
-            if len(self.active_workflows) >= self.max_concurrent_workflows:
+            entries = self._pending_admission_entries([workflow_id])
+            if not entries or str(workflow_id) in self.active_workflows:
                 return {
                     "status": "error",
-                    "message": "Maximum concurrent workflows reached"
+                    "message": "Workflow is not pending or is being run by another worker"
                 }
 
-            # Create execution task
-            execution_task = asyncio.create_task(
-                self._execute_workflow_tasks(workflow)
-            )
-            self.active_workflows[str(workflow_id)] = execution_task
+            # Wait for a fair share of the execution slots instead of failing
+            self.admission.submit(entries[0])
 
             return {
                 "status": "success",
-                "message": "Workflow execution started",
-                "workflow_id": str(workflow_id)
+                "message": "Workflow queued for execution",
+                "workflow_id": str(workflow_id),
+                "queue_depth": len(self.admission)
             }
 
         except Exception as e:
@@ -178,38 +298,109 @@ class WorkflowEngine:
                 detail=f"Failed to execute workflow: {str(e)}"
             )
 
+    def _claim_workflow(self, workflow_id: Union[str, UUID]) -> Optional[WorkflowModel]:
+        """Atomically move a pending workflow to running.
+
+        The row is locked with FOR UPDATE SKIP LOCKED, so when several
+        workers receive the same workflow exactly one of them claims it.
+        """
+        # The workflow runs detached from this session, so its tasks are
+        # loaded up front and kept loaded through the commit
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            workflow = db.query(WorkflowModel)\
+                .options(selectinload(WorkflowModel.tasks))\
+                .filter(
+                    WorkflowModel.id == workflow_id,
+                    WorkflowModel.status == DBWorkflowStatus.PENDING
+                )\
+                .with_for_update(skip_locked=True)\
+                .first()
+            if not workflow:
+                db.rollback()
+                return None
+            workflow.status = DBWorkflowStatus.RUNNING
+            workflow.started_at = datetime.utcnow()
+            db.commit()
+            db.expunge(workflow)
+            return workflow
+        finally:
+            db.close()
+
+    def _pending_admission_entries(
+        self,
+        workflow_ids: Optional[List[Union[str, UUID]]] = None,
+        limit: Optional[int] = None
+    ) -> List[AdmissionEntry]:
+        """Read tenant and priority of pending workflows, highest priority first.
+
+        Workflows are queued by their owner; claiming happens only once the
+        admission queue hands out a slot.
+        """
+        db = SessionLocal()
+        try:
+            query = db.query(WorkflowModel.id, WorkflowModel.owner_id, WorkflowModel.priority)\
+                .filter(WorkflowModel.status == DBWorkflowStatus.PENDING)
+            if workflow_ids is not None:
+                query = query.filter(WorkflowModel.id.in_(workflow_ids))
+            query = query.order_by(WorkflowModel.priority.desc(), WorkflowModel.created_at)
+            if limit is not None:
+                query = query.limit(limit)
+            return [
+                AdmissionEntry(
+                    workflow_id=str(workflow_id),
+                    tenant=str(owner_id) if owner_id else "default",
+                    priority=priority or 0
+                )
+                for workflow_id, owner_id, priority in query.all()
+            ]
+        finally:
+            db.close()
+
+    def _start_workflow(self, workflow: WorkflowModel, tenant: str) -> None:
+        execution_task = asyncio.create_task(
+            self._execute_workflow_tasks(workflow)
+        )
+        # Runs even if the task is cancelled before it starts
+        execution_task.add_done_callback(lambda _: self.admission.release(tenant))
+        self.active_workflows[str(workflow.id)] = execution_task
+
     async def get_workflow_status(
         self,
         workflow_id: Union[str, UUID]
     ) -> Dict[str, Any]:
         """Get workflow status"""
         try:
-            db = next(get_db())
-            workflow = self.crud.get(db, id=workflow_id)
-            if not workflow:
-                raise ValueError(f"Workflow {workflow_id} not found")
+            # Status written behind may not be in the database yet
+            await self.state.flush_async()
+            with SessionLocal() as db:
+                workflow = self.crud.get(db, id=workflow_id)
+                if not workflow:
+                    raise ValueError(f"Workflow {workflow_id} not found")
 
-            return {
-                "status": "success",
-                "data": {
-                    "workflow_id": str(workflow_id),
-                    "name": workflow.name,
-                    "status": workflow.status,
-                    "tasks": [
-                        {
-                            "id": task.id,
-                            "name": task.name,
-                            "status": task.status,
-                            "result": task.result,
-                            "error": task.error
-                        }
-                        for task in workflow.tasks
-                    ],
-                    "created_at": workflow.created_at,
-                    "updated_at": workflow.updated_at,
-                    "metadata": workflow.metadata
+                return {
+                    "status": "success",
+                    "data": {
+                        "workflow_id": str(workflow_id),
+                        "name": workflow.name,
+                        "status": workflow.status,
+                        "tasks": [
+                            {
+                                "id": task.id,
+                                "name": task.name,
+                                "status": task.status,
+                                "result": task.result,
+                                "error": task.error,
+                                "cache_hit": task.cache_hit
+                            }
+                            for task in workflow.tasks
+                        ],
+                        "cache_hits": sum(1 for task in workflow.tasks if task.cache_hit),
+                        "created_at": workflow.created_at,
+                        "updated_at": workflow.updated_at,
+                        "metadata": workflow.metadata
+                    }
                 }
-            }
 
         except Exception as e:
             self.logger.error(f"Error getting workflow status: {str(e)}")
@@ -224,19 +415,21 @@ class WorkflowEngine:
     ) -> Dict[str, Any]:
         """Cancel a workflow"""
         try:
-            db = next(get_db())
-            workflow = self.crud.get(db, id=workflow_id)
+            with SessionLocal() as db:
+                workflow = self.crud.get(db, id=workflow_id)
             if not workflow:
                 raise ValueError(f"Workflow {workflow_id} not found")
 
-            if str(workflow_id) in self.active_workflows:
+            cancelled = self.admission.discard(workflow_id)
+            if not cancelled and str(workflow_id) in self.active_workflows:
                 # Cancel the execution task
                 self.active_workflows[str(workflow_id)].cancel()
                 del self.active_workflows[str(workflow_id)]
+                cancelled = True
 
-                # Update workflow status
-                workflow.status = WorkflowStatus.CANCELLED
-                self.crud.update(db, db_obj=workflow, obj_in={"status": WorkflowStatus.CANCELLED})
+            if cancelled:
+                self._record_workflow_status(workflow_id, WorkflowStatus.CANCELLED)
+                await self.state.flush_async()
 
             return {
                 "status": "success",
@@ -250,66 +443,172 @@ class WorkflowEngine:
                 detail=f"Failed to cancel workflow: {str(e)}"
             )
 
+    def _task_from_model(self, row: WorkflowTaskModel) -> WorkflowTask:
+        """Engine task for a stored task row; its definition lives in the row's parameters"""
+        parameters = row.parameters or {}
+        return WorkflowTask(
+            id=str(row.id),
+            name=row.name,
+            type=row.task_type,
+            config=parameters.get("config", {}),
+            dependencies=parameters.get("dependencies", []),
+            timeout=parameters.get("timeout", self.task_timeout),
+            retries=parameters.get("retries", self.max_task_retries),
+            idempotent=parameters.get("idempotent", False)
+        )
+
     async def _execute_workflow_tasks(self, workflow: WorkflowModel) -> None:
         """Execute workflow tasks"""
+        tasks: List[WorkflowTask] = []
         try:
-            db = next(get_db())
+            # Claiming already committed the running status
             workflow.status = WorkflowStatus.RUNNING
-            self.crud.update(db, db_obj=workflow, obj_in={"status": WorkflowStatus.RUNNING})
-
-            # Build task dependency graph
-            task_graph = self._build_task_graph(workflow.tasks)
-            completed_tasks = set()
-
-            while len(completed_tasks) < len(workflow.tasks):
-                # Find ready tasks
-                ready_tasks = [
-                    task for task in workflow.tasks
-                    if task.id not in completed_tasks and
-                    all(dep in completed_tasks for dep in task.dependencies)
-                ]
-
-                if not ready_tasks:
-                    break
-
-                # Execute ready tasks in parallel
-                tasks = [
-                    self._execute_task(task)
-                    for task in ready_tasks
-                ]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                # Process results
-                for task, result in zip(ready_tasks, results):
-                    if isinstance(result, Exception):
-                        task.status = TaskStatus.FAILED
-                        task.error = str(result)
-                    else:
-                        task.status = TaskStatus.COMPLETED
-                        task.result = result
-                    completed_tasks.add(task.id)
+            tasks = [self._task_from_model(row) for row in workflow.tasks]
+
+            # Build task dependency graph, failing fast on cycles
+            task_graph = self._build_task_graph(tasks)
+
+            # Resume from the checkpoints of an interrupted run, if any
+            restored = await asyncio.get_running_loop().run_in_executor(
+                None, self._load_checkpoints, workflow.id
+            )
+            if restored:
+                self.logger.info(
+                    f"Resuming workflow {workflow.id} with {len(restored)} completed tasks from checkpoints"
+                )
+
+            # Start each task as soon as its own dependencies finish
+            await run_task_graph(
+                task_graph,
+                lambda task: self._run_task(workflow.id, task, task_graph, restored)
+            )
 
             # Update workflow status
             final_status = WorkflowStatus.COMPLETED
-            if any(task.status == TaskStatus.FAILED for task in workflow.tasks):
+            if any(task.status == TaskStatus.FAILED for task in tasks):
                 final_status = WorkflowStatus.FAILED
 
             workflow.status = final_status
-            self.crud.update(db, db_obj=workflow, obj_in={"status": final_status})
+            self._record_workflow_status(workflow.id, final_status)
 
         except Exception as e:
             self.logger.error(f"Error executing workflow tasks: {str(e)}")
             workflow.status = WorkflowStatus.FAILED
-            self.crud.update(db, db_obj=workflow, obj_in={"status": WorkflowStatus.FAILED})
+            self._record_workflow_status(workflow.id, WorkflowStatus.FAILED)
 
         finally:
+            for task in tasks:
+                self.executor_pools.release(task.result)
             if str(workflow.id) in self.active_workflows:
                 del self.active_workflows[str(workflow.id)]
-
-    async def _execute_task(self, task: WorkflowTask) -> Dict[str, Any]:
-        """Execute a single task"""
+            try:
+                # Everything the workflow recorded reaches the database together
+                await self.state.flush_async()
+                if workflow.status == WorkflowStatus.COMPLETED:
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, self._clear_checkpoints, workflow.id
+                    )
+            except Exception:
+                # Stays pending in the intent log for the next flush
+                pass
+
+    async def _run_task(
+        self,
+        workflow_id: Union[str, UUID],
+        task: WorkflowTask,
+        task_graph: TaskGraph,
+        restored: Dict[str, Any]
+    ) -> Any:
+        """Run a task and checkpoint its result, or take the result from a checkpoint"""
+        # Checkpoints are keyed by the string form of the task id
+        if str(task.id) in restored:
+            task.status = TaskStatus.COMPLETED
+            task.result = restored[str(task.id)]
+            return task.result
+
+        upstream = [task_graph.tasks[dep].result for dep in task_graph.dependencies[task.id]]
+        result = await self._execute_task(task, upstream, workflow_id)
+        self.state.append("checkpoint", {
+            "id": uuid5(CHECKPOINT_NAMESPACE, f"{workflow_id}:{task.id}"),
+            "workflow_id": workflow_id if isinstance(workflow_id, UUID) else UUID(str(workflow_id)),
+            "task_id": str(task.id),
+            "checkpoint_data": {"result": json.loads(json.dumps(result, default=str))},
+            "created_at": datetime.utcnow()
+        })
+        return result
+
+    def _load_checkpoints(self, workflow_id: Union[str, UUID]) -> Dict[str, Any]:
+        with SessionLocal() as db:
+            rows = db.query(WorkflowCheckpoint.task_id, WorkflowCheckpoint.checkpoint_data)\
+                .filter(WorkflowCheckpoint.workflow_id == workflow_id)\
+                .all()
+        return {str(task_id): (data or {}).get("result") for task_id, data in rows}
+
+    def _clear_checkpoints(self, workflow_id: Union[str, UUID]) -> None:
+        with SessionLocal() as db:
+            db.query(WorkflowCheckpoint)\
+                .filter(WorkflowCheckpoint.workflow_id == workflow_id)\
+                .delete(synchronize_session=False)
+            db.commit()
+
+    def _touch_workflows(self, workflow_ids: List[str]) -> int:
+        """Move the heartbeat (updated_at) of workflows this node is running"""
+        with SessionLocal() as db:
+            touched = db.query(WorkflowModel)\
+                .filter(
+                    WorkflowModel.id.in_([UUID(str(workflow_id)) for workflow_id in workflow_ids]),
+                    WorkflowModel.status == DBWorkflowStatus.RUNNING
+                )\
+                .update({WorkflowModel.updated_at: datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+            return touched
+
+    def _requeue_interrupted_workflows(self) -> int:
+        """Return running workflows whose node stopped heartbeating to pending so they resume.
+
+        The node running a workflow moves its updated_at every
+        workflow_heartbeat_seconds, so a workflow is only requeued after
+        resume_stale_after seconds without a heartbeat, however long its
+        current task takes. Workflows running in this process are never requeued.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.resume_stale_after)
+
+        with SessionLocal() as db:
+            query = db.query(WorkflowModel)\
+                .filter(
+                    WorkflowModel.status == DBWorkflowStatus.RUNNING,
+                    func.coalesce(WorkflowModel.updated_at, WorkflowModel.started_at) < cutoff
+                )
+            if self.active_workflows:
+                query = query.filter(~WorkflowModel.id.in_([UUID(workflow_id) for workflow_id in self.active_workflows]))
+            workflows = query.with_for_update(skip_locked=True).all()
+            for workflow in workflows:
+                self.logger.warning(f"Requeueing interrupted workflow {workflow.id}")
+                workflow.status = DBWorkflowStatus.PENDING
+            db.commit()
+            return len(workflows)
+
+    def _record_workflow_status(self, workflow_id: Union[str, UUID], status: WorkflowStatus) -> None:
+        fields = {"status": DBWorkflowStatus(status.value)}
+        if status in (WorkflowStatus.COMPLETED, WorkflowStatus.FAILED, WorkflowStatus.CANCELLED):
+            fields["completed_at"] = datetime.utcnow()
+        self.state.record("workflow", workflow_id, **fields)
+
+    def _record_task(self, task: WorkflowTask, **fields: Any) -> None:
+        # The task table shares the workflow status enum, which has no "skipped"
+        status = WorkflowStatus.CANCELLED if task.status == TaskStatus.SKIPPED else task.status
+        self.state.record("task", task.id, status=DBWorkflowStatus(status.value), **fields)
+
+    async def _execute_task(
+        self,
+        task: WorkflowTask,
+        upstream: Optional[List[Any]] = None,
+        workflow_id: Optional[Union[str, UUID]] = None
+    ) -> Dict[str, Any]:
+        """Execute a single task, answering idempotent tasks from the result cache"""
         task.status = TaskStatus.RUNNING
         task.start_time = datetime.utcnow()
+        self._record_task(task, started_at=task.start_time)
 
         try:
             # Get task handler
@@ -317,12 +616,26 @@ class WorkflowEngine:
             if not handler:
                 raise ValueError(f"No handler registered for task type: {task.type}")
 
-            # Execute task with timeout
-            result = await asyncio.wait_for(
-                handler(task.config),
-                timeout=task.timeout
-            )
-
+            cache_key = None
+            if self.result_cache.enabled and (task.idempotent or task.type in self.idempotent_task_types):
+                cache_key = self.result_cache.key(task.type, task.config, upstream or [])
+                result = self.result_cache.get(cache_key) if cache_key is not None else MISSING
+                if result is not MISSING:
+                    task.status = TaskStatus.COMPLETED
+                    task.cache_hit = True
+                    task.result = result
+                    return result
+
+            # Execute task with timeout, on any node in distributed mode or
+            # locally in the pool chosen for its type
+            if self.remote_tasks is not None:
+                execution = self.remote_tasks.run(workflow_id or uuid4(), task.id, task.type, task.config)
+            else:
+                execution = self._run_handler(task.type, handler, task.config)
+            result = await asyncio.wait_for(execution, timeout=task.timeout)
+
+            if cache_key is not None:
+                self.result_cache.put(cache_key, result)
             task.status = TaskStatus.COMPLETED
             task.result = result
             return result
@@ -339,35 +652,67 @@ class WorkflowEngine:
 
         finally:
             task.end_time = datetime.utcnow()
+            self._record_task(
+                task,
+                completed_at=task.end_time,
+                # Results the JSON column cannot hold are stored as text
+                result=json.loads(json.dumps(task.result, default=str)),
+                error_message=task.error,
+                cache_hit=task.cache_hit
+            )
+
+    async def _run_handler(self, task_type: str, handler: callable, config: Dict[str, Any]) -> Any:
+        return await self.executor_pools.run(handler, config, self.task_policies.get(task_type))
 
     def _build_task_graph(
         self,
         tasks: List[WorkflowTask]
-    ) -> Dict[str, List[str]]:
-        """Build task dependency graph"""
-        graph = {}
-        for task in tasks:
-            graph[task.id] = task.dependencies
-        return graph
+    ) -> TaskGraph:
+        """Build task dependency graph, raising WorkflowCycleError on cycles"""
+        return TaskGraph(tasks)
 
-    async def _process_pending_workflows(self) -> None:
-        """Process pending workflows"""
+    async def _dispatch_workflows(self) -> None:
+        """Queue workflows for admission as soon as their creation is announced"""
         while self.is_running:
             try:
-                db = next(get_db())
-                pending_workflows = self.crud.get_multi(
-                    db,
-                    status=WorkflowStatus.PENDING
-                )
+                workflow_id = await self.dispatcher.next_workflow()
+                for entry in self._pending_admission_entries([workflow_id]):
+                    self.admission.submit(entry)
 
-                for workflow in pending_workflows:
-                    if len(self.active_workflows) < self.max_concurrent_workflows:
-                        await self.execute_workflow(workflow.id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error dispatching workflow: {str(e)}")
+
+    async def _admit_workflows(self) -> None:
+        """Claim and start queued workflows as the admission queue frees slots"""
+        while self.is_running:
+            entry = await self.admission.next()
+            try:
+                workflow = self._claim_workflow(entry.workflow_id)
+                if workflow:
+                    self._start_workflow(workflow, entry.tenant)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error starting workflow {entry.workflow_id}: {str(e)}")
+            # Cancelled, claimed by another worker or failed to start
+            self.admission.release(entry.tenant)
+
+    async def _process_pending_workflows(self) -> None:
+        """Reconciliation sweep for workflows whose dispatch message was missed"""
+        while self.is_running:
+            try:
+                self._requeue_interrupted_workflows()
+                for entry in self._pending_admission_entries(limit=self.reconcile_batch_size):
+                    if entry.workflow_id not in self.active_workflows:
+                        self.admission.submit(entry)
 
             except Exception as e:
                 self.logger.error(f"Error processing pending workflows: {str(e)}")
 
-            await asyncio.sleep(5)  # Check every 5 seconds
+            await asyncio.sleep(self.reconcile_interval)
 
     async def _monitor_active_workflows(self) -> None:
         """Monitor active workflows"""
@@ -392,6 +737,20 @@ class WorkflowEngine:
 
             await asyncio.sleep(1)  # Check every second
 
+    async def _heartbeat_active_workflows(self) -> None:
+        """Keep workflows running here from being requeued by other nodes"""
+        while self.is_running:
+            try:
+                if self.active_workflows:
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, self._touch_workflows, list(self.active_workflows)
+                    )
+
+            except Exception as e:
+                self.logger.error(f"Error sending workflow heartbeats: {str(e)}")
+
+            await asyncio.sleep(self.heartbeat_interval)
+
     async def _register_default_tasks(self) -> None:
         """Register default task handlers"""
         # Register system tasks
@@ -5,7 +5,7 @@ Database models for AetherIQ platform
 from datetime import datetime
 import uuid
 from typing import List, Optional
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import Column, DDL, String, Integer, Boolean, DateTime, Float, ForeignKey, JSON, Enum as SQLEnum, event
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.dialects.postgresql import UUID
 import enum
@@ -82,6 +82,7 @@ class WorkflowTask(Base):
     status = Column(SQLEnum(WorkflowStatus), nullable=False, default=WorkflowStatus.PENDING)
     result = Column(JSON)
     error_message = Column(String)
+    cache_hit = Column(Boolean, default=False)  # Result served from the idempotent task cache
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     started_at = Column(DateTime)
@@ -90,6 +91,34 @@ class WorkflowTask(Base):
     # Relationships
     workflow = relationship("Workflow", back_populates="tasks")
 
+class WorkflowCheckpoint(Base):
+    """Result of a completed task, used to resume an interrupted workflow"""
+    __tablename__ = "workflow_checkpoints"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    workflow_id = Column(UUID(as_uuid=True), ForeignKey("workflows.id"), nullable=False, index=True)
+    task_id = Column(String, nullable=False)
+    checkpoint_data = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class TaskQueueItem(Base):
+    """Ready workflow task waiting for, or leased to, a distributed worker"""
+    __tablename__ = "workflow_task_queue"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    workflow_id = Column(UUID(as_uuid=True), nullable=False)
+    task_id = Column(String, nullable=False)
+    task_type = Column(String, nullable=False)
+    config = Column(JSON)
+    origin = Column(String, nullable=False)  # Node that published the task
+    status = Column(String, nullable=False, default="queued")  # queued, leased, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    leased_by = Column(String)
+    lease_expires_at = Column(DateTime)
+    result = Column(JSON)
+    error = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
 class Integration(Base):
     """External system integration configuration"""
     __tablename__ = "integrations"
@@ -111,20 +140,40 @@ class Integration(Base):
 class Analytics(Base):
     """Analytics data for workflows and system performance"""
     __tablename__ = "analytics"
+    # Daily range partitions; see aetheriq.core.retention
+    __table_args__ = {"postgresql_partition_by": "RANGE (timestamp)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     workflow_id = Column(UUID(as_uuid=True), ForeignKey("workflows.id"))
     metric_name = Column(String, nullable=False)
     metric_value = Column(JSON, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow)  # Partition key must be in the primary key
     metadata = Column(JSON)
 
     # Relationships
     workflow = relationship("Workflow", back_populates="analytics")
 
+class AnalyticsRollup(Base):
+    """Pre-aggregated analytics values per metric, field and time bucket"""
+    __tablename__ = "analytics_rollups"
+
+    resolution = Column(String, primary_key=True)  # "minute", "hour" or "day"
+    bucket_start = Column(DateTime, primary_key=True)
+    metric_name = Column(String, primary_key=True)
+    field = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    sum = Column(Float, nullable=False, default=0.0)
+    mean = Column(Float, nullable=False, default=0.0)
+    m2 = Column(Float, nullable=False, default=0.0)  # Sum of squared deviations from the mean
+    min = Column(Float)
+    max = Column(Float)
+    digest = Column(JSON)  # Serialized t-digest of the bucket's values
+
 class AuditLog(Base):
     """Audit logging for security and compliance"""
     __tablename__ = "audit_logs"
+    # Monthly range partitions; see aetheriq.core.retention
+    __table_args__ = {"postgresql_partition_by": "RANGE (timestamp)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
@@ -133,7 +182,7 @@ class AuditLog(Base):
     resource_type = Column(String, nullable=False)
     resource_id = Column(String)
     details = Column(JSON)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow)
     ip_address = Column(String)
     user_agent = Column(String)
 
@@ -144,6 +193,8 @@ class AuditLog(Base):
 class ComplianceCheck(Base):
     """Compliance check results"""
     __tablename__ = "compliance_checks"
+    # Monthly range partitions; see aetheriq.core.retention
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     framework = Column(String, nullable=False)
@@ -151,7 +202,7 @@ class ComplianceCheck(Base):
     resource_id = Column(String, nullable=False)
     check_result = Column(Boolean, nullable=False)
     details = Column(JSON)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
     remediation_steps = Column(JSON)
     severity = Column(String)
 
@@ -163,4 +214,14 @@ class SystemMetrics(Base):
     metric_name = Column(String, nullable=False)
     metric_value = Column(JSON, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
-    metadata = Column(JSON) 
\ No newline at end of file
+    metadata = Column(JSON) 
+
+# create_all makes bare partitioned parents; give them a default partition so
+# inserts work before aetheriq.core.retention creates the range partitions
+for _table in (Analytics.__table__, AuditLog.__table__, ComplianceCheck.__table__):
+    event.listen(
+        _table,
+        "after_create",
+        DDL(f'CREATE TABLE IF NOT EXISTS "{_table.name}_default" PARTITION OF "{_table.name}" DEFAULT')
+        .execute_if(dialect="postgresql")
+    )
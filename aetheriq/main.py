@@ -6,11 +6,12 @@ Initializes and coordinates all platform components
 import asyncio
 import logging
 from typing import Dict, Any
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
 from .core.automation import AutomationEngine
 from .core.analytics import AnalyticsEngine, AnalyticsConfig
+from .core.backpressure import QueueFullError
 from .core.security import SecurityManager, SecurityConfig
 from .core.compliance import ComplianceManager, ComplianceConfig
 from .core.workflow import WorkflowEngine, WorkflowConfig
@@ -96,10 +97,21 @@ class AetherIQ:
         # Analytics routes
         @self.app.post("/api/v1/analytics/process")
         async def process_data(data: Dict[str, Any]):
-            return await self.analytics_engine.process_data(
-                data['data'],
-                data['data_type']
-            )
+            try:
+                return await self.analytics_engine.process_data(
+                    data['data'],
+                    data['data_type']
+                )
+            except QueueFullError as e:
+                raise HTTPException(
+                    status_code=429,
+                    detail=str(e),
+                    headers={"Retry-After": str(max(1, round(e.retry_after)))}
+                )
+
+        @self.app.get("/api/v1/analytics/queue")
+        async def get_analytics_queue():
+            return self.analytics_engine.get_queue_stats()
         
         @self.app.get("/api/v1/analytics/report")
         async def get_analytics_report(start_date: str = None, end_date: str = None):
@@ -0,0 +1,24 @@
+"""Record idempotent task cache hits
+
+Revision ID: 20261016_0000
+Revises: 20240101_0000
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0000'
+down_revision = '20240101_0000'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column(
+        'workflow_tasks',
+        sa.Column('cache_hit', sa.Boolean(), nullable=False, server_default=sa.false())
+    )
+
+def downgrade() -> None:
+    op.drop_column('workflow_tasks', 'cache_hit')
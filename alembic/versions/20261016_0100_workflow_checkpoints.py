@@ -0,0 +1,31 @@
+"""Add workflow task checkpoints
+
+Revision ID: 20261016_0100
+Revises: 20261016_0000
+Create Date: 2026-10-16 01:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0100'
+down_revision = '20261016_0000'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'workflow_checkpoints',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('workflow_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('workflows.id'), nullable=False),
+        sa.Column('task_id', sa.String(), nullable=False),
+        sa.Column('checkpoint_data', postgresql.JSON()),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now())
+    )
+    op.create_index('ix_workflow_checkpoints_workflow_id', 'workflow_checkpoints', ['workflow_id'])
+
+def downgrade() -> None:
+    op.drop_index('ix_workflow_checkpoints_workflow_id', table_name='workflow_checkpoints')
+    op.drop_table('workflow_checkpoints')
@@ -0,0 +1,45 @@
+"""Add distributed workflow task queue
+
+Revision ID: 20261016_0200
+Revises: 20261016_0100
+Create Date: 2026-10-16 02:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0200'
+down_revision = '20261016_0100'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'workflow_task_queue',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('workflow_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('task_id', sa.String(), nullable=False),
+        sa.Column('task_type', sa.String(), nullable=False),
+        sa.Column('config', postgresql.JSON()),
+        sa.Column('origin', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False, server_default='queued'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('leased_by', sa.String()),
+        sa.Column('lease_expires_at', sa.DateTime()),
+        sa.Column('result', postgresql.JSON()),
+        sa.Column('error', sa.String()),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now())
+    )
+    # Claims scan only claimable rows, oldest first
+    op.create_index(
+        'ix_workflow_task_queue_claimable',
+        'workflow_task_queue',
+        ['status', 'created_at'],
+        postgresql_where=sa.text("status IN ('queued', 'leased')")
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_workflow_task_queue_claimable', table_name='workflow_task_queue')
+    op.drop_table('workflow_task_queue')
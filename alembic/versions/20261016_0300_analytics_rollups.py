@@ -0,0 +1,34 @@
+"""Add analytics rollups
+
+Revision ID: 20261016_0300
+Revises: 20261016_0200
+Create Date: 2026-10-16 03:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0300'
+down_revision = '20261016_0200'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'analytics_rollups',
+        sa.Column('resolution', sa.String(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('metric_name', sa.String(), nullable=False),
+        sa.Column('field', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('sum_sq', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('min', sa.Float()),
+        sa.Column('max', sa.Float()),
+        # Report range scans filter on resolution then bucket_start
+        sa.PrimaryKeyConstraint('resolution', 'bucket_start', 'metric_name', 'field')
+    )
+
+def downgrade() -> None:
+    op.drop_table('analytics_rollups')
@@ -0,0 +1,22 @@
+"""Add t-digest sketches to analytics rollups
+
+Revision ID: 20261016_0400
+Revises: 20261016_0300
+Create Date: 2026-10-16 04:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0400'
+down_revision = '20261016_0300'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('analytics_rollups', sa.Column('digest', postgresql.JSON()))
+
+def downgrade() -> None:
+    op.drop_column('analytics_rollups', 'digest')
@@ -0,0 +1,86 @@
+"""Range-partition analytics, audit_logs and compliance_checks by time
+
+Revision ID: 20261016_0500
+Revises: 20261016_0400
+Create Date: 2026-10-16 05:00:00.000000
+
+"""
+from datetime import datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0500'
+down_revision = '20261016_0400'
+branch_labels = None
+depends_on = None
+
+# table, partition column, partition width, foreign keys (column, referenced table)
+TABLES = [
+    ('analytics', 'timestamp', 'day', [('workflow_id', 'workflows')]),
+    ('audit_logs', 'timestamp', 'month', [('user_id', 'users'), ('integration_id', 'integrations')]),
+    ('compliance_checks', 'created_at', 'month', [])
+]
+PREMAKE = 3  # Partitions created ahead of the current one
+
+# Partition naming matches aetheriq.core.retention, which maintains them from here on
+def _start(ts, interval):
+    return datetime(ts.year, ts.month, ts.day) if interval == 'day' else datetime(ts.year, ts.month, 1)
+
+def _next(start, interval):
+    if interval == 'day':
+        return start + timedelta(days=1)
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+def _name(table, start, interval):
+    return f"{table}_p{start.strftime('%Y%m%d' if interval == 'day' else '%Y%m')}"
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        # Declarative partitioning is Postgres-only; retention falls back to DELETE elsewhere
+        return
+    now = datetime.utcnow()
+    for table, column, interval, foreign_keys in TABLES:
+        legacy = f'{table}_unpartitioned'
+        op.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+        op.execute(f'ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey')
+        op.execute(f'UPDATE {legacy} SET "{column}" = now() WHERE "{column}" IS NULL')
+
+        op.execute(f'CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE ("{column}")')
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN "{column}" SET NOT NULL')
+        # The partition key has to be part of the primary key
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, "{column}")')
+        for fk_column, target in foreign_keys:
+            op.execute(f'ALTER TABLE {table} ADD FOREIGN KEY ({fk_column}) REFERENCES {target} (id)')
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+        oldest = bind.execute(sa.text(f'SELECT min("{column}") FROM {legacy}')).scalar() or now
+        start = _start(oldest, interval)
+        stop = _start(now, interval)
+        for _ in range(PREMAKE + 1):
+            stop = _next(stop, interval)
+        while start < stop:
+            end = _next(start, interval)
+            op.execute(
+                f"CREATE TABLE {_name(table, start, interval)} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+            start = end
+
+        op.execute(f'INSERT INTO {table} SELECT * FROM {legacy}')
+        op.execute(f'DROP TABLE {legacy}')
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, column, interval, foreign_keys in TABLES:
+        plain = f'{table}_plain'
+        op.execute(f'CREATE TABLE {plain} (LIKE {table} INCLUDING DEFAULTS)')
+        op.execute(f'INSERT INTO {plain} SELECT * FROM {table}')
+        op.execute(f'DROP TABLE {table}')
+        op.execute(f'ALTER TABLE {plain} RENAME TO {table}')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)')
+        for fk_column, target in foreign_keys:
+            op.execute(f'ALTER TABLE {table} ADD FOREIGN KEY ({fk_column}) REFERENCES {target} (id)')
@@ -0,0 +1,31 @@
+"""Store analytics rollup variance as mean and m2 instead of a sum of squares
+
+Revision ID: 20261016_0600
+Revises: 20261016_0500
+Create Date: 2026-10-16 06:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0600'
+down_revision = '20261016_0500'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('analytics_rollups', sa.Column('mean', sa.Float(), nullable=False, server_default='0'))
+    op.add_column('analytics_rollups', sa.Column('m2', sa.Float(), nullable=False, server_default='0'))
+    # Existing buckets only have the sum of squares; carry over the best estimate they hold
+    op.execute(
+        "UPDATE analytics_rollups SET mean = sum / count, "
+        "m2 = GREATEST(sum_sq - sum * sum / count, 0) WHERE count > 0"
+    )
+    op.drop_column('analytics_rollups', 'sum_sq')
+
+def downgrade() -> None:
+    op.add_column('analytics_rollups', sa.Column('sum_sq', sa.Float(), nullable=False, server_default='0'))
+    op.execute("UPDATE analytics_rollups SET sum_sq = m2 + count * mean * mean")
+    op.drop_column('analytics_rollups', 'm2')
+    op.drop_column('analytics_rollups', 'mean')
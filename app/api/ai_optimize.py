@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 from datetime import datetime
@@ -6,7 +7,7 @@ from datetime import datetime
 from app.core.security import oauth2_scheme
 from app.db.base import get_db
 from app.db import models
-from app.services.ai_optimization import WorkflowOptimizer
+from app.services.ai_optimization import WorkflowOptimizer, OptimizerRegistry, optimizer_registry
 
 router = APIRouter()
 
@@ -40,24 +41,30 @@ async def analyze_workflow(
         .limit(100)\
         .all()
     
-    # Initialize optimizer
-    optimizer = WorkflowOptimizer()
+    execution_dicts = [e.__dict__ for e in executions]
     
-    # Train model if we have enough data
-    if len(executions) >= 10:
-        optimizer.train(executions)
-    
-    # Generate suggestions
-    suggestions = optimizer.generate_optimization_suggestions(
-        workflow=workflow.__dict__,
-        executions=[e.__dict__ for e in executions]
+    # Reuse the workflow's trained optimizer, training off the event loop on a miss
+    optimizer = await run_in_threadpool(
+        optimizer_registry.checkout,
+        user.tenant_id,
+        workflow_id,
+        execution_dicts
     )
     
-    # Calculate risk score
-    risk_score = optimizer.calculate_risk_score(
-        workflow=workflow.__dict__,
-        executions=[e.__dict__ for e in executions]
-    )
+    try:
+        # Generate suggestions
+        suggestions = optimizer.generate_optimization_suggestions(
+            workflow=workflow.__dict__,
+            executions=execution_dicts
+        )
+        
+        # Calculate risk score
+        risk_score = optimizer.calculate_risk_score(
+            workflow=workflow.__dict__,
+            executions=execution_dicts
+        )
+    finally:
+        await run_in_threadpool(optimizer_registry.checkin, optimizer)
     
     return {
         "workflow_id": workflow_id,
@@ -100,15 +107,20 @@ async def predict_workflow_performance(
         .limit(100)\
         .all()
     
-    if len(executions) < 10:
+    execution_dicts = [e.__dict__ for e in executions]
+    if len(OptimizerRegistry.training_executions(execution_dicts)) < 10:
         raise HTTPException(
             status_code=400,
             detail="Not enough historical data for prediction"
         )
     
-    # Initialize and train optimizer
-    optimizer = WorkflowOptimizer()
-    optimizer.train(executions)
+    # Reuse the workflow's trained optimizer, training off the event loop on a miss
+    optimizer = await run_in_threadpool(
+        optimizer_registry.checkout,
+        user.tenant_id,
+        workflow_id,
+        execution_dicts
+    )
     
     # Prepare input data for prediction
     execution_data = {
@@ -122,8 +134,11 @@ async def predict_workflow_performance(
         "status": "pending"
     }
     
-    # Get prediction
-    predicted_time = optimizer.predict_execution_time(execution_data)
+    # Get prediction, off the event loop like training
+    try:
+        predicted_time = await run_in_threadpool(optimizer.predict_execution_time, execution_data)
+    finally:
+        await run_in_threadpool(optimizer_registry.checkin, optimizer)
     
     return {
         "workflow_id": workflow_id,
@@ -133,6 +148,97 @@ async def predict_workflow_performance(
         "input_data_size": execution_data["input_data_size"]
     }
 
+MAX_BATCH_PREDICTIONS = 10000
+
+@router.post("/ai-optimize/workflow/{workflow_id}/predict/batch", response_model=Dict[str, Any])
+async def predict_workflow_performance_batch(
+    workflow_id: int,
+    inputs: List[Dict[str, Any]],
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+):
+    """Predict workflow performance for many candidate inputs in one call"""
+    if not inputs:
+        raise HTTPException(status_code=400, detail="No inputs provided")
+    if len(inputs) > MAX_BATCH_PREDICTIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch size exceeds limit of {MAX_BATCH_PREDICTIONS} inputs"
+        )
+    
+    user = db.query(models.User).filter(models.User.id == token).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    workflow = db.query(models.Workflow)\
+        .filter(
+            models.Workflow.id == workflow_id,
+            models.Workflow.tenant_id == user.tenant_id
+        )\
+        .first()
+    
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    
+    # Get recent executions for training
+    executions = db.query(models.WorkflowExecution)\
+        .filter(models.WorkflowExecution.workflow_id == workflow_id)\
+        .order_by(models.WorkflowExecution.started_at.desc())\
+        .limit(100)\
+        .all()
+    
+    execution_dicts = [e.__dict__ for e in executions]
+    if len(OptimizerRegistry.training_executions(execution_dicts)) < 10:
+        raise HTTPException(
+            status_code=400,
+            detail="Not enough historical data for prediction"
+        )
+    
+    # Reuse the workflow's trained optimizer, training off the event loop on a miss
+    optimizer = await run_in_threadpool(
+        optimizer_registry.checkout,
+        user.tenant_id,
+        workflow_id,
+        execution_dicts
+    )
+    
+    # Prepare input data for prediction
+    now = datetime.utcnow()
+    execution_data = [
+        {
+            "input_data_size": len(str(input_data)),
+            "output_data_size": 0,  # Will be updated after execution
+            "has_error": 0,
+            "status_encoded": 0,
+            "started_at": now,
+            "completed_at": None,
+            "error_message": None,
+            "status": "pending"
+        }
+        for input_data in inputs
+    ]
+    
+    # Get predictions in a single vectorized pass, off the event loop like training
+    try:
+        predicted_times = await run_in_threadpool(optimizer.predict_execution_times, execution_data)
+    finally:
+        await run_in_threadpool(optimizer_registry.checkin, optimizer)
+    
+    return {
+        "workflow_id": workflow_id,
+        "timestamp": now.isoformat(),
+        "predictions": [
+            {
+                "index": index,
+                "predicted_execution_time": float(predicted_time),
+                "input_data_size": data["input_data_size"]
+            }
+            for index, (predicted_time, data) in enumerate(zip(predicted_times, execution_data))
+        ],
+        "confidence": 0.85,  # This could be calculated based on model performance
+        "count": len(execution_data)
+    }
+
 @router.get("/ai-optimize/workflow/{workflow_id}/bottlenecks", response_model=List[Dict[str, Any]])
 async def get_workflow_bottlenecks(
     workflow_id: int,
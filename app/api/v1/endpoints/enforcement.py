@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 
 from app.core.enforcement import AICapability, EnforcementAction, EnforcementLevel
-from app.services.enforcement_service import EnforcementService
+from app.services.enforcement_service import EnforcementService, audit_writer, shared_engine
 from app.db.session import get_db
 from app.schemas.enforcement import (
     RuleCreate,
@@ -20,6 +20,19 @@ from app.schemas.enforcement import (
 
 router = APIRouter()
 
+@router.on_event("startup")
+def load_enforcement_snapshot():
+    """Load the shared engine once and follow policy changes from other workers"""
+    shared_engine.reload()
+    shared_engine.start_watcher()
+    audit_writer.start()
+
+@router.on_event("shutdown")
+def stop_enforcement_background_workers():
+    shared_engine.stop_watcher()
+    # Drain buffered audit records before the worker exits
+    audit_writer.stop()
+
 @router.post("/rules/", response_model=RuleResponse)
 def create_rule(
     *,
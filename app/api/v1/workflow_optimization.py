@@ -14,6 +14,7 @@ from app.core.security import encrypt_sensitive_data
 from fastapi.responses import JSONResponse
 from fastapi import status
 import time
+import logging
 from app.core.monitoring import track_api_metrics
 from app.core.logging import log_api_request
 from app.core.audit import audit_log
@@ -21,6 +22,11 @@ from sqlalchemy import text
 
 router = APIRouter()
 
+@router.on_event("startup")
+async def preload_optimization_models():
+    """Memory-map published optimizer models so requests never train inline"""
+    WorkflowOptimizer.preload_models()
+
 @router.get("/workflows/performance", response_model=Dict[str, Any])
 @rate_limit(max_requests=100, window_seconds=60)
 @track_api_metrics
@@ -54,6 +60,11 @@ async def analyze_workflow_performance(
         
         start_time = time.time()
         optimizer = WorkflowOptimizer(db)
+        
+        # Refresh stale or missing models off the request path
+        if optimizer.needs_retraining():
+            background_tasks.add_task(_retrain_models, tenant_id=current_user["tenant_id"])
+        
         analysis = await optimizer.analyze_workflow_performance()
         
         if analysis["status"] == "error":
@@ -375,6 +386,16 @@ async def get_optimization_history(
     except Exception as e:
         return handle_optimization_error(e, "UNEXPECTED_ERROR")
 
+def _retrain_models(tenant_id: int):
+    """Background task to retrain and promote optimizer models"""
+    db = next(get_db())
+    try:
+        WorkflowOptimizer(db).retrain_models()
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Model retraining failed for tenant {tenant_id}: {str(e)}")
+    finally:
+        db.close()
+
 async def _run_optimization(workflow_id: int, tenant_id: int, user_id: int):
     """Background task to run workflow optimization"""
     try:
@@ -1,7 +1,15 @@
 from enum import Enum
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Tuple, Iterable
 from pydantic import BaseModel, Field
 from datetime import datetime
+from collections import OrderedDict
+from prometheus_client import Counter
+import hashlib
+import heapq
+import json
+import os
+import threading
+import time
 
 class EnforcementLevel(Enum):
     STRICT = "strict"  # No exceptions allowed
@@ -34,6 +42,8 @@ class EnforcementRule(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     is_active: bool = True
+    # Decisions for a capability with any non-cacheable rule are never cached
+    cacheable: bool = True
 
 class EnforcementPolicy(BaseModel):
     id: str
@@ -52,24 +62,333 @@ class EnforcementContext:
         self.timestamp = datetime.utcnow()
         self.metadata: Dict[str, Any] = {}
 
-class EnforcementEngine:
+ConditionMatcher = Callable[[Any], bool]
+
+# Operators supported in dict conditions, compiled once per rule
+CONDITION_OPERATORS: Dict[str, Callable[[Any], ConditionMatcher]] = {
+    "equals": lambda target: lambda value: value == target,
+    "contains": lambda target: lambda value: target in value,
+    "greater_than": lambda target: lambda value: value > target,
+    "less_than": lambda target: lambda value: value < target,
+    "in": lambda target: lambda value: value in target,
+}
+
+# Higher rank is more restrictive; EnforcementLevel is declared strictest first
+LEVEL_STRICTNESS = {level: rank for rank, level in enumerate(reversed(list(EnforcementLevel)), start=1)}
+
+def _never(value: Any) -> bool:
+    return False
+
+def compile_condition(condition: Any) -> ConditionMatcher:
+    """Turn a rule condition into a predicate over the request value"""
+    if isinstance(condition, dict):
+        factory = CONDITION_OPERATORS.get(condition.get("operator"))
+        if factory is None:
+            return _never
+        return factory(condition.get("value"))
+    return lambda value: value == condition
+
+def _equality_key(conditions: Dict[str, Any]) -> Optional[Tuple[str, Any]]:
+    """Pick the first hashable equality condition of a rule for the hash index"""
+    for key, condition in conditions.items():
+        if isinstance(condition, dict):
+            if condition.get("operator") != "equals":
+                continue
+            target = condition.get("value")
+        else:
+            target = condition
+        try:
+            hash(target)
+        except TypeError:
+            continue
+        return key, target
+    return None
+
+class CompiledRule:
+    """Rule with its conditions compiled into closures"""
+
+    __slots__ = ("rule", "position", "action", "exceptions", "checks")
+
+    def __init__(self, rule: EnforcementRule, position: int):
+        self.rule = rule
+        self.position = position
+        self.action = rule.action
+        self.exceptions = frozenset(rule.exceptions)
+        self.checks = [(key, compile_condition(condition)) for key, condition in rule.conditions.items()]
+
+    def matches(self, request_data: Dict[str, Any]) -> bool:
+        # Conditions on keys absent from the request do not apply
+        for key, check in self.checks:
+            if key in request_data and not check(request_data[key]):
+                return False
+        return True
+
+class RuleBucket:
+    """Rules sharing a capability and level, in evaluation order.
+
+    Rules with an equality condition are indexed by ``key -> value``, so only
+    the rules whose value equals the request's (or that cannot be ruled out
+    because the request lacks the key) are evaluated.
+    """
+
     def __init__(self):
+        self.unindexed: List[CompiledRule] = []
+        self.by_key: Dict[str, List[CompiledRule]] = {}
+        self.by_value: Dict[str, Dict[Any, List[CompiledRule]]] = {}
+
+    def add(self, compiled: CompiledRule) -> None:
+        equality = _equality_key(compiled.rule.conditions)
+        if equality is None:
+            self.unindexed.append(compiled)
+            return
+        key, value = equality
+        self.by_key.setdefault(key, []).append(compiled)
+        self.by_value.setdefault(key, {}).setdefault(value, []).append(compiled)
+
+    def candidates(self, request_data: Dict[str, Any]):
+        groups = [self.unindexed] if self.unindexed else []
+        for key, rules in self.by_key.items():
+            if key not in request_data:
+                groups.append(rules)
+                continue
+            try:
+                matched = self.by_value[key].get(request_data[key])
+            except TypeError:
+                matched = rules
+            if matched:
+                groups.append(matched)
+
+        if len(groups) == 1:
+            return groups[0]
+        return heapq.merge(*groups, key=lambda compiled: compiled.position)
+
+class CompiledRuleIndex:
+    """Evaluation index over the active rules, built once per policy change"""
+
+    def __init__(self, rules: List[EnforcementRule], policies: List[EnforcementPolicy]):
+        self.buckets: Dict[AICapability, List[RuleBucket]] = {}
+        for position, rule in enumerate(rules):
+            levels = self.buckets.get(rule.capability)
+            if levels is None:
+                levels = self.buckets[rule.capability] = {level: RuleBucket() for level in EnforcementLevel}
+            levels[rule.level].add(CompiledRule(rule, position))
+        # Keep only non-empty levels, in evaluation order
+        self.buckets = {
+            capability: [levels[level] for level in EnforcementLevel if self._non_empty(levels[level])]
+            for capability, levels in self.buckets.items()
+        }
+        self.default_action = self._strictest_default(policies)
+
+        # Request fields each capability's rules look at, for decision cache keys
+        self.condition_keys: Dict[AICapability, Tuple[str, ...]] = {}
+        self.uncacheable = set()
+        for rule in rules:
+            keys = set(self.condition_keys.get(rule.capability, ())) | set(rule.conditions)
+            self.condition_keys[rule.capability] = tuple(sorted(keys))
+            if not rule.cacheable:
+                self.uncacheable.add(rule.capability)
+
+    @staticmethod
+    def _non_empty(bucket: RuleBucket) -> bool:
+        return bool(bucket.unindexed or bucket.by_key)
+
+    @staticmethod
+    def _strictest_default(policies: List[EnforcementPolicy]) -> EnforcementAction:
+        if not policies:
+            return EnforcementAction.BLOCK
+        strictest_policy = max(
+            policies,
+            key=lambda p: LEVEL_STRICTNESS[p.rules[0].level] if p.rules else 0
+        )
+        return strictest_policy.default_action
+
+    def decide(
+        self,
+        capability: AICapability,
+        context: EnforcementContext,
+        request_data: Dict[str, Any]
+    ) -> Tuple[EnforcementAction, bool]:
+        """Return the action and whether it came from the default action"""
+        levels = self.buckets.get(capability)
+        if not levels:
+            return EnforcementAction.BLOCK, False
+
+        for bucket in levels:
+            for compiled in bucket.candidates(request_data):
+                if compiled.matches(request_data):
+                    if context.user_id in compiled.exceptions:
+                        continue
+                    return compiled.action, False
+
+        # If no rules match, use the most restrictive policy's default action
+        return self.default_action, True
+
+    def evaluate(
+        self,
+        capability: AICapability,
+        context: EnforcementContext,
+        request_data: Dict[str, Any]
+    ) -> EnforcementAction:
+        return self.decide(capability, context, request_data)[0]
+
+    def cache_key(
+        self,
+        capability: AICapability,
+        context: EnforcementContext,
+        request_data: Dict[str, Any]
+    ) -> tuple:
+        """Key a decision on the caller and the request fields rules can see"""
+        digest = hashlib.blake2b(digest_size=16)
+        for key in self.condition_keys.get(capability, ()):
+            if key in request_data:
+                digest.update(f"{key}={_canonical(request_data[key])}\x00".encode())
+        return (capability, context.user_id, context.organization_id, digest.digest())
+
+DECISION_CACHE_SIZE = int(os.getenv("ENFORCEMENT_DECISION_CACHE_SIZE", "10000"))
+DECISION_CACHE_TTL_SECONDS = float(os.getenv("ENFORCEMENT_DECISION_CACHE_TTL_SECONDS", "60"))
+
+decision_cache_requests = Counter(
+    'enforcement_decision_cache_requests_total',
+    'Enforcement decision cache lookups by result (hit, miss, bypass)',
+    ['result']
+)
+
+class DecisionCache:
+    """LRU/TTL cache of enforcement decisions.
+
+    Entries remember the capability they belong to and whether the decision
+    came from the policies' default action, so a policy change only drops
+    the decisions it can affect. Every invalidation bumps ``generation``; a
+    decision computed before an invalidation is refused by ``put``, so it
+    cannot be cached after the invalidation has run.
+    """
+
+    def __init__(self, max_entries: int = DECISION_CACHE_SIZE, ttl: float = DECISION_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[tuple, Tuple[EnforcementAction, bool, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple) -> Optional[EnforcementAction]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                decision_cache_requests.labels(result="hit").inc()
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+        decision_cache_requests.labels(result="miss").inc()
+        return None
+
+    def put(self, key: tuple, action: EnforcementAction, from_default: bool, generation: Optional[int] = None) -> bool:
+        """Cache a decision unless the cache was invalidated since ``generation`` was read"""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._entries[key] = (action, from_default, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def record_bypass(self) -> None:
+        self.bypasses += 1
+        decision_cache_requests.labels(result="bypass").inc()
+
+    def invalidate(self, capabilities: Iterable[AICapability], defaults: bool = True) -> int:
+        """Drop decisions for the given capabilities and, optionally, every default-action decision"""
+        capabilities = set(capabilities)
+        with self._lock:
+            self.generation += 1
+            stale = [
+                key for key, (_, from_default, _) in self._entries.items()
+                if key[0] in capabilities or (defaults and from_default)
+            ]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=repr)
+
+class EnforcementEngine:
+    def __init__(self, decision_cache: Optional[DecisionCache] = None):
         self.policies: List[EnforcementPolicy] = []
         self.active_rules: Dict[str, EnforcementRule] = {}
+        self._index: Optional[CompiledRuleIndex] = None
+        self.decision_cache = decision_cache or DecisionCache()
+
+    def _invalidate(self, rules: Iterable[EnforcementRule]) -> None:
+        self._index = None
+        self.decision_cache.invalidate(rule.capability for rule in rules)
 
     def add_policy(self, policy: EnforcementPolicy) -> None:
         self.policies.append(policy)
         for rule in policy.rules:
             if rule.is_active:
                 self.active_rules[rule.id] = rule
+        self._invalidate(policy.rules)
 
     def remove_policy(self, policy_id: str) -> None:
+        removed = [rule for p in self.policies if p.id == policy_id for rule in p.rules]
         self.policies = [p for p in self.policies if p.id != policy_id]
         self.active_rules = {
             rule_id: rule 
             for rule_id, rule in self.active_rules.items()
             if any(rule in policy.rules for policy in self.policies)
         }
+        self._invalidate(removed)
+
+    def update_rule(self, rule: EnforcementRule) -> None:
+        """Replace a rule in every policy that contains it"""
+        previous = self.active_rules.get(rule.id)
+        for policy in self.policies:
+            for i, existing in enumerate(policy.rules):
+                if existing.id == rule.id:
+                    previous = previous or existing
+                    policy.rules[i] = rule
+        if rule.is_active and previous is not None:
+            self.active_rules[rule.id] = rule
+        else:
+            self.active_rules.pop(rule.id, None)
+        self._invalidate([rule] + ([previous] if previous is not None else []))
+
+    @property
+    def index(self) -> CompiledRuleIndex:
+        """Compiled view of active_rules, rebuilt lazily after policy changes"""
+        index = self._index
+        if index is None:
+            index = self._index = CompiledRuleIndex(list(self.active_rules.values()), self.policies)
+        return index
 
     def evaluate_request(
         self,
@@ -77,29 +396,22 @@ class EnforcementEngine:
         context: EnforcementContext,
         request_data: Dict[str, Any]
     ) -> EnforcementAction:
-        applicable_rules = [
-            rule for rule in self.active_rules.values()
-            if rule.capability == capability
-        ]
-
-        if not applicable_rules:
-            return EnforcementAction.BLOCK
-
-        # Apply rules in order of enforcement level strictness
-        for level in EnforcementLevel:
-            level_rules = [rule for rule in applicable_rules if rule.level == level]
-            for rule in level_rules:
-                if self._matches_conditions(rule, context, request_data):
-                    if context.user_id in rule.exceptions:
-                        continue
-                    return rule.action
+        # Rules are applied in order of enforcement level strictness
+        cache = self.decision_cache
+        # Read before the index, so any change to the index after this point
+        # also moves the generation and the decision is not cached
+        generation = cache.generation
+        index = self.index
+        if not cache.enabled or capability in index.uncacheable:
+            cache.record_bypass()
+            return index.evaluate(capability, context, request_data)
 
-        # If no rules match, use the most restrictive policy's default action
-        strictest_policy = max(
-            self.policies,
-            key=lambda p: EnforcementLevel[p.rules[0].level.value].value if p.rules else 0
-        )
-        return strictest_policy.default_action
+        key = index.cache_key(capability, context, request_data)
+        action = cache.get(key)
+        if action is None:
+            action, from_default = index.decide(capability, context, request_data)
+            cache.put(key, action, from_default, generation)
+        return action
 
     def _matches_conditions(
         self,
@@ -5,13 +5,124 @@ from datetime import datetime, timedelta
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
-import tensorflow as tf
-from tensorflow.keras import layers, models
 import joblib
 import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from app.services.ml_runtime import InferenceProcess, get_inference_process, tensorflow as tf
+from app.services.model_store import DEFAULT_MODEL_STORE_PATH
+
+# "inline" runs the LSTM in the API worker, "process" in a separate inference process
+LSTM_INFERENCE_MODE = os.getenv("LSTM_INFERENCE_MODE", "inline")
+OPTIMIZER_MODEL_TTL = timedelta(seconds=int(os.getenv("OPTIMIZER_MODEL_TTL_SECONDS", "3600")))
+LSTM_MODEL_DIR = os.getenv("LSTM_MODEL_DIR", os.path.join(DEFAULT_MODEL_STORE_PATH, "lstm"))
+LSTM_MODEL_CACHE_SIZE = int(os.getenv("LSTM_MODEL_CACHE_SIZE", "8"))
+
+def build_lstm_model(input_shape: tuple) -> "tf.keras.Model":
+    """Build LSTM model for time series prediction"""
+    model = tf.keras.Sequential([
+        tf.keras.layers.LSTM(64, input_shape=input_shape, return_sequences=True),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.LSTM(32),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.Dense(16, activation='relu'),
+        tf.keras.layers.Dense(1)
+    ])
+    
+    model.compile(
+        optimizer='adam',
+        loss='mse',
+        metrics=['mae']
+    )
+    
+    return model
+
+def fit_lstm_model(
+    X_lstm: np.ndarray,
+    y_lstm: np.ndarray,
+    input_shape: tuple,
+    model_path: Optional[str] = None
+) -> Any:
+    """Build and fit the LSTM, saving it to model_path when given"""
+    model = build_lstm_model(input_shape)
+    model.fit(
+        X_lstm, y_lstm,
+        epochs=50,
+        batch_size=32,
+        validation_split=0.2,
+        verbose=0
+    )
+    if model_path:
+        model.save(model_path)
+        _cache_lstm_model(model_path, model)
+        return model_path
+    return model
+
+# Models loaded inside the inference process, keyed by path, least recently used first
+_loaded_lstm_models: "OrderedDict[str, Any]" = OrderedDict()
+
+def _cache_lstm_model(model_path: str, model: Any) -> None:
+    _loaded_lstm_models[model_path] = model
+    _loaded_lstm_models.move_to_end(model_path)
+    while len(_loaded_lstm_models) > LSTM_MODEL_CACHE_SIZE:
+        _loaded_lstm_models.popitem(last=False)
+
+def predict_lstm_model(model_path: str, sequences: np.ndarray, batch_size: int = 1024) -> np.ndarray:
+    """Run a saved LSTM; executed inside the inference process"""
+    model = _loaded_lstm_models.get(model_path)
+    if model is None:
+        model = tf.keras.models.load_model(model_path)
+        _cache_lstm_model(model_path, model)
+    else:
+        _loaded_lstm_models.move_to_end(model_path)
+    return model.predict(sequences, batch_size=batch_size, verbose=0)
+
+def release_lstm_model(model_path: str) -> None:
+    """Forget a saved LSTM and delete its directory; executed inside the inference process"""
+    _loaded_lstm_models.pop(model_path, None)
+    shutil.rmtree(os.path.dirname(model_path), ignore_errors=True)
+
+class RemoteLSTMModel:
+    """LSTM handle whose training and inference run in an InferenceProcess"""
+    
+    def __init__(self, model_path: str, process: InferenceProcess):
+        self.model_path = model_path
+        self.process = process
+    
+    @classmethod
+    def fit(
+        cls,
+        X_lstm: np.ndarray,
+        y_lstm: np.ndarray,
+        input_shape: tuple,
+        process: Optional[InferenceProcess] = None
+    ) -> "RemoteLSTMModel":
+        process = process or get_inference_process()
+        os.makedirs(LSTM_MODEL_DIR, exist_ok=True)
+        model_dir = tempfile.mkdtemp(prefix="lstm-", dir=LSTM_MODEL_DIR)
+        model_path = os.path.join(model_dir, "model.keras")
+        try:
+            process.call(fit_lstm_model, X_lstm, y_lstm, input_shape, model_path)
+        except Exception:
+            shutil.rmtree(model_dir, ignore_errors=True)
+            raise
+        return cls(model_path, process)
+    
+    def predict(self, sequences: np.ndarray, batch_size: int = 1024, verbose: int = 0) -> np.ndarray:
+        return self.process.call(predict_lstm_model, self.model_path, sequences, batch_size)
+    
+    def release(self) -> None:
+        """Unload the model from the inference process and delete its files"""
+        self.process.call(release_lstm_model, self.model_path)
 
 class WorkflowOptimizer:
-    def __init__(self):
+    def __init__(self, lstm_inference_mode: Optional[str] = None):
+        self.lstm_inference_mode = lstm_inference_mode or LSTM_INFERENCE_MODE
         self.lstm_model = None
         self.rf_model = None
         self.scaler = StandardScaler()
@@ -25,24 +136,15 @@ class WorkflowOptimizer:
             'is_weekend'
         ]
         
-    def build_lstm_model(self, input_shape: tuple) -> tf.keras.Model:
+    def build_lstm_model(self, input_shape: tuple) -> "tf.keras.Model":
         """Build LSTM model for time series prediction"""
-        model = tf.keras.Sequential([
-            tf.keras.layers.LSTM(64, input_shape=input_shape, return_sequences=True),
-            tf.keras.layers.Dropout(0.2),
-            tf.keras.layers.LSTM(32),
-            tf.keras.layers.Dropout(0.2),
-            tf.keras.layers.Dense(16, activation='relu'),
-            tf.keras.layers.Dense(1)
-        ])
-        
-        model.compile(
-            optimizer='adam',
-            loss='mse',
-            metrics=['mae']
-        )
-        
-        return model
+        return build_lstm_model(input_shape)
+    
+    def release(self) -> None:
+        """Free a model held by the inference process; inline models are garbage collected"""
+        if isinstance(self.lstm_model, RemoteLSTMModel):
+            self.lstm_model.release()
+        self.lstm_model = None
     
     def prepare_execution_data(self, executions: List[Dict[str, Any]]) -> pd.DataFrame:
         """Prepare execution data for model training"""
@@ -106,37 +208,80 @@ class WorkflowOptimizer:
         X_lstm = np.array(X_lstm)
         y_lstm = np.array(y_lstm)
         
-        # Train LSTM model
-        self.lstm_model = self.build_lstm_model((sequence_length, X_scaled.shape[1]))
-        self.lstm_model.fit(
-            X_lstm, y_lstm,
-            epochs=50,
-            batch_size=32,
-            validation_split=0.2,
-            verbose=0
-        )
+        # Train LSTM model, keeping TensorFlow out of this process if configured
+        input_shape = (sequence_length, X_scaled.shape[1])
+        previous = self.lstm_model
+        if self.lstm_inference_mode == "process":
+            self.lstm_model = RemoteLSTMModel.fit(X_lstm, y_lstm, input_shape)
+        else:
+            self.lstm_model = fit_lstm_model(X_lstm, y_lstm, input_shape)
+        if isinstance(previous, RemoteLSTMModel):
+            previous.release()
     
-    def predict_execution_time(self, execution_data: Dict[str, Any]) -> float:
-        """Predict execution time for a workflow"""
+    def prepare_prediction_data(self, execution_data: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Prepare candidate inputs for prediction, deriving time features from started_at"""
+        df = pd.DataFrame(execution_data)
+        
+        if 'started_at' in df.columns:
+            started_at = pd.to_datetime(df['started_at'])
+        else:
+            started_at = pd.Series(pd.Timestamp(datetime.utcnow()), index=df.index)
+        
+        defaults = {
+            'input_data_size': 0,
+            'output_data_size': 0,
+            'has_error': 0,
+            'status_encoded': 0,
+            'hour_of_day': started_at.dt.hour,
+            'day_of_week': started_at.dt.dayofweek,
+            'is_weekend': started_at.dt.dayofweek.isin([5, 6]).astype(int)
+        }
+        for column, default in defaults.items():
+            if column not in df.columns:
+                df[column] = default
+            else:
+                df[column] = df[column].fillna(default)
+        
+        return df
+    
+    def predict_execution_times(
+        self,
+        execution_data: List[Dict[str, Any]],
+        batch_size: int = 1024
+    ) -> np.ndarray:
+        """Predict execution times for many candidate inputs at once.
+
+        Scales all inputs with a single transform and runs one vectorized
+        call per model instead of one TensorFlow call per candidate.
+        """
         if not self.rf_model or not self.lstm_model:
-            return 0.0
-            
+            return np.zeros(len(execution_data))
+        if not execution_data:
+            return np.empty(0)
+        
         # Prepare input data
-        df = pd.DataFrame([execution_data])
+        df = self.prepare_prediction_data(execution_data)
         X = self.extract_features(df)
         X_scaled = self.scaler.transform(X)
         
         # Get predictions from both models
-        rf_pred = self.rf_model.predict(X_scaled)[0]
+        rf_pred = self.rf_model.predict(X_scaled)
         
-        # For LSTM, we need a sequence
-        sequence = np.zeros((1, 5, X_scaled.shape[1]))
-        sequence[0, -1] = X_scaled[0]
-        lstm_pred = self.lstm_model.predict(sequence)[0][0]
+        # For LSTM, each candidate becomes a sequence ending in its features
+        sequences = np.zeros((len(X_scaled), 5, X_scaled.shape[1]))
+        sequences[:, -1] = X_scaled
+        lstm_pred = self.lstm_model.predict(sequences, batch_size=batch_size, verbose=0)[:, 0]
         
         # Combine predictions (weighted average)
         return 0.7 * rf_pred + 0.3 * lstm_pred
     
+    def predict_execution_time(self, execution_data: Dict[str, Any]) -> float:
+        """Predict execution time for a workflow"""
+        if not self.rf_model or not self.lstm_model:
+            return 0.0
+        
+        return float(self.predict_execution_times([execution_data])[0])
+    
     def analyze_bottlenecks(self, executions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Analyze workflow bottlenecks"""
         if not executions:
@@ -256,4 +401,179 @@ class WorkflowOptimizer:
         risk_score = sum(risk_factors.values())
         
         # Normalize to 0-1 range
-        return min(max(risk_score, 0.0), 1.0) 
\ No newline at end of file
+        return min(max(risk_score, 0.0), 1.0) 
+
+class OptimizerRegistry:
+    """Per-tenant, per-workflow cache of trained WorkflowOptimizers.
+
+    An entry is reused until it is older than ``ttl`` or the workflow's
+    finished executions change, so analyze and predict requests only pay for
+    training when there is new history to learn from. Training for a key is
+    serialized, concurrent requests for the same workflow wait for a single
+    fit instead of each training their own.
+
+    Requests that use an optimizer after the registry lock is released take
+    it with ``checkout`` and hand it back with ``checkin``. An optimizer that
+    leaves the cache while checked out keeps its model until the last holder
+    returns it.
+    """
+    
+    def __init__(self, ttl: timedelta = OPTIMIZER_MODEL_TTL, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._key_locks: Dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+        # Checked out optimizers and how many requests hold each one
+        self._holders: Dict["WorkflowOptimizer", int] = {}
+        # Dropped from the cache while checked out, released on the last checkin
+        self._retired: set = set()
+        self.stats = {"hits": 0, "misses": 0, "trainings": 0, "evictions": 0}
+    
+    @staticmethod
+    def training_executions(executions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Only finished executions have an execution time to learn from"""
+        return [e for e in executions if e.get('completed_at') is not None]
+    
+    @staticmethod
+    def fingerprint(executions: List[Dict[str, Any]]) -> tuple:
+        """Identify a training set by its size and newest execution"""
+        if not executions:
+            return (0, None, None)
+        latest = max(executions, key=lambda e: (e['completed_at'], e.get('id') or 0))
+        return (len(executions), latest.get('id'), latest['completed_at'])
+    
+    def _lookup(self, key: tuple, fingerprint: tuple, dropped: List["WorkflowOptimizer"]) -> Optional["WorkflowOptimizer"]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry["fingerprint"] != fingerprint or datetime.utcnow() - entry["trained_at"] > self.ttl:
+            dropped.append(self._entries.pop(key)["optimizer"])
+            return None
+        self._entries.move_to_end(key)
+        return entry["optimizer"]
+    
+    def _hold(self, optimizer: "WorkflowOptimizer", hold: bool) -> "WorkflowOptimizer":
+        if hold:
+            self._holders[optimizer] = self._holders.get(optimizer, 0) + 1
+        return optimizer
+    
+    def checkout(
+        self,
+        tenant_id: Any,
+        workflow_id: Any,
+        executions: List[Dict[str, Any]]
+    ) -> "WorkflowOptimizer":
+        """Like get_optimizer, but the model stays loaded until ``checkin``"""
+        return self.get_optimizer(tenant_id, workflow_id, executions, hold=True)
+    
+    def checkin(self, optimizer: "WorkflowOptimizer") -> None:
+        """Return a checked out optimizer, releasing it if it has left the cache"""
+        dropped: List[WorkflowOptimizer] = []
+        with self._lock:
+            remaining = self._holders.get(optimizer, 0) - 1
+            if remaining > 0:
+                self._holders[optimizer] = remaining
+                return
+            self._holders.pop(optimizer, None)
+            if optimizer in self._retired:
+                self._retired.discard(optimizer)
+                dropped.append(optimizer)
+        self._release(dropped)
+    
+    def get_optimizer(
+        self,
+        tenant_id: Any,
+        workflow_id: Any,
+        executions: List[Dict[str, Any]],
+        hold: bool = False
+    ) -> "WorkflowOptimizer":
+        """Return a trained optimizer for the workflow, training only on a miss"""
+        key = (tenant_id, workflow_id)
+        training_set = self.training_executions(executions)
+        fingerprint = self.fingerprint(training_set)
+        dropped: List[WorkflowOptimizer] = []
+        
+        with self._lock:
+            optimizer = self._lookup(key, fingerprint, dropped)
+            if optimizer is not None:
+                self.stats["hits"] += 1
+                return self._hold(optimizer, hold)
+            self.stats["misses"] += 1
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+            self._retire(dropped)
+        self._release(dropped)
+        
+        with key_lock:
+            # Another request may have trained this workflow while we waited
+            with self._lock:
+                optimizer = self._lookup(key, fingerprint, dropped)
+                if optimizer is not None:
+                    return self._hold(optimizer, hold)
+                self._retire(dropped)
+            self._release(dropped)
+            
+            optimizer = WorkflowOptimizer()
+            if len(training_set) >= 10:
+                # Oldest first so LSTM sequences follow execution order
+                optimizer.train(sorted(training_set, key=lambda e: e['started_at']))
+                self.logger.info(
+                    f"Trained optimizer for tenant {tenant_id} workflow {workflow_id} "
+                    f"on {len(training_set)} executions"
+                )
+            
+            with self._lock:
+                self.stats["trainings"] += 1
+                self._entries[key] = {
+                    "optimizer": optimizer,
+                    "fingerprint": fingerprint,
+                    "trained_at": datetime.utcnow()
+                }
+                self._entries.move_to_end(key)
+                self._hold(optimizer, hold)
+                while len(self._entries) > self.max_entries:
+                    evicted, entry = self._entries.popitem(last=False)
+                    self._key_locks.pop(evicted, None)
+                    dropped.append(entry["optimizer"])
+                    self.stats["evictions"] += 1
+                self._retire(dropped)
+            self._release(dropped)
+            return optimizer
+    
+    def _retire(self, dropped: List["WorkflowOptimizer"]) -> None:
+        """Keep checked out optimizers out of ``dropped`` until their last checkin; call with the lock held"""
+        for optimizer in [o for o in dropped if o in self._holders]:
+            dropped.remove(optimizer)
+            self._retired.add(optimizer)
+    
+    def _release(self, dropped: List["WorkflowOptimizer"]) -> None:
+        """Free the models of optimizers that left the cache, outside the registry lock"""
+        while dropped:
+            optimizer = dropped.pop()
+            try:
+                optimizer.release()
+            except Exception as e:
+                self.logger.warning(f"Failed to release optimizer model: {str(e)}")
+    
+    def invalidate(self, tenant_id: Any, workflow_id: Any = None) -> int:
+        """Drop cached optimizers for a workflow, or for all of a tenant's workflows"""
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if key[0] == tenant_id and (workflow_id is None or key[1] == workflow_id)
+            ]
+            dropped = [self._entries.pop(key)["optimizer"] for key in keys]
+            self._retire(dropped)
+        self._release(dropped)
+        return len(keys)
+    
+    def clear(self) -> None:
+        with self._lock:
+            dropped = [entry["optimizer"] for entry in self._entries.values()]
+            self._entries.clear()
+            self._key_locks.clear()
+            self._retire(dropped)
+        self._release(dropped)
+
+optimizer_registry = OptimizerRegistry()
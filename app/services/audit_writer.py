@@ -0,0 +1,367 @@
+from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime
+import glob
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import insert, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1.0"))
+AUDIT_ENQUEUE_TIMEOUT_SECONDS = float(os.getenv("AUDIT_ENQUEUE_TIMEOUT_SECONDS", "0.05"))
+AUDIT_SPILL_PATH = os.getenv("AUDIT_SPILL_PATH", "var/audit/spill.jsonl")
+AUDIT_MAX_ATTEMPTS = int(os.getenv("AUDIT_MAX_ATTEMPTS", "5"))
+
+# Spilled records carry their failed replay count under this key
+_ATTEMPTS_KEY = "__attempts__"
+
+# Prometheus metrics
+audit_queue_depth = Gauge(
+    'audit_queue_depth',
+    'Audit records buffered in memory awaiting a flush',
+    ['writer']
+)
+
+audit_flush_duration = Histogram(
+    'audit_flush_duration_seconds',
+    'Time spent writing one batch of audit records',
+    ['writer']
+)
+
+audit_flush_batch_size = Histogram(
+    'audit_flush_batch_size',
+    'Number of audit records written per flush',
+    ['writer'],
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500, 5000)
+)
+
+audit_records_total = Counter(
+    'audit_records_total',
+    'Audit records by outcome (written, spilled, replayed, dead_lettered)',
+    ['writer', 'outcome']
+)
+
+class _FlushRequest:
+    """Queue marker that is acknowledged once everything before it is written"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+class AuditLogWriter:
+    """Buffered, batched writer for audit records.
+
+    Callers enqueue plain column dicts and return immediately; a background
+    thread writes them with one multi-row INSERT per batch, triggered by
+    ``batch_size`` or ``flush_interval``. The queue is bounded: when it is
+    full callers block for up to ``enqueue_timeout`` and the record is then
+    appended to a local spill file instead of being dropped. Batches that
+    fail to insert are spilled as well, and spill files are replayed once
+    the database accepts writes again. Each process spills to its own file
+    next to ``spill_path`` and adopts the files of processes that have
+    exited, so workers sharing a spill path never replay the same records
+    twice. Inserts skip ids that already exist,
+    so replaying a batch that was partly committed is safe. When a replayed
+    chunk fails while the database is reachable, its records are retried
+    one by one, so a record the database rejects does not hold back the
+    rest; after ``max_attempts`` rejections it is moved to a dead-letter file.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        session_factory: Optional[Callable[[], Session]] = None,
+        name: Optional[str] = None,
+        max_queue: int = AUDIT_QUEUE_SIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+        enqueue_timeout: float = AUDIT_ENQUEUE_TIMEOUT_SECONDS,
+        spill_path: Optional[str] = None,
+        max_attempts: int = AUDIT_MAX_ATTEMPTS,
+        dead_letter_path: Optional[str] = None
+    ):
+        self.model = model
+        self.session_factory = session_factory
+        self.name = name or getattr(model, "__tablename__", model.__name__)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.spill_base = spill_path or AUDIT_SPILL_PATH.replace(".jsonl", f"-{self.name}.jsonl")
+        self.max_attempts = max_attempts
+        self._dead_letter_path = dead_letter_path
+        self.logger = logging.getLogger(__name__)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._spill_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_replay = 0.0
+        self._depth = audit_queue_depth.labels(writer=self.name)
+
+    def _new_session(self) -> Session:
+        if self.session_factory is None:
+            from app.db.session import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    @property
+    def spill_path(self) -> str:
+        # Resolved per call, the writer may be built before the server forks its workers
+        stem, ext = os.path.splitext(self.spill_base)
+        return f"{stem}-{os.getpid()}{ext}"
+
+    @property
+    def dead_letter_path(self) -> str:
+        return self._dead_letter_path or f"{self.spill_path}.dead"
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"audit-writer-{self.name}", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Write out everything buffered and stop the flusher."""
+        with self._start_lock:
+            if not self.running:
+                return
+            self._stop.set()
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        """Buffer one record, spilling to disk if the queue stays full."""
+        if not self.running:
+            self.start()
+        try:
+            self._queue.put(record, timeout=self.enqueue_timeout)
+            self._depth.set(self._queue.qsize())
+        except queue.Full:
+            self.logger.warning(f"Audit queue {self.name} is full, spilling record to {self.spill_path}")
+            self._spill([record])
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every record submitted so far has been written or spilled."""
+        if not self.running:
+            return self._queue.empty()
+        marker = _FlushRequest()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def _run(self) -> None:
+        self._replay_spill()
+        while not self._stop.is_set() or not self._queue.empty():
+            batch, markers = self._next_batch()
+            if batch:
+                self._write(batch)
+            for marker in markers:
+                marker.done.set()
+            if self._has_spill() and time.monotonic() - self._last_replay >= self.flush_interval:
+                self._replay_spill()
+
+    def _next_batch(self):
+        batch: List[Dict[str, Any]] = []
+        markers: List[_FlushRequest] = []
+        try:
+            item = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return batch, markers
+
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            if isinstance(item, _FlushRequest):
+                markers.append(item)
+                break
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                # On shutdown take whatever is left without waiting
+                remaining = 0
+            try:
+                item = self._queue.get(timeout=remaining) if remaining else self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._depth.set(self._queue.qsize())
+        return batch, markers
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        session = self._new_session()
+        try:
+            if session.get_bind().dialect.name == "postgresql":
+                statement = pg_insert(self.model).on_conflict_do_nothing(index_elements=["id"])
+            else:
+                statement = insert(self.model)
+            session.execute(statement, rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _database_available(self) -> bool:
+        session = self._new_session()
+        try:
+            session.execute(text("SELECT 1"))
+            return True
+        except Exception:
+            return False
+        finally:
+            session.close()
+
+    def _write(self, batch: List[Dict[str, Any]]) -> bool:
+        start = time.perf_counter()
+        try:
+            self._insert(batch)
+        except Exception as e:
+            self.logger.error(f"Failed to write {len(batch)} audit records, spilling: {str(e)}")
+            self._spill(batch)
+            return False
+        audit_flush_duration.labels(writer=self.name).observe(time.perf_counter() - start)
+        audit_flush_batch_size.labels(writer=self.name).observe(len(batch))
+        audit_records_total.labels(writer=self.name, outcome="written").inc(len(batch))
+        return True
+
+    def _spill(self, records: List[Dict[str, Any]]) -> None:
+        with self._spill_lock:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            with open(self.spill_path, "a") as f:
+                for record in records:
+                    f.write(json.dumps(record, default=_encode) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        audit_records_total.labels(writer=self.name, outcome="spilled").inc(len(records))
+
+    def _has_spill(self) -> bool:
+        return os.path.exists(self.spill_path) or bool(glob.glob(f"{self.spill_path}.replay-*"))
+
+    def _adopt_orphaned_spills(self) -> None:
+        """Take over spill files left by processes that are no longer running"""
+        stem, ext = os.path.splitext(self.spill_base)
+        pattern = re.compile(re.escape(stem) + r"-(\d+)" + re.escape(ext) + r"(\.replay-\d+)?$")
+        for path in glob.glob(f"{glob.escape(stem)}-*{ext}*"):
+            match = pattern.match(path)
+            if match is None or int(match.group(1)) == os.getpid() or _process_alive(int(match.group(1))):
+                continue
+            try:
+                os.replace(path, f"{self.spill_path}.replay-{time.time_ns()}")
+            except FileNotFoundError:
+                # Another worker adopted it first
+                continue
+            self.logger.info(f"Adopted audit spill file {path}")
+
+    def _dead_letter(self, records: List[Dict[str, Any]]) -> None:
+        with self._spill_lock:
+            os.makedirs(os.path.dirname(self.dead_letter_path) or ".", exist_ok=True)
+            with open(self.dead_letter_path, "a") as f:
+                for record in records:
+                    f.write(json.dumps(record, default=_encode) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        self.logger.error(
+            f"Moved {len(records)} audit records to {self.dead_letter_path} "
+            f"after {self.max_attempts} failed attempts"
+        )
+        audit_records_total.labels(writer=self.name, outcome="dead_lettered").inc(len(records))
+
+    def _replay_spill(self) -> None:
+        """Insert spilled records; whatever still fails is spilled again or dead-lettered."""
+        self._last_replay = time.monotonic()
+        self._adopt_orphaned_spills()
+        with self._spill_lock:
+            if os.path.exists(self.spill_path):
+                # New spills go to a fresh file while this one is replayed
+                os.replace(self.spill_path, f"{self.spill_path}.replay-{time.time_ns()}")
+        for path in sorted(glob.glob(f"{self.spill_path}.replay-*")):
+            try:
+                records = _read_records(path)
+            except FileNotFoundError:
+                continue
+            retry, dead, replayed, unavailable = [], [], 0, False
+            for i in range(0, len(records), self.batch_size):
+                chunk = records[i:i + self.batch_size]
+                try:
+                    self._insert([_columns(record) for record in chunk])
+                    replayed += len(chunk)
+                    continue
+                except Exception as e:
+                    if not self._database_available():
+                        # An outage is nobody's fault: keep the rest without counting attempts
+                        self.logger.error(f"Audit spill replay failed, will retry: {str(e)}")
+                        retry.extend(records[i:])
+                        unavailable = True
+                        break
+                # The database is up but rejects something in this chunk
+                for record in chunk:
+                    try:
+                        self._insert([_columns(record)])
+                        replayed += 1
+                    except Exception:
+                        record = {**record, _ATTEMPTS_KEY: record.get(_ATTEMPTS_KEY, 0) + 1}
+                        (dead if record[_ATTEMPTS_KEY] >= self.max_attempts else retry).append(record)
+            if retry:
+                self._spill(retry)
+            if dead:
+                self._dead_letter(dead)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            if replayed:
+                audit_records_total.labels(writer=self.name, outcome="replayed").inc(replayed)
+                self.logger.info(f"Replayed {replayed} spilled audit records from {path}")
+            if unavailable:
+                return
+
+def _read_records(path: str) -> List[Dict[str, Any]]:
+    records = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                records.append(_decode(json.loads(line)))
+            except ValueError:
+                # Torn final line from a crash mid-append
+                continue
+    return records
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    return str(value)
+
+def _columns(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in record.items() if key != _ATTEMPTS_KEY}
+
+def _decode(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: datetime.fromisoformat(value["__datetime__"])
+        if isinstance(value, dict) and "__datetime__" in value else value
+        for key, value in record.items()
+    }
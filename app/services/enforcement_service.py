@@ -1,7 +1,12 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from uuid import uuid4
 from datetime import datetime
+import logging
+import os
+import threading
+import zlib
 
 from app.core.enforcement import (
     EnforcementEngine,
@@ -16,44 +21,238 @@ from app.models.enforcement import (
     EnforcementPolicy as DBPolicy,
     EnforcementAuditLog
 )
+from app.services.audit_writer import AuditLogWriter
+
+ENFORCEMENT_VERSION_POLL_SECONDS = float(os.getenv("ENFORCEMENT_VERSION_POLL_SECONDS", "5"))
+
+def _db_rule_to_core(db_rule: DBRule) -> CoreRule:
+    """Convert a database rule to a core rule."""
+    return CoreRule(
+        id=db_rule.id,
+        name=db_rule.name,
+        description=db_rule.description,
+        capability=AICapability(db_rule.capability),
+        level=db_rule.level,
+        action=EnforcementAction(db_rule.action),
+        conditions=db_rule.conditions,
+        exceptions=db_rule.exceptions,
+        created_at=db_rule.created_at,
+        updated_at=db_rule.updated_at,
+        is_active=db_rule.is_active,
+        cacheable=getattr(db_rule, "cacheable", True)
+    )
+
+def load_engine(db: Session) -> EnforcementEngine:
+    """Build a fresh engine from all active policies and rules in the database."""
+    engine = EnforcementEngine()
+    db_policies = db.query(DBPolicy).filter(DBPolicy.is_active == True).all()
+    for db_policy in db_policies:
+        core_policy = CorePolicy(
+            id=db_policy.id,
+            name=db_policy.name,
+            description=db_policy.description,
+            rules=[_db_rule_to_core(rule) for rule in db_policy.rules if rule.is_active],
+            default_action=EnforcementAction(db_policy.default_action),
+            created_at=db_policy.created_at,
+            updated_at=db_policy.updated_at,
+            is_active=db_policy.is_active
+        )
+        engine.add_policy(core_policy)
+    # Compile the rule index before the engine is published
+    engine.index
+    return engine
+
+class LocalPolicyVersion:
+    """Policy version stamp shared by the threads of one process."""
+
+    def __init__(self):
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self) -> int:
+        return self._version
+
+    def bump(self) -> int:
+        with self._lock:
+            self._version += 1
+            return self._version
+
+class RedisPolicyVersion:
+    """Policy version stamp shared by every worker through a Redis counter."""
+
+    KEY = "enforcement:policy_version"
+
+    def __init__(self, url: str):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def get(self) -> int:
+        return int(self.client.get(self.KEY) or 0)
+
+    def bump(self) -> int:
+        return int(self.client.incr(self.KEY))
+
+class DatabasePolicyVersion:
+    """Policy version stamp derived from the policy and rule tables.
+
+    Every change either adds or removes a row or sets ``updated_at``, so the
+    row counts and newest ``updated_at`` of both tables identify the state
+    every worker sees, without a store shared beyond the database.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        self.session_factory = session_factory
+
+    def _new_session(self) -> Session:
+        if self.session_factory is None:
+            from app.db.session import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    def get(self) -> int:
+        session = self._new_session()
+        try:
+            stamp = [
+                tuple(session.query(func.count(model.id), func.max(model.updated_at)).one())
+                for model in (DBPolicy, DBRule)
+            ]
+        finally:
+            session.close()
+        return zlib.crc32(repr(stamp).encode())
+
+    def bump(self) -> int:
+        # The committed change already is the new version
+        return self.get()
+
+class EnforcementSnapshot:
+    """An engine together with the policy version it was built from."""
+
+    __slots__ = ("engine", "version", "loaded_at")
+
+    def __init__(self, engine: EnforcementEngine, version: int):
+        self.engine = engine
+        self.version = version
+        self.loaded_at = datetime.utcnow()
+
+class SharedEnforcementEngine:
+    """Process-wide enforcement engine snapshot.
+
+    Evaluations read the current snapshot without locking; writers build a
+    complete new engine and swap the reference. Rule and policy changes
+    bump the version stamp and reload the local snapshot immediately, other
+    workers pick the new version up from a background watcher, so the
+    request path never queries the policy tables.
+    """
+
+    def __init__(
+        self,
+        version_store=None,
+        session_factory: Optional[Callable[[], Session]] = None,
+        poll_interval: float = ENFORCEMENT_VERSION_POLL_SECONDS
+    ):
+        self.version_store = version_store or LocalPolicyVersion()
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+        self._snapshot: Optional[EnforcementSnapshot] = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def _new_session(self) -> Session:
+        if self.session_factory is None:
+            from app.db.session import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    @property
+    def snapshot(self) -> EnforcementSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            # Only before startup has loaded the first snapshot
+            snapshot = self.reload()
+        return snapshot
+
+    @property
+    def engine(self) -> EnforcementEngine:
+        return self.snapshot.engine
+
+    def reload(self, db: Optional[Session] = None) -> EnforcementSnapshot:
+        """Rebuild the engine from the database and publish it."""
+        with self._reload_lock:
+            version = self.version_store.get()
+            if db is not None:
+                engine = load_engine(db)
+            else:
+                session = self._new_session()
+                try:
+                    engine = load_engine(session)
+                finally:
+                    session.close()
+            snapshot = EnforcementSnapshot(engine, version)
+            self._snapshot = snapshot
+            self.logger.info(
+                f"Loaded enforcement snapshot version {version} with "
+                f"{len(engine.active_rules)} active rules"
+            )
+            return snapshot
+
+    def notify_changed(self, db: Optional[Session] = None) -> EnforcementSnapshot:
+        """Record a rule or policy change and reload this worker's snapshot."""
+        self.version_store.bump()
+        return self.reload(db)
+
+    def refresh_if_stale(self) -> bool:
+        """Reload when another worker has published a newer version."""
+        snapshot = self._snapshot
+        if snapshot is not None and self.version_store.get() == snapshot.version:
+            return False
+        self.reload()
+        return True
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh_if_stale()
+            except Exception as e:
+                # Keep serving the last good snapshot
+                self.logger.error(f"Failed to refresh enforcement snapshot: {str(e)}")
+
+    def start_watcher(self) -> None:
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="enforcement-snapshot", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_interval)
+            self._watcher = None
+
+def _default_version_store():
+    url = os.getenv("ENFORCEMENT_VERSION_REDIS_URL")
+    return RedisPolicyVersion(url) if url else DatabasePolicyVersion()
+
+shared_engine = SharedEnforcementEngine(version_store=_default_version_store())
+audit_writer = AuditLogWriter(EnforcementAuditLog)
 
 class EnforcementService:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        shared: Optional[SharedEnforcementEngine] = None,
+        audit: Optional[AuditLogWriter] = None
+    ):
         self.db = db
-        self.engine = EnforcementEngine()
-        self._load_policies()
-
-    def _load_policies(self) -> None:
-        """Load all active policies and rules from the database into the enforcement engine."""
-        db_policies = self.db.query(DBPolicy).filter(DBPolicy.is_active == True).all()
-        for db_policy in db_policies:
-            core_policy = CorePolicy(
-                id=db_policy.id,
-                name=db_policy.name,
-                description=db_policy.description,
-                rules=[self._db_rule_to_core(rule) for rule in db_policy.rules if rule.is_active],
-                default_action=EnforcementAction(db_policy.default_action),
-                created_at=db_policy.created_at,
-                updated_at=db_policy.updated_at,
-                is_active=db_policy.is_active
-            )
-            self.engine.add_policy(core_policy)
-
-    def _db_rule_to_core(self, db_rule: DBRule) -> CoreRule:
-        """Convert a database rule to a core rule."""
-        return CoreRule(
-            id=db_rule.id,
-            name=db_rule.name,
-            description=db_rule.description,
-            capability=AICapability(db_rule.capability),
-            level=db_rule.level,
-            action=EnforcementAction(db_rule.action),
-            conditions=db_rule.conditions,
-            exceptions=db_rule.exceptions,
-            created_at=db_rule.created_at,
-            updated_at=db_rule.updated_at,
-            is_active=db_rule.is_active
-        )
+        self.shared = shared or shared_engine
+        self.audit_writer = audit or audit_writer
+
+    @property
+    def engine(self) -> EnforcementEngine:
+        """Current process-wide engine snapshot."""
+        return self.shared.engine
 
     def create_rule(self, rule_data: Dict[str, Any]) -> DBRule:
         """Create a new enforcement rule."""
@@ -81,8 +280,8 @@ class EnforcementService:
         self.db.commit()
         self.db.refresh(db_policy)
         
-        # Reload policies in the engine
-        self._load_policies()
+        # Publish a new engine snapshot to every worker
+        self.shared.notify_changed(self.db)
         return db_policy
 
     def evaluate_request(
@@ -96,24 +295,23 @@ class EnforcementService:
         context = EnforcementContext(user_id, organization_id)
         action = self.engine.evaluate_request(capability, context, request_data)
         
-        # Create audit log
-        audit_log = EnforcementAuditLog(
-            id=str(uuid4()),
-            user_id=user_id,
-            organization_id=organization_id,
-            capability=capability.value,
-            request_data=request_data,
-            action_taken=action.value,
-            metadata={
+        # Queue the audit log; it is written in batches off the request path
+        self.audit_writer.submit({
+            "id": str(uuid4()),
+            "user_id": user_id,
+            "organization_id": organization_id,
+            "capability": capability.value,
+            "request_data": request_data,
+            "action_taken": action.value,
+            "timestamp": context.timestamp,
+            "metadata": {
                 "context": {
                     "user_id": context.user_id,
                     "organization_id": context.organization_id,
                     "timestamp": context.timestamp.isoformat()
                 }
             }
-        )
-        self.db.add(audit_log)
-        self.db.commit()
+        })
         
         return action
 
@@ -138,8 +336,8 @@ class EnforcementService:
         self.db.commit()
         self.db.refresh(db_rule)
         
-        # Reload policies to update the engine
-        self._load_policies()
+        # Publish a new engine snapshot to every worker
+        self.shared.notify_changed(self.db)
         return db_rule
 
     def update_policy(
@@ -164,8 +362,8 @@ class EnforcementService:
         self.db.commit()
         self.db.refresh(db_policy)
         
-        # Reload policies to update the engine
-        self._load_policies()
+        # Publish a new engine snapshot to every worker
+        self.shared.notify_changed(self.db)
         return db_policy
 
     def get_audit_logs(
@@ -0,0 +1,290 @@
+from typing import Dict, Any, Iterator, List, Optional
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services.workflow_features import BatchFeatureExtractor, FEATURE_COLUMNS
+
+DEFAULT_FEATURE_STORE_PATH = os.getenv("FEATURE_STORE_PATH", "var/features")
+
+class FeatureSet:
+    """Columnar view of stored execution features"""
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        workflow_ids: np.ndarray,
+        started_at: np.ndarray,
+        features: np.ndarray,
+        targets: np.ndarray,
+        execution_time: np.ndarray
+    ):
+        self.ids = ids
+        self.workflow_ids = workflow_ids
+        self.started_at = started_at
+        self.features = features
+        self.targets = targets
+        self.execution_time = execution_time
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def empty(cls) -> "FeatureSet":
+        return cls(
+            ids=np.empty(0, dtype=np.int64),
+            workflow_ids=np.empty(0, dtype=np.int64),
+            started_at=np.empty(0, dtype="datetime64[us]"),
+            features=np.empty((0, len(FEATURE_COLUMNS))),
+            targets=np.empty(0),
+            execution_time=np.empty(0)
+        )
+
+    def take(self, index: np.ndarray) -> "FeatureSet":
+        return FeatureSet(
+            ids=self.ids[index],
+            workflow_ids=self.workflow_ids[index],
+            started_at=self.started_at[index],
+            features=self.features[index],
+            targets=self.targets[index],
+            execution_time=self.execution_time[index]
+        )
+
+    @property
+    def historical_times(self) -> np.ndarray:
+        """Recorded execution times, excluding executions without one"""
+        return self.execution_time[~np.isnan(self.execution_time)]
+
+class ExecutionFeatureStore:
+    """Incremental, array-backed store of workflow execution features.
+
+    Each refresh reads only executions completed after the stored
+    high-water mark ``(completed_at, id)``, runs them through
+    ``BatchFeatureExtractor`` straight from the result rows and appends one
+    segment of ``.npy`` files. Executions are only ingested once they have a
+    ``completed_at``, since features of in-flight runs are not final yet.
+    Refreshes hold an exclusive lock on ``<tenant>/.lock``, so workers in
+    different processes never write the same segment or manifest at once.
+
+    Layout::
+
+        <root>/<tenant>/manifest.json
+        <root>/<tenant>/seg-<n>/{ids,workflow_ids,started_at,features,targets,execution_time}.npy
+    """
+
+    MANIFEST_FILE = "manifest.json"
+    LOCK_FILE = ".lock"
+    ARRAYS = ["ids", "workflow_ids", "started_at", "features", "targets", "execution_time"]
+
+    def __init__(
+        self,
+        tenant_id: Any,
+        root: str = DEFAULT_FEATURE_STORE_PATH,
+        window: timedelta = timedelta(days=90),
+        per_workflow_limit: int = 1000,
+        fetch_size: int = 50000,
+        max_segments: int = 32,
+        extractor: Optional[BatchFeatureExtractor] = None
+    ):
+        self.tenant_id = tenant_id
+        self.path = os.path.join(root, str(tenant_id))
+        self.window = window
+        self.per_workflow_limit = per_workflow_limit
+        self.fetch_size = fetch_size
+        self.max_segments = max_segments
+        self.extractor = extractor or BatchFeatureExtractor()
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        """Serialize writers in this process and across processes sharing the store"""
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            with open(os.path.join(self.path, self.LOCK_FILE), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.path, self.MANIFEST_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"segments": [], "high_water_mark": None, "next_segment": 0}
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        tmp_path = os.path.join(self.path, f".{self.MANIFEST_FILE}-{uuid.uuid4().hex}")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.path, self.MANIFEST_FILE))
+
+    @property
+    def high_water_mark(self) -> Optional[Dict[str, Any]]:
+        return self._read_manifest()["high_water_mark"]
+
+    def _write_segment(self, manifest: Dict[str, Any], feature_set: FeatureSet) -> str:
+        name = f"seg-{manifest['next_segment']:06d}"
+        tmp_dir = os.path.join(self.path, f".tmp-{name}-{uuid.uuid4().hex[:8]}")
+        os.makedirs(tmp_dir)
+        try:
+            for array_name in self.ARRAYS:
+                np.save(os.path.join(tmp_dir, f"{array_name}.npy"), getattr(feature_set, array_name))
+            os.rename(tmp_dir, os.path.join(self.path, name))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        manifest["next_segment"] += 1
+        manifest["segments"].append(name)
+        return name
+
+    def _rows_to_feature_set(self, rows: List[Any]) -> FeatureSet:
+        return FeatureSet(
+            ids=np.array([row.id for row in rows], dtype=np.int64),
+            workflow_ids=np.array([row.workflow_id for row in rows], dtype=np.int64),
+            started_at=pd.to_datetime(
+                [row.started_at for row in rows], utc=True
+            ).tz_localize(None).to_numpy(dtype="datetime64[us]"),
+            features=self.extractor.extract(rows),
+            targets=self.extractor.extract_targets(rows),
+            execution_time=np.array(
+                [np.nan if row.execution_time is None else row.execution_time for row in rows],
+                dtype=float
+            )
+        )
+
+    def refresh(self, db: Session) -> int:
+        """Append executions completed since the high-water mark"""
+        with self._exclusive():
+            # Read under the lock, another worker may have just advanced the mark
+            manifest = self._read_manifest()
+            hwm = manifest["high_water_mark"]
+
+            query = text(f"""
+                SELECT
+                    id,
+                    workflow_id,
+                    started_at,
+                    completed_at,
+                    status,
+                    input_data,
+                    execution_time,
+                    resource_usage
+                FROM workflow_executions
+                WHERE tenant_id = :tenant_id
+                AND completed_at IS NOT NULL
+                AND started_at > :window_start
+                {"AND (completed_at, id) > (:hwm_completed_at, :hwm_id)" if hwm else ""}
+                ORDER BY completed_at, id
+            """)
+            params = {
+                "tenant_id": self.tenant_id,
+                "window_start": datetime.utcnow() - self.window
+            }
+            if hwm:
+                params["hwm_completed_at"] = datetime.fromisoformat(hwm["completed_at"])
+                params["hwm_id"] = hwm["id"]
+
+            result = db.execute(query, params)
+            appended = 0
+            while True:
+                rows = result.fetchmany(self.fetch_size)
+                if not rows:
+                    break
+                self._write_segment(manifest, self._rows_to_feature_set(rows))
+                last = rows[-1]
+                manifest["high_water_mark"] = {
+                    "completed_at": last.completed_at.isoformat(),
+                    "id": last.id
+                }
+                # Persist the mark per segment so a crash never re-reads them
+                self._write_manifest(manifest)
+                appended += len(rows)
+
+            if len(manifest["segments"]) > self.max_segments:
+                self._compact(manifest)
+
+            if appended:
+                self.logger.info(f"Appended {appended} executions to feature store for tenant {self.tenant_id}")
+            return appended
+
+    def _load_segment(self, name: str) -> FeatureSet:
+        segment_dir = os.path.join(self.path, name)
+        return FeatureSet(**{
+            array_name: np.load(os.path.join(segment_dir, f"{array_name}.npy"), mmap_mode="r")
+            for array_name in self.ARRAYS
+        })
+
+    def _concat(self, segments: List[str]) -> FeatureSet:
+        if not segments:
+            return FeatureSet.empty()
+        parts = [self._load_segment(name) for name in segments]
+        return FeatureSet(**{
+            array_name: np.concatenate([getattr(part, array_name) for part in parts])
+            for array_name in self.ARRAYS
+        })
+
+    def _compact(self, manifest: Dict[str, Any]) -> None:
+        """Merge all segments into one, dropping rows outside the window"""
+        old_segments = list(manifest["segments"])
+        merged = self._select(self._concat(old_segments), limit_per_workflow=False)
+        manifest["segments"] = []
+        self._write_segment(manifest, merged)
+        self._write_manifest(manifest)
+        for name in old_segments:
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def _select(self, feature_set: FeatureSet, limit_per_workflow: bool = True) -> FeatureSet:
+        if len(feature_set) == 0:
+            return feature_set
+
+        # Drop duplicates left by concurrent refreshes from several workers
+        _, first = np.unique(feature_set.ids, return_index=True)
+        feature_set = feature_set.take(np.sort(first))
+
+        window_start = np.datetime64(datetime.utcnow() - self.window, "us")
+        feature_set = feature_set.take(np.flatnonzero(feature_set.started_at > window_start))
+
+        if limit_per_workflow and len(feature_set):
+            # Keep the most recent N executions per workflow, like the ROW_NUMBER() query
+            frame = pd.DataFrame({
+                "workflow_id": feature_set.workflow_ids,
+                "started_at": feature_set.started_at
+            })
+            rank = frame.groupby("workflow_id")["started_at"].rank(method="first", ascending=False)
+            feature_set = feature_set.take(np.flatnonzero(rank.to_numpy() <= self.per_workflow_limit))
+        return feature_set
+
+    def load(self) -> FeatureSet:
+        """Read the current training window, oldest first, without touching the database"""
+        manifest = self._read_manifest()
+        feature_set = self._select(self._concat(manifest["segments"]))
+        return feature_set.take(np.argsort(feature_set.started_at, kind="stable"))
+
+    def clear(self) -> None:
+        """Remove all stored segments and the high-water mark"""
+        with self._exclusive():
+            # Keep the lock file, other workers may be waiting on it
+            for name in os.listdir(self.path):
+                if name == self.LOCK_FILE:
+                    continue
+                path = os.path.join(self.path, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
@@ -0,0 +1,102 @@
+from typing import Any, Callable, Optional
+from concurrent.futures import Future, ProcessPoolExecutor
+import importlib
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import types
+
+HEAVY_ML_MODULES = ("tensorflow", "torch", "transformers")
+
+class LazyModule(types.ModuleType):
+    """Module proxy that defers the real import until first attribute access.
+
+    Lets API workers reference TensorFlow/torch/transformers at module level
+    without paying their import time and memory on routes that never use them.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._lazy_lock = threading.Lock()
+        self._lazy_module: Optional[types.ModuleType] = None
+
+    def _load(self) -> types.ModuleType:
+        if self._lazy_module is None:
+            with self._lazy_lock:
+                if self._lazy_module is None:
+                    logging.getLogger(__name__).info(f"Loading {self.__name__} on first use")
+                    self._lazy_module = importlib.import_module(self.__name__)
+        return self._lazy_module
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("_lazy"):
+            raise AttributeError(attr)
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._lazy_module is not None
+
+tensorflow = LazyModule("tensorflow")
+torch = LazyModule("torch")
+transformers = LazyModule("transformers")
+
+def loaded_ml_modules() -> list:
+    """Return the heavy ML frameworks already imported in this process"""
+    return [name for name in HEAVY_ML_MODULES if name in sys.modules]
+
+class InferenceProcess:
+    """Dedicated process for running model code outside the API worker.
+
+    Uses the ``spawn`` start method so the child starts clean and only
+    imports the frameworks the submitted functions need. Functions and
+    arguments must be picklable.
+    """
+
+    def __init__(self, max_workers: int = 1):
+        self.max_workers = max_workers
+        self.logger = logging.getLogger(__name__)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self.logger.info(f"Starting inference process pool with {self.max_workers} workers")
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        return self._get_executor().submit(fn, *args, **kwargs)
+
+    def call(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        return self.submit(fn, *args, **kwargs).result(timeout=timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+_inference_process: Optional[InferenceProcess] = None
+_inference_lock = threading.Lock()
+
+def get_inference_process() -> InferenceProcess:
+    """Shared inference process for this worker"""
+    global _inference_process
+    if _inference_process is None:
+        with _inference_lock:
+            if _inference_process is None:
+                _inference_process = InferenceProcess(
+                    max_workers=int(os.getenv("ML_INFERENCE_WORKERS", "1"))
+                )
+    return _inference_process
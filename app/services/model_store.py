@@ -0,0 +1,178 @@
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import uuid
+
+import joblib
+
+DEFAULT_MODEL_STORE_PATH = os.getenv("MODEL_STORE_PATH", "var/models")
+
+_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.\-]+(/[A-Za-z0-9_.\-]+)*$")
+
+class ModelStore:
+    """Versioned on-disk store for trained models.
+
+    Layout::
+
+        <root>/<name>/<version>/model.joblib
+        <root>/<name>/<version>/metadata.json
+        <root>/<name>/CURRENT
+
+    Versions are written to a temporary directory and renamed into place, and
+    ``CURRENT`` is swapped with ``os.replace``, so readers in other processes
+    only ever see a complete version. Artifacts are dumped uncompressed so
+    their numpy buffers can be memory-mapped on load.
+    """
+
+    CURRENT_FILE = "CURRENT"
+    MODEL_FILE = "model.joblib"
+    METADATA_FILE = "metadata.json"
+
+    def __init__(self, root: str = DEFAULT_MODEL_STORE_PATH, keep_versions: int = 5):
+        self.root = root
+        self.keep_versions = keep_versions
+        self.logger = logging.getLogger(__name__)
+        self._loaded: Dict[str, Tuple[str, Any, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _model_dir(self, name: str) -> str:
+        if not _NAME_PATTERN.match(name) or ".." in name.split("/"):
+            raise ValueError(f"Invalid model name: {name}")
+        return os.path.join(self.root, *name.split("/"))
+
+    def save(self, name: str, artifact: Any, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Write a new version without promoting it"""
+        model_dir = self._model_dir(name)
+        os.makedirs(model_dir, exist_ok=True)
+
+        version = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+        tmp_dir = os.path.join(model_dir, f".tmp-{version}")
+        os.makedirs(tmp_dir)
+        try:
+            joblib.dump(artifact, os.path.join(tmp_dir, self.MODEL_FILE))
+            with open(os.path.join(tmp_dir, self.METADATA_FILE), "w") as f:
+                json.dump(
+                    {
+                        **(metadata or {}),
+                        "version": version,
+                        "created_at": datetime.utcnow().isoformat()
+                    },
+                    f,
+                    default=str
+                )
+            os.rename(tmp_dir, os.path.join(model_dir, version))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return version
+
+    def promote(self, name: str, version: str) -> None:
+        """Atomically point CURRENT at an existing version"""
+        model_dir = self._model_dir(name)
+        if not os.path.isdir(os.path.join(model_dir, version)):
+            raise ValueError(f"Model {name} has no version {version}")
+
+        tmp_path = os.path.join(model_dir, f".{self.CURRENT_FILE}-{uuid.uuid4().hex}")
+        with open(tmp_path, "w") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(model_dir, self.CURRENT_FILE))
+        self.logger.info(f"Promoted model {name} to version {version}")
+
+    def publish(self, name: str, artifact: Any, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Save, promote and prune in one step"""
+        version = self.save(name, artifact, metadata)
+        self.promote(name, version)
+        self.prune(name)
+        return version
+
+    def current_version(self, name: str) -> Optional[str]:
+        """Return the promoted version, if any"""
+        try:
+            with open(os.path.join(self._model_dir(name), self.CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def list_versions(self, name: str) -> List[str]:
+        """Return stored versions, oldest first"""
+        model_dir = self._model_dir(name)
+        if not os.path.isdir(model_dir):
+            return []
+        return sorted(
+            entry for entry in os.listdir(model_dir)
+            if not entry.startswith(".") and entry != self.CURRENT_FILE
+            and os.path.isdir(os.path.join(model_dir, entry))
+        )
+
+    def get_metadata(self, name: str, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Read metadata for a version, defaulting to CURRENT"""
+        version = version or self.current_version(name)
+        if not version:
+            return None
+        try:
+            with open(os.path.join(self._model_dir(name), version, self.METADATA_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def load(
+        self,
+        name: str,
+        version: Optional[str] = None,
+        mmap_mode: Optional[str] = "r"
+    ) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        """Load a version (default CURRENT), memory-mapping numpy buffers.
+
+        Loaded artifacts are kept per process and reused until CURRENT moves.
+        """
+        version = version or self.current_version(name)
+        if not version:
+            return None
+
+        with self._lock:
+            cached = self._loaded.get(name)
+            if cached and cached[0] == version:
+                return cached[1], cached[2]
+
+        version_dir = os.path.join(self._model_dir(name), version)
+        artifact = joblib.load(os.path.join(version_dir, self.MODEL_FILE), mmap_mode=mmap_mode)
+        metadata = self.get_metadata(name, version) or {}
+
+        with self._lock:
+            self._loaded[name] = (version, artifact, metadata)
+        return artifact, metadata
+
+    def preload(self, prefix: str = "") -> int:
+        """Load every promoted model under a prefix, e.g. at worker startup"""
+        base = self._model_dir(prefix) if prefix else self.root
+        loaded = 0
+        if not os.path.isdir(base):
+            return loaded
+
+        for dirpath, _, filenames in os.walk(base):
+            if self.CURRENT_FILE not in filenames:
+                continue
+            name = os.path.relpath(dirpath, self.root).replace(os.sep, "/")
+            try:
+                if self.load(name) is not None:
+                    loaded += 1
+            except Exception as e:
+                self.logger.error(f"Failed to preload model {name}: {str(e)}")
+        return loaded
+
+    def prune(self, name: str) -> List[str]:
+        """Delete old versions beyond keep_versions, never the current one"""
+        current = self.current_version(name)
+        versions = self.list_versions(name)
+        stale = [v for v in versions[:-self.keep_versions] if v != current] if self.keep_versions > 0 else []
+        model_dir = self._model_dir(name)
+        for version in stale:
+            shutil.rmtree(os.path.join(model_dir, version), ignore_errors=True)
+        return stale
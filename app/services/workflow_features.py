@@ -0,0 +1,246 @@
+from typing import Dict, Any, Sequence, Tuple
+from collections import OrderedDict
+import hashlib
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Column layout matches WorkflowOptimizer._extract_advanced_features:
+# basic (7) + temporal (5) + resource (8) + pattern (6)
+BASIC_FEATURES = [
+    "input_field_count",
+    "resource_field_count",
+    "cpu_usage",
+    "memory_usage",
+    "io_operations",
+    "status_encoded",
+    "complexity_score"
+]
+
+TEMPORAL_FEATURES = [
+    "hour_of_day",
+    "day_of_week",
+    "is_business_hour",
+    "is_weekend",
+    "duration"
+]
+
+RESOURCE_FEATURES = [
+    "resource_cpu_usage",
+    "cpu_variance",
+    "resource_memory_usage",
+    "memory_variance",
+    "resource_io_operations",
+    "io_wait_time",
+    "cpu_efficiency",
+    "memory_efficiency"
+]
+
+PATTERN_FEATURES = [
+    "data_size",
+    "field_count",
+    "nested_depth",
+    "array_count",
+    "has_large_arrays",
+    "has_complex_objects"
+]
+
+FEATURE_COLUMNS = BASIC_FEATURES + TEMPORAL_FEATURES + RESOURCE_FEATURES + PATTERN_FEATURES
+
+STATUS_MAP = {
+    "completed": 3,
+    "running": 2,
+    "failed": 1,
+    "pending": 0
+}
+
+def calculate_nested_depth(data: Any, current_depth: int = 0) -> int:
+    """Calculate maximum nesting depth of data structure"""
+    if isinstance(data, dict):
+        return max(
+            (calculate_nested_depth(v, current_depth + 1) for v in data.values()),
+            default=current_depth
+        )
+    elif isinstance(data, list):
+        return max(
+            (calculate_nested_depth(item, current_depth + 1) for item in data),
+            default=current_depth
+        )
+    return current_depth
+
+def calculate_complexity_score(input_data: Dict[str, Any]) -> float:
+    """Calculate complexity score for workflow input"""
+    field_count = len(input_data)
+    nested_count = sum(
+        1 for value in input_data.values()
+        if isinstance(value, (dict, list))
+    )
+    return (field_count * 0.6) + (nested_count * 0.4)
+
+class BatchFeatureExtractor:
+    """Columnar feature extraction over a whole execution result set.
+
+    Input-derived values (nesting depth, complexity, data size, array count)
+    are cached per input-data hash, so repeated payloads across executions
+    and across training runs are only walked once.
+    """
+
+    def __init__(self, cache_size: int = 50000):
+        self.logger = logging.getLogger(__name__)
+        self.cache_size = cache_size
+        self._input_cache: "OrderedDict[str, Tuple[float, float, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @staticmethod
+    def input_hash(input_data: Dict[str, Any]) -> str:
+        """Hash of an input payload.
+
+        Uses ``repr`` rather than canonical JSON: payloads decoded from the
+        same JSON column keep their key order, and a reordered payload only
+        costs a cache miss.
+        """
+        return hashlib.blake2b(repr(input_data).encode("utf-8"), digest_size=16).hexdigest()
+
+    def _input_features(self, input_data: Dict[str, Any]) -> Tuple[float, float, float, float]:
+        """Return (nested_depth, complexity, data_size, array_count) for a payload"""
+        if not input_data:
+            return (0.0, 0.0, 0.0, 0.0)
+
+        key = self.input_hash(input_data)
+        with self._lock:
+            cached = self._input_cache.get(key)
+            if cached is not None:
+                self._input_cache.move_to_end(key)
+                self.cache_hits += 1
+                return cached
+
+        values = input_data.values()
+        features = (
+            float(calculate_nested_depth(input_data)),
+            float(calculate_complexity_score(input_data)),
+            float(sum(len(str(v)) for v in values)),
+            float(sum(1 for v in values if isinstance(v, list)))
+        )
+
+        with self._lock:
+            self.cache_misses += 1
+            self._input_cache[key] = features
+            if len(self._input_cache) > self.cache_size:
+                self._input_cache.popitem(last=False)
+        return features
+
+    def extract(self, executions: Sequence[Any]) -> np.ndarray:
+        """Extract the full feature matrix for a batch of executions.
+
+        Accepts pydantic ``WorkflowExecution`` objects or raw result rows;
+        anything exposing the execution columns as attributes works.
+        """
+        n = len(executions)
+        if n == 0:
+            return np.empty((0, len(FEATURE_COLUMNS)))
+
+        input_data = [e.input_data or {} for e in executions]
+        resource_usage = [e.resource_usage or {} for e in executions]
+
+        # Single pass over the python objects, everything else is columnar
+        input_field_count = np.fromiter((len(d) for d in input_data), dtype=float, count=n)
+        resource_field_count = np.fromiter((len(r) for r in resource_usage), dtype=float, count=n)
+        status_encoded = np.fromiter(
+            (STATUS_MAP.get((e.status or "").lower(), 0) for e in executions),
+            dtype=float,
+            count=n
+        )
+
+        resource_matrix = np.array(
+            [
+                (
+                    r.get("cpu_usage", 0),
+                    r.get("cpu_variance", 0),
+                    r.get("memory_usage", 0),
+                    r.get("memory_variance", 0),
+                    r.get("io_operations", 0),
+                    r.get("io_wait_time", 0)
+                )
+                for r in resource_usage
+            ],
+            dtype=float
+        )
+        cpu_usage, cpu_variance, memory_usage, memory_variance, io_operations, io_wait_time = resource_matrix.T
+
+        input_matrix = np.array([self._input_features(d) for d in input_data], dtype=float)
+        nested_depth, complexity, data_size, array_count = input_matrix.T
+
+        started = pd.to_datetime([e.started_at for e in executions])
+        completed = pd.to_datetime([e.completed_at for e in executions])
+        hour = np.asarray(started.hour, dtype=float)
+        day_of_week = np.asarray(started.dayofweek, dtype=float)
+        duration = np.nan_to_num(np.asarray((completed - started).total_seconds(), dtype=float))
+
+        columns = [
+            input_field_count,
+            resource_field_count,
+            cpu_usage,
+            memory_usage,
+            io_operations,
+            status_encoded,
+            complexity,
+            hour,
+            day_of_week,
+            ((hour >= 9) & (hour <= 17)).astype(float),
+            (day_of_week >= 5).astype(float),
+            duration,
+            cpu_usage,
+            cpu_variance,
+            memory_usage,
+            memory_variance,
+            io_operations,
+            io_wait_time,
+            cpu_usage / (io_wait_time + 1),
+            memory_usage / (io_operations + 1),
+            data_size,
+            input_field_count,
+            nested_depth,
+            array_count,
+            (array_count > 0).astype(float),
+            (nested_depth > 2).astype(float)
+        ]
+        return np.column_stack(columns)
+
+    def extract_frame(self, executions: Sequence[Any]) -> pd.DataFrame:
+        """Extract the feature matrix as a DataFrame with named columns"""
+        return pd.DataFrame(self.extract(executions), columns=FEATURE_COLUMNS)
+
+    def extract_targets(self, executions: Sequence[Any]) -> np.ndarray:
+        """Extract execution time targets, falling back to wall-clock duration"""
+        n = len(executions)
+        if n == 0:
+            return np.empty(0)
+
+        execution_time = np.array(
+            [np.nan if e.execution_time is None else e.execution_time for e in executions],
+            dtype=float
+        )
+        started = pd.to_datetime([e.started_at for e in executions])
+        completed = pd.to_datetime([e.completed_at for e in executions])
+        duration = np.nan_to_num(np.asarray((completed - started).total_seconds(), dtype=float))
+        return np.where(np.isnan(execution_time), duration, execution_time)
+
+    def cache_info(self) -> Dict[str, Any]:
+        """Return input cache statistics"""
+        return {
+            "size": len(self._input_cache),
+            "max_size": self.cache_size,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses
+        }
+
+    def clear_cache(self) -> None:
+        """Drop all cached input features"""
+        with self._lock:
+            self._input_cache.clear()
+            self.cache_hits = 0
+            self.cache_misses = 0
@@ -10,12 +10,20 @@ from sklearn.model_selection import cross_val_score, TimeSeriesSplit
 from sklearn.metrics import mean_squared_error, r2_score
 from pydantic import BaseModel
 import json
-from functools import lru_cache
 from concurrent.futures import ThreadPoolExecutor
+import threading
 import pandas as pd
 from scipy import stats
 import joblib
 
+from app.services.feature_store import ExecutionFeatureStore
+from app.services.model_store import ModelStore
+from app.services.workflow_features import (
+    BatchFeatureExtractor,
+    calculate_complexity_score,
+    calculate_nested_depth
+)
+
 class WorkflowMetrics(BaseModel):
     workflow_id: int
     name: str
@@ -41,10 +49,16 @@ class WorkflowExecution(BaseModel):
     risk_alerts: Optional[Dict[str, Any]]
     tenant_id: int
 
+MODEL_NAMESPACE = "workflow_optimizer"
+MODEL_MAX_AGE = timedelta(days=1)
+
 class WorkflowOptimizer:
-    _model_cache = {}
+    _model_store = ModelStore()
+    _retraining = set()
+    _retrain_lock = threading.Lock()
     _executor = ThreadPoolExecutor(max_workers=4)
-    _feature_cache = {}
+    _feature_extractor = BatchFeatureExtractor()
+    _feature_stores = {}
     
     def __init__(self, db: Session):
         self.db = db
@@ -53,6 +67,7 @@ class WorkflowOptimizer:
         self._scaler = None
         self._model_initialized = False
         self._model_metrics = {}
+        self._model_version = None
     
     @property
     def performance_model(self):
@@ -67,41 +82,9 @@ class WorkflowOptimizer:
         return self._scaler
     
     def _extract_advanced_features(self, executions: List[WorkflowExecution]) -> np.ndarray:
-        """Extract advanced features from workflow executions"""
+        """Extract advanced features from workflow executions in one columnar pass"""
         try:
-            features = []
-            for execution in executions:
-                # Basic features
-                basic_features = [
-                    len(execution.input_data),
-                    len(execution.resource_usage),
-                    execution.resource_usage.get("cpu_usage", 0),
-                    execution.resource_usage.get("memory_usage", 0),
-                    execution.resource_usage.get("io_operations", 0),
-                    self._status_to_numeric(execution.status),
-                    self._get_complexity_score(execution.input_data)
-                ]
-                
-                # Temporal features
-                temporal_features = self._extract_temporal_features(execution)
-                
-                # Resource utilization features
-                resource_features = self._extract_resource_features(execution)
-                
-                # Workflow pattern features
-                pattern_features = self._extract_pattern_features(execution)
-                
-                # Combine all features
-                feature_vector = (
-                    basic_features +
-                    temporal_features +
-                    resource_features +
-                    pattern_features
-                )
-                
-                features.append(feature_vector)
-            
-            return np.array(features)
+            return self._feature_extractor.extract(executions)
         except Exception as e:
             self.logger.error(f"Failed to extract advanced features: {str(e)}")
             return np.array([])
@@ -195,98 +178,182 @@ class WorkflowOptimizer:
     
     def _calculate_nested_depth(self, data: Any, current_depth: int = 0) -> int:
         """Calculate maximum nesting depth of data structure"""
-        if isinstance(data, dict):
-            return max(
-                self._calculate_nested_depth(v, current_depth + 1)
-                for v in data.values()
-            )
-        elif isinstance(data, list):
-            return max(
-                self._calculate_nested_depth(item, current_depth + 1)
-                for item in data
+        return calculate_nested_depth(data, current_depth)
+    
+    def _model_name(self) -> str:
+        """Model store name for the current tenant"""
+        return f"{MODEL_NAMESPACE}/{self.db.bind.url.database}"
+    
+    def _get_feature_store(self) -> ExecutionFeatureStore:
+        """Shared feature store for the current tenant"""
+        tenant_id = self.db.bind.url.database
+        store = self._feature_stores.get(tenant_id)
+        if store is None:
+            store = self._feature_stores.setdefault(
+                tenant_id,
+                ExecutionFeatureStore(tenant_id, extractor=self._feature_extractor)
             )
-        return current_depth
+        return store
     
     def _initialize_models(self):
-        """Initialize AI models with improved architecture"""
+        """Load the promoted model version from the model store.
+
+        Never trains inline: until a background retrain has published a
+        version the model stays unavailable and callers fall back.
+        """
         try:
-            cache_key = f"{self.db.bind.url.database}_{datetime.now().date()}"
-            
-            if cache_key in self._model_cache:
-                self._performance_model, self._scaler = self._model_cache[cache_key]
-                self._model_initialized = True
+            stored = self._model_store.load(self._model_name())
+            if stored is None:
+                self.logger.info(f"No trained model published for {self._model_name()}")
                 return
             
-            # Get historical workflow data
-            workflow_data = self._get_historical_workflow_data()
-            
-            if workflow_data:
-                # Extract advanced features
-                features = self._extract_advanced_features(workflow_data)
-                targets = self._extract_performance_targets(workflow_data)
-                
-                if len(features) > 0 and len(targets) > 0:
-                    # Scale features
-                    self._scaler = StandardScaler()
-                    scaled_features = self._scaler.fit_transform(features)
-                    
-                    # Train multiple models
-                    models = {
-                        'rf': RandomForestRegressor(
-                            n_estimators=100,
-                            max_depth=10,
-                            min_samples_split=5,
-                            random_state=42,
-                            n_jobs=-1
-                        ),
-                        'gb': GradientBoostingRegressor(
-                            n_estimators=100,
-                            max_depth=5,
-                            learning_rate=0.1,
-                            random_state=42
-                        )
-                    }
-                    
-                    # Cross-validation
-                    tscv = TimeSeriesSplit(n_splits=5)
-                    best_model = None
-                    best_score = float('-inf')
-                    
-                    for name, model in models.items():
-                        scores = cross_val_score(
-                            model,
-                            scaled_features,
-                            targets,
-                            cv=tscv,
-                            scoring='r2'
-                        )
-                        mean_score = np.mean(scores)
-                        
-                        if mean_score > best_score:
-                            best_score = mean_score
-                            best_model = model
-                    
-                    # Train best model on full dataset
-                    self._performance_model = best_model
-                    self._performance_model.fit(scaled_features, targets)
-                    
-                    # Calculate model metrics
-                    predictions = self._performance_model.predict(scaled_features)
-                    self._model_metrics = {
-                        'r2_score': r2_score(targets, predictions),
-                        'mse': mean_squared_error(targets, predictions),
-                        'cross_val_score': best_score
-                    }
-                    
-                    # Cache the models
-                    self._model_cache[cache_key] = (self._performance_model, self._scaler)
-                    self._model_initialized = True
-                    
-                    self.logger.info(f"Workflow optimization models initialized with R2 score: {self._model_metrics['r2_score']:.3f}")
+            artifact, metadata = stored
+            self._performance_model = artifact["model"]
+            self._scaler = artifact["scaler"]
+            self._model_metrics = metadata.get("metrics", {})
+            self._model_version = metadata.get("version")
+            self._model_initialized = True
         except Exception as e:
             self.logger.error(f"Failed to initialize models: {str(e)}")
             raise
     
+    @property
+    def model_version(self) -> Optional[str]:
+        if not self._model_initialized:
+            self._initialize_models()
+        return self._model_version
+    
+    def needs_retraining(self, max_age: timedelta = MODEL_MAX_AGE) -> bool:
+        """Check whether the published model is missing or older than max_age"""
+        metadata = self._model_store.get_metadata(self._model_name())
+        if not metadata or "trained_at" not in metadata:
+            return True
+        trained_at = datetime.fromisoformat(metadata["trained_at"])
+        return datetime.utcnow() - trained_at > max_age
+    
+    def train_models(self) -> Optional[Dict[str, Any]]:
+        """Train candidate models on historical data and return the best one"""
+        # Append new executions, then read precomputed features
+        store = self._get_feature_store()
+        store.refresh(self.db)
+        feature_set = store.load()
+        
+        if len(feature_set) == 0:
+            return None
+        
+        features = feature_set.features
+        targets = feature_set.targets
+        
+        # Scale features
+        scaler = StandardScaler()
+        scaled_features = scaler.fit_transform(features)
+        
+        # Train multiple models
+        models = {
+            'rf': RandomForestRegressor(
+                n_estimators=100,
+                max_depth=10,
+                min_samples_split=5,
+                random_state=42,
+                n_jobs=-1
+            ),
+            'gb': GradientBoostingRegressor(
+                n_estimators=100,
+                max_depth=5,
+                learning_rate=0.1,
+                random_state=42
+            )
+        }
+        
+        # Cross-validation
+        tscv = TimeSeriesSplit(n_splits=5)
+        best_model = None
+        best_name = None
+        best_score = float('-inf')
+        
+        for name, model in models.items():
+            scores = cross_val_score(
+                model,
+                scaled_features,
+                targets,
+                cv=tscv,
+                scoring='r2'
+            )
+            mean_score = np.mean(scores)
+            
+            if mean_score > best_score:
+                best_score = mean_score
+                best_model = model
+                best_name = name
+        
+        # Train best model on full dataset
+        best_model.fit(scaled_features, targets)
+        
+        # Calculate model metrics
+        predictions = best_model.predict(scaled_features)
+        return {
+            "model": best_model,
+            "scaler": scaler,
+            "model_type": best_name,
+            "training_rows": len(targets),
+            "metrics": {
+                'r2_score': float(r2_score(targets, predictions)),
+                'mse': float(mean_squared_error(targets, predictions)),
+                'cross_val_score': float(best_score)
+            }
+        }
+    
+    def retrain_models(self) -> Optional[str]:
+        """Train and atomically promote a new model version.
+
+        Meant for background jobs; concurrent retrains for the same tenant
+        within a process are collapsed into one.
+        """
+        name = self._model_name()
+        with self._retrain_lock:
+            if name in self._retraining:
+                return None
+            self._retraining.add(name)
+        
+        try:
+            trained = self.train_models()
+            if trained is None:
+                self.logger.info(f"Not enough data to train {name}")
+                return None
+            
+            version = self._model_store.publish(
+                name,
+                {"model": trained["model"], "scaler": trained["scaler"]},
+                metadata={
+                    "model_type": trained["model_type"],
+                    "training_rows": trained["training_rows"],
+                    "metrics": trained["metrics"],
+                    "trained_at": datetime.utcnow().isoformat()
+                }
+            )
+            
+            self._performance_model = trained["model"]
+            self._scaler = trained["scaler"]
+            self._model_metrics = trained["metrics"]
+            self._model_version = version
+            self._model_initialized = True
+            
+            self.logger.info(
+                f"Published {name} version {version} with R2 score: {trained['metrics']['r2_score']:.3f}"
+            )
+            return version
+        except Exception as e:
+            self.logger.error(f"Failed to retrain models: {str(e)}")
+            raise
+        finally:
+            with self._retrain_lock:
+                self._retraining.discard(name)
+    
+    @classmethod
+    def preload_models(cls) -> int:
+        """Memory-map every published optimizer model, e.g. at worker startup"""
+        return cls._model_store.preload(MODEL_NAMESPACE)
+    
     def _validate_model_predictions(self, predictions: np.ndarray) -> bool:
         """Validate model predictions using statistical methods"""
         try:
@@ -298,25 +365,19 @@ class WorkflowOptimizer:
             prediction_mean = np.mean(predictions)
             prediction_std = np.std(predictions)
             
-            # Validate against historical data
-            historical_data = self._get_historical_workflow_data()
-            if historical_data:
-                historical_times = [
-                    e.execution_time for e in historical_data
-                    if e.execution_time is not None
-                ]
+            # Validate against stored historical data
+            historical_times = self._get_feature_store().load().historical_times
+            if len(historical_times):
+                historical_mean = np.mean(historical_times)
+                historical_std = np.std(historical_times)
                 
-                if historical_times:
-                    historical_mean = np.mean(historical_times)
-                    historical_std = np.std(historical_times)
-                    
-                    # Check if predictions are within reasonable bounds
-                    within_bounds = (
-                        np.all(predictions >= historical_mean - 3 * historical_std) and
-                        np.all(predictions <= historical_mean + 3 * historical_std)
-                    )
-                    
-                    return within_bounds and not np.any(outliers)
+                # Check if predictions are within reasonable bounds
+                within_bounds = (
+                    np.all(predictions >= historical_mean - 3 * historical_std) and
+                    np.all(predictions <= historical_mean + 3 * historical_std)
+                )
+                
+                return within_bounds and not np.any(outliers)
             
             return True
         except Exception:
@@ -414,19 +475,7 @@ class WorkflowOptimizer:
     def _extract_performance_targets(self, executions: List[WorkflowExecution]) -> np.ndarray:
         """Extract performance targets from workflow executions"""
         try:
-            targets = []
-            for execution in executions:
-                if execution.execution_time is not None:
-                    targets.append(execution.execution_time)
-                else:
-                    # Calculate execution time from start and completion
-                    if execution.completed_at:
-                        execution_time = (execution.completed_at - execution.started_at).total_seconds()
-                        targets.append(execution_time)
-                    else:
-                        targets.append(0)  # Use 0 for failed or incomplete executions
-            
-            return np.array(targets)
+            return self._feature_extractor.extract_targets(executions)
         except Exception as e:
             self.logger.error(f"Failed to extract performance targets: {str(e)}")
             return np.array([])
@@ -441,19 +490,10 @@ class WorkflowOptimizer:
         }
         return status_map.get(status.lower(), 0)
     
-    @lru_cache(maxsize=1000)
     def _get_complexity_score(self, input_data: Dict[str, Any]) -> float:
-        """Calculate complexity score for workflow input with caching"""
+        """Calculate complexity score for workflow input"""
         try:
-            # Count number of fields and nested structures
-            field_count = len(input_data)
-            nested_count = sum(
-                1 for value in input_data.values()
-                if isinstance(value, (dict, list))
-            )
-            
-            # Calculate complexity score
-            return (field_count * 0.6) + (nested_count * 0.4)
+            return calculate_complexity_score(input_data)
         except Exception as e:
             self.logger.error(f"Failed to calculate complexity score: {str(e)}")
             return 0.0
@@ -0,0 +1,171 @@
+import pytest
+import json
+import os
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import Column, DateTime, JSON, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.services.audit_writer import AuditLogWriter
+
+Base = declarative_base()
+
+class AuditRecord(Base):
+    __tablename__ = "audit_records"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String)
+    request_data = Column(JSON)
+    timestamp = Column(DateTime)
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+@pytest.fixture
+def writer(session_factory, tmp_path):
+    writer = AuditLogWriter(
+        AuditRecord,
+        session_factory=session_factory,
+        batch_size=50,
+        flush_interval=0.05,
+        spill_path=str(tmp_path / "spill.jsonl")
+    )
+    yield writer
+    writer.stop()
+
+def make_record(user_id="user"):
+    return {"id": str(uuid4()), "user_id": user_id, "request_data": {"n": 1}, "timestamp": datetime.utcnow()}
+
+def count(session_factory):
+    session = session_factory()
+    try:
+        return session.query(AuditRecord).count()
+    finally:
+        session.close()
+
+def test_records_are_written_in_batches(writer, session_factory, monkeypatch):
+    batches = []
+    insert = writer._insert
+    monkeypatch.setattr(writer, "_insert", lambda rows: (batches.append(len(rows)), insert(rows)))
+
+    for _ in range(120):
+        writer.submit(make_record())
+    assert writer.flush(timeout=5)
+
+    assert count(session_factory) == 120
+    assert max(batches) == 50
+    assert len(batches) < 120
+
+def test_failed_batch_is_spilled_and_replayed(writer, session_factory, monkeypatch):
+    insert = writer._insert
+
+    def failing_insert(rows):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(writer, "_insert", failing_insert)
+    records = [make_record() for _ in range(10)]
+    for record in records:
+        writer.submit(record)
+    writer.flush(timeout=5)
+    assert count(session_factory) == 0
+    assert os.path.exists(writer.spill_path)
+
+    monkeypatch.setattr(writer, "_insert", insert)
+    writer._replay_spill()
+
+    assert count(session_factory) == 10
+    assert not writer._has_spill()
+
+def test_rejected_record_is_dead_lettered_without_blocking_others(writer, session_factory, monkeypatch):
+    insert = writer._insert
+
+    def reject_poison(rows):
+        if any(row["user_id"] == "poison" for row in rows):
+            raise ValueError("value rejected by the database")
+        insert(rows)
+
+    monkeypatch.setattr(writer, "_insert", reject_poison)
+    writer.max_attempts = 3
+    writer._spill([make_record("poison")] + [make_record() for _ in range(9)])
+
+    writer._replay_spill()
+    # Everything but the rejected record is written on the first replay
+    assert count(session_factory) == 9
+    assert writer._has_spill()
+
+    writer._replay_spill()
+    writer._replay_spill()
+    assert not writer._has_spill()
+    with open(writer.dead_letter_path) as f:
+        dead = [json.loads(line) for line in f]
+    assert [record["user_id"] for record in dead] == ["poison"]
+    assert dead[0]["__attempts__"] == 3
+
+def test_outage_does_not_count_as_an_attempt(writer, session_factory, monkeypatch):
+    def failing_insert(rows):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(writer, "_insert", failing_insert)
+    monkeypatch.setattr(writer, "_database_available", lambda: False)
+    writer.max_attempts = 1
+    writer._spill([make_record() for _ in range(5)])
+
+    writer._replay_spill()
+
+    assert writer._has_spill()
+    assert not os.path.exists(writer.dead_letter_path)
+
+def test_full_queue_spills_instead_of_dropping(session_factory, tmp_path):
+    writer = AuditLogWriter(
+        AuditRecord,
+        session_factory=session_factory,
+        max_queue=1,
+        enqueue_timeout=0.01,
+        spill_path=str(tmp_path / "spill.jsonl")
+    )
+    # Not started: fill the queue directly so the next submit cannot enqueue
+    writer._queue.put(make_record())
+    writer.start = lambda: None
+    writer.submit(make_record("overflow"))
+
+    with open(writer.spill_path) as f:
+        assert '"overflow"' in f.read()
+
+def test_stop_drains_queue(writer, session_factory):
+    for _ in range(30):
+        writer.submit(make_record())
+    writer.stop()
+
+    assert count(session_factory) == 30
+
+def test_torn_spill_line_is_skipped(writer, session_factory):
+    writer._spill([make_record() for _ in range(3)])
+    with open(writer.spill_path, "a") as f:
+        f.write('{"id": "torn", "user_')
+
+    writer._replay_spill()
+
+    assert count(session_factory) == 3
+    assert not writer._has_spill()
+
+def test_spill_files_of_exited_processes_are_adopted(writer, session_factory, tmp_path):
+    orphan = tmp_path / "spill-999999999.jsonl"
+    orphan.write_text(json.dumps({"id": str(uuid4()), "user_id": "orphan"}) + "\n")
+    live = tmp_path / f"spill-{os.getppid()}.jsonl"
+    live.write_text(json.dumps({"id": str(uuid4()), "user_id": "live"}) + "\n")
+
+    writer._replay_spill()
+
+    assert count(session_factory) == 1
+    assert not orphan.exists()
+    # Files of running processes are left to their owner
+    assert live.exists()
@@ -0,0 +1,96 @@
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from app.services.ai_optimization import WorkflowOptimizer
+
+class SumModel:
+    """Stands in for the RF and LSTM models: the prediction is the feature sum"""
+
+    def predict(self, X, batch_size=None, verbose=0):
+        if X.ndim == 3:
+            return X[:, -1].sum(axis=1, keepdims=True)
+        return X.sum(axis=1)
+
+def make_candidates(count: int):
+    start = datetime(2024, 3, 18, 8, 0)
+    return [
+        {
+            "input_data_size": 10 * i,
+            "output_data_size": 0,
+            "has_error": 0,
+            "status_encoded": 0,
+            "started_at": start + timedelta(hours=i),
+            "completed_at": None,
+            "error_message": None,
+            "status": "pending"
+        }
+        for i in range(count)
+    ]
+
+@pytest.fixture
+def optimizer():
+    optimizer = WorkflowOptimizer(lstm_inference_mode="inline")
+    optimizer.scaler.fit(np.random.default_rng(0).normal(size=(50, len(optimizer.feature_columns))))
+    optimizer.rf_model = SumModel()
+    optimizer.lstm_model = SumModel()
+    return optimizer
+
+def test_batch_matches_single_predictions(optimizer):
+    candidates = make_candidates(30)
+
+    batch = optimizer.predict_execution_times(candidates)
+
+    assert batch.shape == (30,)
+    assert batch == pytest.approx([optimizer.predict_execution_time(c) for c in candidates])
+
+def test_batch_of_untrained_optimizer_is_zero():
+    assert list(WorkflowOptimizer().predict_execution_times(make_candidates(3))) == [0, 0, 0]
+
+@pytest.fixture
+def client(optimizer, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api import ai_optimize
+    from app.core.security import oauth2_scheme
+    from app.db.base import get_db
+
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = SimpleNamespace(id=1, tenant_id=1)
+    now = datetime(2024, 3, 18, 8, 0)
+    executions = [
+        SimpleNamespace(id=i, started_at=now, completed_at=now + timedelta(seconds=30), status="completed")
+        for i in range(12)
+    ]
+    db.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = executions
+    monkeypatch.setattr(ai_optimize.optimizer_registry, "checkout", lambda *args: optimizer)
+    monkeypatch.setattr(ai_optimize.optimizer_registry, "checkin", lambda optimizer: None)
+
+    app = FastAPI()
+    app.include_router(ai_optimize.router)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[oauth2_scheme] = lambda: "1"
+    return TestClient(app)
+
+def test_batch_endpoint_predicts_every_input(client, optimizer):
+    inputs = [{"records": list(range(i))} for i in range(5)]
+
+    response = client.post("/ai-optimize/workflow/1/predict/batch", json=inputs)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 5
+    assert [p["index"] for p in body["predictions"]] == list(range(5))
+    assert [p["input_data_size"] for p in body["predictions"]] == [len(str(i)) for i in inputs]
+
+def test_batch_endpoint_limits(client, monkeypatch):
+    from app.api import ai_optimize
+
+    assert client.post("/ai-optimize/workflow/1/predict/batch", json=[]).status_code == 400
+    monkeypatch.setattr(ai_optimize, "MAX_BATCH_PREDICTIONS", 3)
+    assert client.post("/ai-optimize/workflow/1/predict/batch", json=[{}] * 4).status_code == 413
+    assert client.post("/ai-optimize/workflow/1/predict/batch", json=[{}] * 3).status_code == 200
@@ -0,0 +1,140 @@
+import pytest
+
+from app.core.enforcement import (
+    AICapability,
+    DecisionCache,
+    EnforcementAction,
+    EnforcementContext,
+    EnforcementEngine,
+    EnforcementLevel,
+    EnforcementPolicy,
+    EnforcementRule
+)
+
+def make_rule(rule_id, action, conditions, capability=AICapability.NATURAL_LANGUAGE, cacheable=True):
+    return EnforcementRule(
+        id=rule_id,
+        name=rule_id,
+        description="test rule",
+        capability=capability,
+        level=EnforcementLevel.MODERATE,
+        action=action,
+        conditions=conditions,
+        cacheable=cacheable
+    )
+
+def make_policy(policy_id, rules, default_action=EnforcementAction.ALLOW):
+    return EnforcementPolicy(
+        id=policy_id,
+        name=policy_id,
+        description="test policy",
+        rules=rules,
+        default_action=default_action
+    )
+
+@pytest.fixture
+def context():
+    return EnforcementContext("user-1", "org-1")
+
+@pytest.fixture
+def engine():
+    engine = EnforcementEngine(decision_cache=DecisionCache(max_entries=100, ttl=60))
+    engine.add_policy(make_policy("p1", [
+        make_rule("text", EnforcementAction.WARN, {"content_type": "text"}),
+        make_rule("code", EnforcementAction.BLOCK, {"language": "python"}, capability=AICapability.CODE_GENERATION)
+    ]))
+    return engine
+
+def test_repeated_requests_hit_cache(engine, context):
+    request = {"content_type": "text", "prompt": "hello"}
+    for _ in range(3):
+        assert engine.evaluate_request(AICapability.NATURAL_LANGUAGE, context, request) == EnforcementAction.WARN
+
+    assert engine.decision_cache.hits == 2
+    assert engine.decision_cache.stats()["hit_rate"] == pytest.approx(2 / 3)
+
+def test_key_ignores_fields_rules_do_not_read(engine, context):
+    engine.evaluate_request(AICapability.NATURAL_LANGUAGE, context, {"content_type": "text", "prompt": "a"})
+    engine.evaluate_request(AICapability.NATURAL_LANGUAGE, context, {"prompt": "b", "content_type": "text"})
+    assert engine.decision_cache.hits == 1
+
+    # Other users and other values of a condition field are separate entries
+    engine.evaluate_request(AICapability.NATURAL_LANGUAGE, EnforcementContext("user-2", "org-1"), {"content_type": "text"})
+    assert engine.evaluate_request(
+        AICapability.NATURAL_LANGUAGE, context, {"content_type": "image"}
+    ) == EnforcementAction.ALLOW
+    assert engine.decision_cache.hits == 1
+
+def test_policy_change_invalidates_affected_capability_only(engine, context):
+    engine.evaluate_request(AICapability.NATURAL_LANGUAGE, context, {"content_type": "text"})
+    engine.evaluate_request(AICapability.CODE_GENERATION, context, {"language": "python"})
+    assert len(engine.decision_cache) == 2
+
+    engine.add_policy(make_policy("p2", [
+        make_rule("code-strict", EnforcementAction.LOG, {"language": "rust"}, capability=AICapability.CODE_GENERATION)
+    ]))
+    assert len(engine.decision_cache) == 1
+    assert engine.evaluate_request(
+        AICapability.NATURAL_LANGUAGE, context, {"content_type": "text"}
+    ) == EnforcementAction.WARN
+    assert engine.decision_cache.hits == 1
+
+def test_default_decisions_invalidated_by_any_policy_change(engine, context):
+    assert engine.evaluate_request(
+        AICapability.NATURAL_LANGUAGE, context, {"content_type": "image"}
+    ) == EnforcementAction.ALLOW
+
+    engine.remove_policy("p1")
+    assert len(engine.decision_cache) == 0
+    assert engine.evaluate_request(
+        AICapability.NATURAL_LANGUAGE, context, {"content_type": "image"}
+    ) == EnforcementAction.BLOCK
+
+def test_rule_update_invalidates(engine, context):
+    request = {"content_type": "text"}
+    assert engine.evaluate_request(AICapability.NATURAL_LANGUAGE, context, request) == EnforcementAction.WARN
+
+    engine.update_rule(make_rule("text", EnforcementAction.BLOCK, {"content_type": "text"}))
+    assert engine.evaluate_request(AICapability.NATURAL_LANGUAGE, context, request) == EnforcementAction.BLOCK
+
+def test_non_cacheable_rules_bypass_cache(context):
+    engine = EnforcementEngine()
+    engine.add_policy(make_policy("p1", [
+        make_rule("live", EnforcementAction.WARN, {"content_type": "text"}, cacheable=False)
+    ]))
+    for _ in range(2):
+        engine.evaluate_request(AICapability.NATURAL_LANGUAGE, context, {"content_type": "text"})
+
+    assert len(engine.decision_cache) == 0
+    assert engine.decision_cache.bypasses == 2
+
+def test_ttl_expiry(engine, context):
+    engine.decision_cache.ttl = 0
+    engine.evaluate_request(AICapability.NATURAL_LANGUAGE, context, {"content_type": "text"})
+    engine.evaluate_request(AICapability.NATURAL_LANGUAGE, context, {"content_type": "text"})
+    assert engine.decision_cache.hits == 0
+
+def test_decision_racing_a_policy_change_is_not_cached(engine, context):
+    index = engine.index
+    decide = index.decide
+
+    def decide_then_change(*args):
+        decision = decide(*args)
+        # A policy change lands after the decision but before it is cached
+        engine.add_policy(make_policy("p2", [make_rule("text-2", EnforcementAction.BLOCK, {"content_type": "text"})]))
+        return decision
+
+    index.decide = decide_then_change
+    request = {"content_type": "text"}
+    assert engine.evaluate_request(AICapability.NATURAL_LANGUAGE, context, request) == EnforcementAction.WARN
+    assert len(engine.decision_cache) == 0
+    assert engine.index is not index
+
+def test_put_refuses_decisions_from_before_an_invalidation():
+    cache = DecisionCache(max_entries=10, ttl=60)
+    generation = cache.generation
+    cache.invalidate([AICapability.CODE_GENERATION])
+
+    assert cache.put(("key",), EnforcementAction.ALLOW, False, generation) is False
+    assert cache.get(("key",)) is None
+    assert cache.put(("key",), EnforcementAction.ALLOW, False, cache.generation) is True
@@ -156,6 +156,7 @@ def test_audit_log_creation(enforcement_service: EnforcementService, sample_poli
         organization_id="test_org",
         request_data=request_data
     )
+    enforcement_service.audit_writer.flush()
     
     # Check that an audit log was created
     audit_log = db_session.query(EnforcementAuditLog).first()
@@ -202,6 +203,7 @@ def test_get_audit_logs(enforcement_service: EnforcementService, sample_policy:
             organization_id="test_org",
             request_data=request_data
         )
+    enforcement_service.audit_writer.flush()
     
     # Test filtering
     logs = enforcement_service.get_audit_logs(
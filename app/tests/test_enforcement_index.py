@@ -0,0 +1,92 @@
+import pytest
+
+from app.core.enforcement import (
+    AICapability,
+    EnforcementAction,
+    EnforcementContext,
+    EnforcementEngine,
+    EnforcementLevel,
+    EnforcementPolicy,
+    EnforcementRule
+)
+from tests.benchmarks.bench_enforcement_index import (
+    build_engine,
+    evaluate_linear,
+    generate_requests,
+    generate_rules
+)
+
+def make_rule(rule_id, level, action, conditions, exceptions=None):
+    return EnforcementRule(
+        id=rule_id,
+        name=rule_id,
+        description="test rule",
+        capability=AICapability.NATURAL_LANGUAGE,
+        level=level,
+        action=action,
+        conditions=conditions,
+        exceptions=exceptions or []
+    )
+
+@pytest.fixture
+def context():
+    return EnforcementContext("user-1", "org-1")
+
+def test_stricter_level_wins_over_rule_order(context):
+    engine = build_engine([
+        make_rule("flexible", EnforcementLevel.FLEXIBLE, EnforcementAction.LOG, {"content_type": "text"}),
+        make_rule("strict", EnforcementLevel.STRICT, EnforcementAction.BLOCK, {"content_type": "text"})
+    ])
+    request = {"content_type": "text"}
+    assert engine.evaluate_request(AICapability.NATURAL_LANGUAGE, context, request) == EnforcementAction.BLOCK
+
+def test_equality_index_preserves_rule_order(context):
+    engine = build_engine([
+        make_rule("tokens", EnforcementLevel.MODERATE, EnforcementAction.WARN,
+                  {"tokens": {"operator": "greater_than", "value": 10}}),
+        make_rule("text", EnforcementLevel.MODERATE, EnforcementAction.LOG,
+                  {"content_type": {"operator": "equals", "value": "text"}}),
+    ])
+    assert engine.evaluate_request(
+        AICapability.NATURAL_LANGUAGE, context, {"content_type": "text", "tokens": 50}
+    ) == EnforcementAction.WARN
+    assert engine.evaluate_request(
+        AICapability.NATURAL_LANGUAGE, context, {"content_type": "text", "tokens": 5}
+    ) == EnforcementAction.LOG
+
+def test_missing_key_and_exceptions(context):
+    engine = build_engine([
+        make_rule("excepted", EnforcementLevel.STRICT, EnforcementAction.BLOCK,
+                  {"content_type": "text"}, exceptions=["user-1"]),
+        make_rule("image", EnforcementLevel.MODERATE, EnforcementAction.WARN, {"content_type": "image"})
+    ])
+    # Conditions on keys the request does not carry do not apply
+    assert engine.evaluate_request(AICapability.NATURAL_LANGUAGE, context, {}) == EnforcementAction.WARN
+    # No match falls back to the policy default
+    assert engine.evaluate_request(
+        AICapability.NATURAL_LANGUAGE, context, {"content_type": "text"}
+    ) == EnforcementAction.ALLOW
+    assert engine.evaluate_request(AICapability.AUTOMATION, context, {}) == EnforcementAction.BLOCK
+
+def test_index_rebuilt_after_policy_changes(context):
+    engine = EnforcementEngine()
+    assert engine.evaluate_request(AICapability.NATURAL_LANGUAGE, context, {}) == EnforcementAction.BLOCK
+
+    engine.add_policy(EnforcementPolicy(
+        id="p1",
+        name="p1",
+        description="",
+        rules=[make_rule("r1", EnforcementLevel.MODERATE, EnforcementAction.WARN, {})]
+    ))
+    assert engine.evaluate_request(AICapability.NATURAL_LANGUAGE, context, {}) == EnforcementAction.WARN
+
+    engine.remove_policy("p1")
+    assert engine.evaluate_request(AICapability.NATURAL_LANGUAGE, context, {}) == EnforcementAction.BLOCK
+
+def test_matches_linear_scan_on_random_rules():
+    engine = build_engine(generate_rules(500))
+    for i, request in enumerate(generate_requests(300, 500)):
+        capability = list(AICapability)[i % len(AICapability)]
+        context = EnforcementContext(f"user-{i % 100}", "org")
+        assert engine.evaluate_request(capability, context, request) == \
+            evaluate_linear(engine, capability, context, request)
@@ -0,0 +1,100 @@
+import pytest
+
+pytest.importorskip("app.models.enforcement")
+
+from app.core.enforcement import AICapability, EnforcementAction, EnforcementEngine
+from app.services import enforcement_service
+from app.services.enforcement_service import (
+    DatabasePolicyVersion,
+    EnforcementService,
+    LocalPolicyVersion,
+    SharedEnforcementEngine
+)
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Count engine builds instead of querying the policy tables"""
+    calls = []
+
+    def fake_load_engine(db):
+        calls.append(db)
+        return EnforcementEngine()
+
+    monkeypatch.setattr(enforcement_service, "load_engine", fake_load_engine)
+    return calls
+
+@pytest.fixture
+def shared():
+    return SharedEnforcementEngine(version_store=LocalPolicyVersion(), session_factory=FakeSession)
+
+def test_services_share_one_snapshot(shared, loads):
+    first = EnforcementService(object(), shared=shared)
+    second = EnforcementService(object(), shared=shared)
+
+    assert first.engine is second.engine
+    assert len(loads) == 1
+    assert loads[0].closed
+
+def test_notify_changed_publishes_new_engine(shared, loads):
+    before = shared.engine
+    db = FakeSession()
+
+    snapshot = shared.notify_changed(db)
+
+    assert snapshot.engine is not before
+    assert snapshot.version == 1
+    assert loads[-1] is db
+    assert not db.closed
+
+def test_refresh_follows_other_workers(loads):
+    version_store = LocalPolicyVersion()
+    worker_a = SharedEnforcementEngine(version_store=version_store, session_factory=FakeSession)
+    worker_b = SharedEnforcementEngine(version_store=version_store, session_factory=FakeSession)
+    worker_a.reload()
+    worker_b.reload()
+
+    assert worker_b.refresh_if_stale() is False
+    worker_a.notify_changed(FakeSession())
+    assert worker_b.refresh_if_stale() is True
+    assert worker_b.snapshot.version == worker_a.snapshot.version
+
+def test_evaluate_uses_snapshot(shared, loads):
+    service = EnforcementService(object(), shared=shared)
+    assert service.engine.evaluate_request(
+        AICapability.NATURAL_LANGUAGE,
+        enforcement_service.EnforcementContext("user", "org"),
+        {}
+    ) == EnforcementAction.BLOCK
+
+class FakeTables(FakeSession):
+    """Answers the version query with (row count, newest updated_at) per table"""
+
+    state = {"policies": (1, None), "rules": (2, None)}
+
+    def __init__(self):
+        super().__init__()
+        self.answers = iter([self.state["policies"], self.state["rules"]])
+
+    def query(self, *columns):
+        answer = next(self.answers)
+        return type("Query", (), {"one": lambda query: answer})()
+
+def test_database_version_follows_changes_made_by_other_workers(loads):
+    worker_b = SharedEnforcementEngine(
+        version_store=DatabasePolicyVersion(FakeTables),
+        session_factory=FakeSession
+    )
+    worker_b.reload()
+    assert worker_b.refresh_if_stale() is False
+
+    # Another worker updated a rule and committed
+    FakeTables.state = {**FakeTables.state, "rules": (2, "2026-10-16T12:00:00")}
+    assert worker_b.refresh_if_stale() is True
+    assert worker_b.refresh_if_stale() is False
@@ -0,0 +1,132 @@
+import pytest
+import numpy as np
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.services.feature_store import ExecutionFeatureStore
+from app.services.workflow_features import FEATURE_COLUMNS
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+class FakeSession:
+    """Stands in for the workflow_executions table"""
+
+    def __init__(self):
+        self.rows = []
+        self.queries = 0
+
+    def add_execution(self, id, workflow_id, started_at, duration=30.0):
+        self.rows.append(SimpleNamespace(
+            id=id,
+            workflow_id=workflow_id,
+            started_at=started_at,
+            completed_at=started_at + timedelta(seconds=duration),
+            status="completed",
+            input_data={"records": [1, 2, 3]},
+            execution_time=duration,
+            resource_usage={"cpu_usage": 10.0}
+        ))
+
+    def execute(self, query, params):
+        self.queries += 1
+        rows = sorted(self.rows, key=lambda r: (r.completed_at, r.id))
+        rows = [r for r in rows if r.started_at > params["window_start"]]
+        if "hwm_id" in params:
+            mark = (params["hwm_completed_at"], params["hwm_id"])
+            rows = [r for r in rows if (r.completed_at, r.id) > mark]
+        return FakeResult(rows)
+
+@pytest.fixture
+def db():
+    return FakeSession()
+
+@pytest.fixture
+def store(tmp_path):
+    return ExecutionFeatureStore(1, root=str(tmp_path), fetch_size=4)
+
+def test_refresh_appends_only_new_executions(db, store):
+    now = datetime.utcnow()
+    for i in range(6):
+        db.add_execution(i, workflow_id=1, started_at=now - timedelta(hours=10 - i))
+
+    assert store.refresh(db) == 6
+    assert store.refresh(db) == 0
+
+    db.add_execution(6, workflow_id=1, started_at=now - timedelta(hours=1))
+    assert store.refresh(db) == 1
+
+    feature_set = store.load()
+    assert list(feature_set.ids) == list(range(7))
+    assert feature_set.features.shape == (7, len(FEATURE_COLUMNS))
+    assert store.high_water_mark["id"] == 6
+
+def test_load_applies_window_and_per_workflow_limit(db, tmp_path):
+    store = ExecutionFeatureStore(1, root=str(tmp_path), per_workflow_limit=2, window=timedelta(days=90))
+    now = datetime.utcnow()
+    for i in range(4):
+        db.add_execution(i, workflow_id=1, started_at=now - timedelta(days=i + 1))
+    db.add_execution(10, workflow_id=2, started_at=now - timedelta(days=1))
+    store.refresh(db)
+
+    feature_set = store.load()
+    assert sorted(feature_set.ids) == [0, 1, 10]
+    # Oldest first for time-series cross validation
+    assert np.all(np.diff(feature_set.started_at.astype("int64")) >= 0)
+
+def test_compaction_merges_segments(db, tmp_path):
+    store = ExecutionFeatureStore(1, root=str(tmp_path), fetch_size=1, max_segments=3)
+    now = datetime.utcnow()
+    for i in range(5):
+        db.add_execution(i, workflow_id=1, started_at=now - timedelta(hours=i + 1))
+    store.refresh(db)
+
+    assert len(store._read_manifest()["segments"]) == 1
+    assert sorted(store.load().ids) == list(range(5))
+
+def test_historical_times(db, store):
+    now = datetime.utcnow()
+    db.add_execution(1, workflow_id=1, started_at=now - timedelta(hours=2), duration=12.0)
+    db.add_execution(2, workflow_id=1, started_at=now - timedelta(hours=1), duration=18.0)
+    store.refresh(db)
+
+    np.testing.assert_allclose(store.load().historical_times, [12.0, 18.0])
+
+def test_refreshes_from_separate_workers_do_not_collide(db, tmp_path):
+    now = datetime.utcnow()
+    for i in range(8):
+        db.add_execution(i, workflow_id=1, started_at=now - timedelta(hours=10 - i))
+    execute = db.execute
+
+    def slow_execute(query, params):
+        # Widen the window in which two unlocked refreshes would interleave
+        time.sleep(0.05)
+        return execute(query, params)
+
+    db.execute = slow_execute
+    # Separate instances share nothing in memory, like two worker processes
+    workers = [ExecutionFeatureStore(1, root=str(tmp_path), fetch_size=4) for _ in range(2)]
+    appended, errors = [], []
+
+    def refresh(store):
+        try:
+            appended.append(store.refresh(db))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=refresh, args=(store,)) for store in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(appended) == [0, 8]
+    assert list(workers[0].load().ids) == list(range(8))
@@ -0,0 +1,49 @@
+import pytest
+import numpy as np
+
+from app.services.model_store import ModelStore
+
+@pytest.fixture
+def store(tmp_path):
+    return ModelStore(str(tmp_path), keep_versions=2)
+
+def test_publish_and_load_current(store):
+    assert store.load("workflow_optimizer/tenant") is None
+
+    version = store.publish("workflow_optimizer/tenant", {"weights": np.arange(10.0)}, {"metrics": {"r2": 0.9}})
+
+    artifact, metadata = store.load("workflow_optimizer/tenant")
+    assert store.current_version("workflow_optimizer/tenant") == version
+    assert metadata["version"] == version
+    assert metadata["metrics"] == {"r2": 0.9}
+    np.testing.assert_array_equal(artifact["weights"], np.arange(10.0))
+    assert isinstance(artifact["weights"], np.memmap)
+
+def test_save_does_not_promote(store):
+    first = store.publish("model", {"v": 1})
+    store.save("model", {"v": 2})
+
+    artifact, _ = store.load("model")
+    assert store.current_version("model") == first
+    assert artifact == {"v": 1}
+
+def test_load_picks_up_promotion(store):
+    store.publish("model", {"v": 1})
+    assert store.load("model")[0] == {"v": 1}
+
+    # A second store instance stands in for the retraining process
+    ModelStore(store.root).publish("model", {"v": 2})
+    assert store.load("model")[0] == {"v": 2}
+
+def test_prune_keeps_recent_versions(store):
+    versions = [store.publish("model", {"v": i}) for i in range(4)]
+    assert store.list_versions("model") == versions[-2:]
+
+def test_preload(store):
+    store.publish("workflow_optimizer/a", {"v": 1})
+    store.publish("workflow_optimizer/b", {"v": 2})
+    assert ModelStore(store.root).preload("workflow_optimizer") == 2
+
+def test_rejects_path_traversal(store):
+    with pytest.raises(ValueError):
+        store.save("../outside", {"v": 1})
@@ -0,0 +1,160 @@
+import pytest
+import threading
+from datetime import datetime, timedelta
+
+import os
+
+from app.services import ai_optimization
+from app.services.ai_optimization import OptimizerRegistry, WorkflowOptimizer
+
+def make_executions(count: int, start_id: int = 0, completed: bool = True):
+    now = datetime(2024, 3, 18, 8, 0)
+    return [
+        {
+            "id": start_id + i,
+            "started_at": now + timedelta(minutes=i),
+            "completed_at": now + timedelta(minutes=i, seconds=30) if completed else None,
+            "status": "completed" if completed else "running",
+            "input_data": {"records": [i]},
+            "output_data": None,
+            "error_message": None
+        }
+        for i in range(count)
+    ]
+
+@pytest.fixture
+def trainings(monkeypatch):
+    """Record training calls instead of fitting real models"""
+    calls = []
+    monkeypatch.setattr(WorkflowOptimizer, "train", lambda self, executions: calls.append(executions))
+    return calls
+
+@pytest.fixture
+def registry():
+    return OptimizerRegistry(ttl=timedelta(hours=1), max_entries=2)
+
+def test_reuses_trained_optimizer(registry, trainings):
+    executions = make_executions(12)
+
+    first = registry.get_optimizer(1, 10, executions)
+    second = registry.get_optimizer(1, 10, executions)
+
+    assert first is second
+    assert len(trainings) == 1
+    assert registry.stats["hits"] == 1
+
+def test_new_execution_invalidates(registry, trainings):
+    executions = make_executions(12)
+    first = registry.get_optimizer(1, 10, executions)
+
+    # Executions still in flight do not change the training set
+    running = make_executions(1, start_id=100, completed=False)
+    assert registry.get_optimizer(1, 10, executions + running) is first
+
+    finished = executions + make_executions(1, start_id=100)
+    assert registry.get_optimizer(1, 10, finished) is not first
+    assert len(trainings) == 2
+
+def test_ttl_expiry(registry, trainings):
+    executions = make_executions(12)
+    first = registry.get_optimizer(1, 10, executions)
+
+    registry._entries[(1, 10)]["trained_at"] -= timedelta(hours=2)
+    assert registry.get_optimizer(1, 10, executions) is not first
+
+def test_tenants_are_isolated_and_invalidated(registry, trainings):
+    executions = make_executions(12)
+    tenant_a = registry.get_optimizer("a", 10, executions)
+    tenant_b = registry.get_optimizer("b", 10, executions)
+    assert tenant_a is not tenant_b
+
+    assert registry.invalidate("a") == 1
+    assert registry.get_optimizer("b", 10, executions) is tenant_b
+    assert registry.get_optimizer("a", 10, executions) is not tenant_a
+
+def test_evicts_least_recently_used(registry, trainings):
+    executions = make_executions(12)
+    registry.get_optimizer(1, 1, executions)
+    registry.get_optimizer(1, 2, executions)
+    registry.get_optimizer(1, 1, executions)
+    registry.get_optimizer(1, 3, executions)
+
+    assert set(registry._entries) == {(1, 1), (1, 3)}
+    assert registry.stats["evictions"] == 1
+
+def test_concurrent_requests_train_once(registry, monkeypatch):
+    calls = []
+    started = threading.Event()
+
+    def slow_train(self, executions):
+        calls.append(executions)
+        started.wait(0.2)
+
+    monkeypatch.setattr(WorkflowOptimizer, "train", slow_train)
+    executions = make_executions(12)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get_optimizer(1, 10, executions)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+def test_dropped_optimizers_release_their_models(registry, trainings, monkeypatch):
+    released = []
+    monkeypatch.setattr(WorkflowOptimizer, "release", lambda self: released.append(self))
+    executions = make_executions(12)
+    first = registry.get_optimizer(1, 1, executions)
+
+    # Retraining on new history releases the stale optimizer
+    second = registry.get_optimizer(1, 1, executions + make_executions(1, start_id=100))
+    assert released == [first]
+
+    registry.get_optimizer(1, 2, executions)
+    registry.get_optimizer(1, 3, executions)
+    assert released == [first, second]
+
+def test_lstm_cache_is_bounded_and_release_deletes_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(ai_optimization, "LSTM_MODEL_CACHE_SIZE", 2)
+    monkeypatch.setattr(ai_optimization, "_loaded_lstm_models", ai_optimization.OrderedDict())
+    paths = []
+    for name in ("a", "b", "c"):
+        (tmp_path / name).mkdir()
+        paths.append(str(tmp_path / name / "model.keras"))
+        ai_optimization._cache_lstm_model(paths[-1], object())
+
+    assert list(ai_optimization._loaded_lstm_models) == paths[1:]
+
+    ai_optimization.release_lstm_model(paths[1])
+    assert list(ai_optimization._loaded_lstm_models) == paths[2:]
+    assert not os.path.exists(tmp_path / "b")
+
+def test_checked_out_optimizer_is_released_on_last_checkin(registry, trainings, monkeypatch):
+    released = []
+    monkeypatch.setattr(WorkflowOptimizer, "release", lambda self: released.append(self))
+    executions = make_executions(12)
+    held = registry.checkout(1, 1, executions)
+    assert registry.checkout(1, 1, executions) is held
+
+    registry.invalidate(1)
+    registry.checkin(held)
+    # Still held by the other request
+    assert released == []
+
+    registry.checkin(held)
+    assert released == [held]
+
+def test_checkin_of_cached_optimizer_keeps_it(registry, trainings, monkeypatch):
+    released = []
+    monkeypatch.setattr(WorkflowOptimizer, "release", lambda self: released.append(self))
+    executions = make_executions(12)
+    held = registry.checkout(1, 1, executions)
+    registry.checkin(held)
+
+    assert released == []
+    assert registry.get_optimizer(1, 1, executions) is held
@@ -0,0 +1,98 @@
+import pytest
+import numpy as np
+from datetime import datetime, timedelta
+
+from app.services.workflow_features import (
+    BatchFeatureExtractor,
+    FEATURE_COLUMNS,
+    calculate_nested_depth
+)
+from app.services.workflow_optimizer import WorkflowOptimizer, WorkflowExecution
+
+def make_execution(i: int, input_data, completed: bool = True, execution_time=None) -> WorkflowExecution:
+    started = datetime(2024, 3, 18, 8, 0) + timedelta(hours=7 * i)
+    return WorkflowExecution(
+        id=i,
+        workflow_id=1,
+        started_at=started,
+        completed_at=started + timedelta(seconds=30 + i) if completed else None,
+        status=["completed", "failed", "running", "pending"][i % 4],
+        input_data=input_data,
+        output_data=None,
+        error_message=None,
+        execution_time=execution_time,
+        resource_usage={
+            "cpu_usage": 10.0 * i,
+            "memory_usage": 5.0 * i,
+            "io_operations": i,
+            "io_wait_time": 0.5 * i
+        },
+        optimization_suggestions=None,
+        risk_alerts=None,
+        tenant_id=1
+    )
+
+@pytest.fixture
+def executions():
+    payloads = [
+        {"a": 1, "b": "text"},
+        {"items": [1, 2, [3, 4]], "meta": {"x": {"y": 1}}},
+        {"records": [{"id": 1}, {"id": 2}], "flag": True}
+    ]
+    return [make_execution(i, payloads[i % 3], completed=i % 5 != 0) for i in range(12)]
+
+def test_batch_matches_per_row_features(executions):
+    optimizer = WorkflowOptimizer(None)
+    expected = np.array([
+        [
+            len(e.input_data),
+            len(e.resource_usage),
+            e.resource_usage.get("cpu_usage", 0),
+            e.resource_usage.get("memory_usage", 0),
+            e.resource_usage.get("io_operations", 0),
+            optimizer._status_to_numeric(e.status),
+            optimizer._get_complexity_score(e.input_data)
+        ]
+        + optimizer._extract_temporal_features(e)
+        + optimizer._extract_resource_features(e)
+        + optimizer._extract_pattern_features(e)
+        for e in executions
+    ], dtype=float)
+
+    features = BatchFeatureExtractor().extract(executions)
+
+    assert features.shape == (len(executions), len(FEATURE_COLUMNS))
+    np.testing.assert_allclose(features, expected)
+
+def test_input_features_are_cached_per_payload(executions):
+    extractor = BatchFeatureExtractor()
+    extractor.extract(executions)
+
+    info = extractor.cache_info()
+    assert info["size"] == 3
+    assert info["misses"] == 3
+    assert info["hits"] == len(executions) - 3
+
+def test_cache_is_bounded():
+    extractor = BatchFeatureExtractor(cache_size=2)
+    extractor.extract([make_execution(i, {"k": i}) for i in range(5)])
+    assert extractor.cache_info()["size"] == 2
+
+def test_targets_fall_back_to_duration():
+    executions = [
+        make_execution(1, {"a": 1}, execution_time=12.5),
+        make_execution(2, {"a": 1}),
+        make_execution(3, {"a": 1}, completed=False)
+    ]
+    targets = BatchFeatureExtractor().extract_targets(executions)
+    np.testing.assert_allclose(targets, [12.5, 32.0, 0.0])
+
+def test_empty_batch():
+    extractor = BatchFeatureExtractor()
+    assert extractor.extract([]).shape == (0, len(FEATURE_COLUMNS))
+    assert extractor.extract_targets([]).shape == (0,)
+
+def test_nested_depth_handles_empty_containers():
+    assert calculate_nested_depth({}) == 0
+    assert calculate_nested_depth({"a": []}) == 1
+    assert calculate_nested_depth({"a": [{"b": 1}]}) == 3
@@ -6,6 +6,9 @@ with open("README.md", "r", encoding="utf-8") as fh:
 with open("requirements.txt", "r", encoding="utf-8") as fh:
     requirements = [line.strip() for line in fh if line.strip() and not line.startswith("#")]
 
+with open("requirements-ml.txt", "r", encoding="utf-8") as fh:
+    ml_requirements = [line.strip() for line in fh if line.strip() and not line.startswith("#")]
+
 setup(
     name="aetheriq",
     version="1.0.0",
@@ -31,6 +34,9 @@ setup(
     ],
     python_requires=">=3.9",
     install_requires=requirements,
+    extras_require={
+        "ml": ml_requirements,
+    },
     entry_points={
         "console_scripts": [
             "aetheriq=aetheriq.main:main",
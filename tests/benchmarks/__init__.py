@@ -0,0 +1,3 @@
+"""
+AetherIQ Benchmarks
+"""
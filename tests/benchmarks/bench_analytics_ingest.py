@@ -0,0 +1,87 @@
+"""
+Benchmark: analytics ingest rows/sec, ORM bulk_create vs bulk ingest paths
+
+"orm" is the old CRUDBase.bulk_create path (jsonable_encoder, ORM
+instances, commit, one refresh SELECT per row). "insert" is multi-row
+INSERT ... RETURNING and "copy" is Postgres COPY, both via BulkIngestor.
+COPY only runs against a Postgres URL.
+
+Run with: python -m tests.benchmarks.bench_analytics_ingest [--url postgresql://...] [--rows N]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+
+from aetheriq.core.ingest import BulkIngestor
+from aetheriq.db.models import Analytics as AnalyticsModel
+
+BATCH_SIZE = 1000
+
+def make_rows(count: int):
+    start = datetime(2026, 1, 1)
+    return [
+        {
+            "metric_name": "workflow_execution",
+            "metric_value": {"execution_time": i * 0.01, "status": "completed", "error_count": i % 3},
+            "timestamp": start + timedelta(seconds=i)
+        }
+        for i in range(count)
+    ]
+
+def orm_bulk_create(db, rows) -> None:
+    """CRUDBase.bulk_create, keeping datetimes so SQLite accepts the rows"""
+    db_objs = []
+    for row in rows:
+        data = jsonable_encoder(row)
+        data["timestamp"] = row["timestamp"]
+        db_objs.append(AnalyticsModel(**data))
+    db.add_all(db_objs)
+    db.commit()
+    for db_obj in db_objs:
+        db.refresh(db_obj)
+
+def run_method(session_factory, method: str, rows) -> dict:
+    ingestor = None if method == "orm" else BulkIngestor(AnalyticsModel, method=method, chunk_size=BATCH_SIZE)
+    with session_factory() as db:
+        db.execute(delete(AnalyticsModel))
+        db.commit()
+        start = time.perf_counter()
+        for offset in range(0, len(rows), BATCH_SIZE):
+            batch = rows[offset:offset + BATCH_SIZE]
+            if method == "orm":
+                orm_bulk_create(db, batch)
+            else:
+                ingestor.ingest(db, batch)
+                db.commit()
+        elapsed = time.perf_counter() - start
+    return {"rows": len(rows), "seconds": elapsed, "rows_per_second": len(rows) / elapsed}
+
+def run_benchmark(url: str = None, count: int = 50_000) -> dict:
+    if url is None:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'ingest.db')}"
+    engine = create_engine(url)
+    AnalyticsModel.__table__.create(engine, checkfirst=True)
+    session_factory = sessionmaker(bind=engine)
+    rows = make_rows(count)
+
+    methods = ["orm", "insert"] + (["copy"] if engine.dialect.name == "postgresql" else [])
+    results = {"backend": engine.dialect.name}
+    for method in methods:
+        results[method] = run_method(session_factory, method, rows)
+    fastest = max(methods[1:], key=lambda m: results[m]["rows_per_second"])
+    results["speedup_vs_orm"] = results[fastest]["rows_per_second"] / results["orm"]["rows_per_second"]
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=None, help="Database URL; defaults to a temporary SQLite file")
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.url, args.rows), indent=2))
@@ -0,0 +1,112 @@
+"""
+Benchmark: analyze endpoint latency with and without the optimizer registry
+
+Run with: python -m tests.benchmarks.bench_analyze_latency
+"""
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+import numpy as np
+
+from app.api.ai_optimize import analyze_workflow
+from app.db import models
+from app.services.ai_optimization import OptimizerRegistry, WorkflowOptimizer
+import app.api.ai_optimize as ai_optimize
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *args):
+        return self
+
+    def order_by(self, *args):
+        return self
+
+    def limit(self, count):
+        return FakeQuery(self.rows[:count])
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+    def all(self):
+        return list(self.rows)
+
+class FakeSession:
+    """Serves one user, one workflow and its executions"""
+
+    def __init__(self, executions: List[SimpleNamespace]):
+        self.tables = {
+            models.User: [SimpleNamespace(id="bench", tenant_id=1)],
+            models.Workflow: [SimpleNamespace(id=1, tenant_id=1, name="bench")],
+            models.WorkflowExecution: executions
+        }
+
+    def query(self, model):
+        return FakeQuery(self.tables[model])
+
+def generate_executions(count: int, seed: int = 42) -> List[SimpleNamespace]:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    executions = []
+    for i in range(count):
+        started = now - timedelta(minutes=10 * (count - i))
+        duration = rng.uniform(1, 900)
+        executions.append(SimpleNamespace(
+            id=i,
+            workflow_id=1,
+            started_at=started,
+            completed_at=started + timedelta(seconds=duration),
+            status="completed",
+            input_data={"records": list(range(rng.randint(1, 50)))},
+            output_data={"ok": True},
+            error_message=None,
+            execution_time=duration,
+            resource_usage={"cpu": rng.uniform(0, 100), "memory": rng.uniform(0, 100)}
+        ))
+    # The endpoint reads newest first
+    return list(reversed(executions))
+
+async def analyze_with_fresh_optimizer(workflow_id: int, db: FakeSession, token: str):
+    """Pre-registry behaviour: train a new optimizer on every request"""
+    executions = db.query(models.WorkflowExecution).limit(100).all()
+    execution_dicts = [e.__dict__ for e in executions]
+    optimizer = WorkflowOptimizer()
+    optimizer.train(sorted(execution_dicts, key=lambda e: e["started_at"]))
+    return optimizer.generate_optimization_suggestions({}, execution_dicts)
+
+def measure(handler, db: FakeSession, requests: int) -> dict:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        asyncio.run(handler(workflow_id=1, db=db, token="bench"))
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies)
+    return {
+        "requests": requests,
+        "p50_seconds": float(np.percentile(latencies, 50)),
+        "p95_seconds": float(np.percentile(latencies, 95)),
+        "max_seconds": float(latencies.max())
+    }
+
+def run_benchmark(requests: int = 100, baseline_requests: int = 5) -> dict:
+    db = FakeSession(generate_executions(100))
+
+    before = measure(analyze_with_fresh_optimizer, db, baseline_requests)
+
+    ai_optimize.optimizer_registry = OptimizerRegistry()
+    after = measure(analyze_workflow, db, requests)
+    return {
+        "before": before,
+        "after": after,
+        "p95_speedup": before["p95_seconds"] / after["p95_seconds"],
+        "registry": ai_optimize.optimizer_registry.stats
+    }
+
+if __name__ == "__main__":
+    print(json.dumps(run_benchmark(), indent=2))
@@ -0,0 +1,77 @@
+"""
+Benchmark: peak RSS of AutomationEngine on a 1M-record input
+
+Runs the ai_analysis -> data_transformation -> system_integration chain
+once with the records materialized as a list (the whole payload in memory,
+as every step used to see it) and once streamed from a generator. Each
+mode runs in its own subprocess so peak RSS is measured independently.
+
+Run with: python -m tests.benchmarks.bench_automation_pipeline
+"""
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from aetheriq.core.automation import AutomationEngine
+
+STEPS = [
+    {"type": "ai_analysis"},
+    {
+        "type": "data_transformation",
+        "filter": {"active": True},
+        "defaults": {"region": "unknown"},
+        "mapping": {"amount": "amount_usd"},
+        "fields": ["id", "amount_usd", "region"]
+    },
+    {"type": "system_integration"}
+]
+
+def generate_records(count: int):
+    for i in range(count):
+        yield {"id": i, "amount": i * 0.5, "active": i % 10 != 0, "note": f"record {i}"}
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+async def run_mode(mode: str, count: int) -> dict:
+    engine = AutomationEngine({"batch_size": 1000})
+    workflow_id = await engine.create_workflow({"steps": STEPS})
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "materialized":
+        records = list(generate_records(count))
+        result = await engine.execute_workflow(workflow_id, {"records": records})
+    else:
+        result = await engine.execute_workflow(workflow_id, {"records": generate_records(count)})
+    elapsed = time.perf_counter() - start
+    return {
+        "records_in": count,
+        "records_out": result["records_processed"],
+        "seconds": elapsed,
+        "records_per_second": count / elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_growth_mb": peak_rss_mb() - baseline
+    }
+
+def run_benchmark(count: int = 1_000_000) -> dict:
+    results = {}
+    for mode in ("materialized", "streaming"):
+        output = subprocess.run(
+            [sys.executable, "-m", "tests.benchmarks.bench_automation_pipeline", mode, str(count)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results[mode] = json.loads(output)
+    results["rss_reduction"] = results["materialized"]["peak_rss_growth_mb"] / max(
+        results["streaming"]["peak_rss_growth_mb"], 1.0
+    )
+    return results
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        print(json.dumps(asyncio.run(run_mode(sys.argv[1], int(sys.argv[2])))))
+    else:
+        print(json.dumps(run_benchmark(), indent=2))
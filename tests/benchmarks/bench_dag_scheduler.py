@@ -0,0 +1,88 @@
+"""
+Benchmark: wave-based vs event-driven scheduling of 10k-node workflow DAGs
+
+Run with: python -m tests.benchmarks.bench_dag_scheduler
+"""
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from aetheriq.core.dag import TaskGraph, run_task_graph
+
+@dataclass
+class BenchTask:
+    id: str
+    name: str
+    dependencies: List[str]
+    duration: float = 0.0
+    result: Any = None
+    finished_at: float = 0.0
+
+def generate_dag(num_nodes: int, layers: int, max_deps: int = 3, seed: int = 42) -> List[BenchTask]:
+    """Layered random DAG; each node depends on up to max_deps nodes from earlier layers"""
+    rng = random.Random(seed)
+    per_layer = num_nodes // layers
+    tasks: List[BenchTask] = []
+    for layer in range(layers):
+        for i in range(per_layer):
+            task_id = f"t{layer}-{i}"
+            deps = []
+            if layer:
+                earlier = tasks[max(0, (layer - 2) * per_layer):layer * per_layer]
+                deps = [t.id for t in rng.sample(earlier, min(len(earlier), rng.randint(1, max_deps)))]
+            # Mostly fast tasks with a few slow stragglers per layer
+            duration = 0.05 if rng.random() < 0.01 else rng.uniform(0, 0.002)
+            tasks.append(BenchTask(task_id, task_id, deps, duration))
+    return tasks
+
+async def execute(task: BenchTask) -> Dict[str, Any]:
+    if task.duration:
+        await asyncio.sleep(task.duration)
+    task.finished_at = time.perf_counter()
+    return {"status": "ok"}
+
+async def run_waves(tasks: List[BenchTask]) -> None:
+    """Reference: the previous loop that rescans every task each round and waits per wave"""
+    completed = set()
+    while len(completed) < len(tasks):
+        ready = [
+            task for task in tasks
+            if task.id not in completed and all(dep in completed for dep in task.dependencies)
+        ]
+        if not ready:
+            break
+        await asyncio.gather(*[execute(task) for task in ready], return_exceptions=True)
+        completed.update(task.id for task in ready)
+
+async def run_event_driven(tasks: List[BenchTask]) -> None:
+    await run_task_graph(TaskGraph(tasks), execute)
+
+def measure(runner, tasks: List[BenchTask]) -> float:
+    start = time.perf_counter()
+    asyncio.run(runner(tasks))
+    return time.perf_counter() - start
+
+def run_benchmark(num_nodes: int = 10000, layers: int = 50) -> dict:
+    results = {"nodes": num_nodes, "layers": layers}
+
+    # Scheduling overhead alone: every task completes immediately
+    instant = generate_dag(num_nodes, layers)
+    for task in instant:
+        task.duration = 0.0
+    start = time.perf_counter()
+    TaskGraph(instant)
+    results["graph_build_seconds"] = time.perf_counter() - start
+    results["overhead_waves_seconds"] = measure(run_waves, instant)
+    results["overhead_event_driven_seconds"] = measure(run_event_driven, instant)
+
+    # Makespan with stragglers: waves hold unrelated downstream tasks back
+    results["makespan_waves_seconds"] = measure(run_waves, generate_dag(num_nodes, layers))
+    results["makespan_event_driven_seconds"] = measure(run_event_driven, generate_dag(num_nodes, layers))
+    results["makespan_speedup"] = results["makespan_waves_seconds"] / results["makespan_event_driven_seconds"]
+    return results
+
+if __name__ == "__main__":
+    print(json.dumps(run_benchmark(), indent=2))
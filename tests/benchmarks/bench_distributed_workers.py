@@ -0,0 +1,129 @@
+"""
+Benchmark: task throughput as worker nodes are added to a shared work queue
+
+Each node is a separate process running a TaskWorker against one work
+queue served by a multiprocessing manager. Every task is published by a
+single coordinator node, so all other nodes only get work by stealing.
+
+Run with: python -m tests.benchmarks.bench_distributed_workers [--work cpu|sleep]
+
+Use --work sleep on machines with fewer cores than the largest node count;
+CPU-bound tasks can only scale up to the number of cores.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from multiprocessing.managers import BaseManager
+
+from aetheriq.core.distributed import InMemoryWorkQueue, TaskMessage, TaskWorker
+
+TASK_SECONDS = 0.02
+
+_queue = None
+
+def _shared_queue() -> InMemoryWorkQueue:
+    global _queue
+    if _queue is None:
+        _queue = InMemoryWorkQueue()
+    return _queue
+
+class QueueManager(BaseManager):
+    pass
+
+QueueManager.register("get_queue", callable=_shared_queue)
+
+def cpu_task(config):
+    deadline = time.process_time() + config["seconds"]
+    total = 0
+    while time.process_time() < deadline:
+        total += 1
+    return total
+
+def sleep_task(config):
+    time.sleep(config["seconds"])
+    return config["seconds"]
+
+def run_node(address, authkey, node_id, ready, stop):
+    manager = QueueManager(address=address, authkey=authkey)
+    manager.connect()
+    queue = manager.get_queue()
+
+    async def main():
+        worker = TaskWorker(
+            queue,
+            {"cpu": cpu_task, "sleep": sleep_task},
+            node_id=node_id,
+            concurrency=1,
+            idle_interval=0.001
+        )
+        await worker.start()
+        ready.set()
+        while not stop.is_set():
+            await asyncio.sleep(0.05)
+        await worker.stop()
+
+    asyncio.run(main())
+
+def measure(manager, nodes: int, tasks: int, work: str) -> float:
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    readies = [ctx.Event() for _ in range(nodes)]
+    processes = [
+        ctx.Process(target=run_node, args=(manager.address, bytes(manager._authkey), f"node-{i + 1}", readies[i], stop))
+        for i in range(nodes)
+    ]
+    for process in processes:
+        process.start()
+    for ready in readies:
+        ready.wait()
+
+    queue = manager.get_queue()
+    start = time.perf_counter()
+    ids = []
+    for i in range(tasks):
+        message = TaskMessage("bench", str(i), work, {"seconds": TASK_SECONDS}, origin="coordinator")
+        queue.publish(message)
+        ids.append(message.id)
+    while len(queue.outcomes(ids)) < tasks:
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+
+    queue.forget(ids)
+    stop.set()
+    for process in processes:
+        process.join()
+    return elapsed
+
+def run_benchmark(tasks: int = 400, node_counts=(1, 2, 4), work: str = "cpu") -> dict:
+    manager = QueueManager(address=("127.0.0.1", 0), authkey=os.urandom(16))
+    manager.start()
+    try:
+        results = {"tasks": tasks, "task_seconds": TASK_SECONDS, "work": work, "cores": os.cpu_count(), "nodes": {}}
+        baseline = None
+        for nodes in node_counts:
+            elapsed = measure(manager, nodes, tasks, work)
+            throughput = tasks / elapsed
+            baseline = baseline or throughput
+            results["nodes"][nodes] = {
+                "seconds": elapsed,
+                "tasks_per_second": throughput,
+                "speedup": throughput / baseline,
+                "efficiency": throughput / baseline / nodes
+            }
+        return results
+    finally:
+        manager.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--work", choices=["cpu", "sleep"], default="cpu")
+    parser.add_argument("--tasks", type=int, default=400)
+    parser.add_argument("--nodes", default="1,2,4")
+    args = parser.parse_args()
+    print(json.dumps(
+        run_benchmark(args.tasks, tuple(int(n) for n in args.nodes.split(",")), args.work),
+        indent=2
+    ))
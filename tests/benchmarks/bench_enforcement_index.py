@@ -0,0 +1,129 @@
+"""
+Benchmark: linear rule scan vs compiled rule index in EnforcementEngine
+
+Run with: python -m tests.benchmarks.bench_enforcement_index
+"""
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+from app.core.enforcement import (
+    AICapability,
+    EnforcementAction,
+    EnforcementContext,
+    EnforcementEngine,
+    EnforcementLevel,
+    EnforcementPolicy,
+    EnforcementRule
+)
+
+CONTENT_TYPES = ["text", "image", "code", "table", "audio"]
+MODELS = [f"model-{i}" for i in range(50)]
+
+def generate_rules(count: int, seed: int = 42) -> List[EnforcementRule]:
+    """Rules spread across tenants, mostly keyed on equality like real policies"""
+    rng = random.Random(seed)
+    actions = [a for a in EnforcementAction if a != EnforcementAction.ALLOW]
+    rules = []
+    for i in range(count):
+        conditions: Dict[str, Any] = {
+            "tenant": f"tenant-{rng.randrange(count // 10 or 1)}",
+            "content_type": {"operator": "equals", "value": rng.choice(CONTENT_TYPES)}
+        }
+        shape = rng.random()
+        if shape < 0.3:
+            conditions["tokens"] = {"operator": "greater_than", "value": rng.randint(100, 10000)}
+        elif shape < 0.5:
+            conditions["model"] = {"operator": "in", "value": rng.sample(MODELS, 5)}
+        elif shape < 0.55:
+            # A few unindexed rules without any equality condition
+            conditions = {"tokens": {"operator": "less_than", "value": rng.randint(10, 100)}}
+        rules.append(EnforcementRule(
+            id=f"rule-{i}",
+            name=f"Rule {i}",
+            description="benchmark rule",
+            capability=rng.choice(list(AICapability)),
+            level=rng.choice(list(EnforcementLevel)),
+            action=rng.choice(actions),
+            conditions=conditions,
+            exceptions=[f"user-{rng.randrange(100)}"] if rng.random() < 0.1 else []
+        ))
+    return rules
+
+def generate_requests(count: int, num_rules: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "tenant": f"tenant-{rng.randrange(num_rules // 10 or 1)}",
+            "content_type": rng.choice(CONTENT_TYPES),
+            "model": rng.choice(MODELS),
+            "tokens": rng.randint(1, 20000)
+        }
+        for _ in range(count)
+    ]
+
+def build_engine(rules: List[EnforcementRule]) -> EnforcementEngine:
+    engine = EnforcementEngine()
+    engine.add_policy(EnforcementPolicy(
+        id="benchmark",
+        name="Benchmark",
+        description="benchmark policy",
+        rules=rules,
+        default_action=EnforcementAction.ALLOW
+    ))
+    return engine
+
+def evaluate_linear(
+    engine: EnforcementEngine,
+    capability: AICapability,
+    context: EnforcementContext,
+    request_data: Dict[str, Any]
+) -> EnforcementAction:
+    """Reference pre-index evaluation: scan all rules, then rescan per level"""
+    applicable_rules = [rule for rule in engine.active_rules.values() if rule.capability == capability]
+    if not applicable_rules:
+        return EnforcementAction.BLOCK
+    for level in EnforcementLevel:
+        for rule in [rule for rule in applicable_rules if rule.level == level]:
+            if engine._matches_conditions(rule, context, request_data):
+                if context.user_id in rule.exceptions:
+                    continue
+                return rule.action
+    return engine.index.default_action
+
+def run_benchmark(num_rules: int = 10000, num_requests: int = 2000) -> dict:
+    engine = build_engine(generate_rules(num_rules))
+    requests = generate_requests(num_requests, num_rules)
+    rng = random.Random(3)
+    calls = [
+        (rng.choice(list(AICapability)), EnforcementContext(f"user-{rng.randrange(100)}", "org"), request)
+        for request in requests
+    ]
+
+    start = time.perf_counter()
+    engine.index
+    compile_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    linear = [evaluate_linear(engine, *call) for call in calls]
+    linear_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [engine.evaluate_request(*call) for call in calls]
+    indexed_seconds = time.perf_counter() - start
+
+    if linear != indexed:
+        raise AssertionError("Compiled index disagrees with the linear scan")
+
+    return {
+        "rules": num_rules,
+        "requests": num_requests,
+        "compile_seconds": compile_seconds,
+        "linear_us_per_request": linear_seconds / num_requests * 1e6,
+        "indexed_us_per_request": indexed_seconds / num_requests * 1e6,
+        "speedup": linear_seconds / indexed_seconds
+    }
+
+if __name__ == "__main__":
+    print(json.dumps(run_benchmark(), indent=2))
@@ -0,0 +1,44 @@
+"""
+Shared fixtures for workflow engine tests
+"""
+
+import pytest
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from aetheriq.db.models import Base, Workflow as WorkflowModel, WorkflowTask as WorkflowTaskModel
+
+@pytest.fixture
+def workflow_engine(monkeypatch, tmp_path):
+    """Workflow engine backed by an in-memory copy of the aetheriq.db.models tables"""
+    from aetheriq.core import workflow as workflow_module
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(workflow_module, "SessionLocal", factory)
+    workflow_engine = workflow_module.WorkflowEngine({"state_log_dir": str(tmp_path / "state")})
+    workflow_engine.session_factory = factory
+    yield workflow_engine
+    workflow_engine.executor_pools.shutdown(wait=False)
+
+@pytest.fixture
+def add_workflow(workflow_engine):
+    """Store a pending workflow whose tasks are (name, dependencies) pairs run by the "echo" handler"""
+    def add(tasks):
+        workflow_id = uuid.uuid4()
+        with workflow_engine.session_factory() as db:
+            db.add(WorkflowModel(id=workflow_id, name="wf", template_id="t"))
+            for name, dependencies in tasks:
+                db.add(WorkflowTaskModel(
+                    workflow_id=workflow_id,
+                    name=name,
+                    task_type="echo",
+                    parameters={"config": {"name": name}, "dependencies": dependencies}
+                ))
+            db.commit()
+        return workflow_id
+    return add
@@ -0,0 +1,84 @@
+"""
+Tests for tenant-fair workflow admission
+"""
+
+import pytest
+import asyncio
+
+from aetheriq.core.admission import AdmissionEntry, AdmissionQueue
+
+def drain(queue: AdmissionQueue, count: int):
+    admitted = []
+    for _ in range(count):
+        entry = queue._pick()
+        if entry is None:
+            break
+        admitted.append(entry)
+    return admitted
+
+def test_noisy_tenant_does_not_monopolize_slots():
+    queue = AdmissionQueue(max_concurrency=4)
+    for i in range(100):
+        queue.submit(AdmissionEntry(f"noisy-{i}", "noisy"))
+    queue.submit(AdmissionEntry("quiet-0", "quiet"))
+    queue.submit(AdmissionEntry("quiet-1", "quiet"))
+
+    admitted = [entry.tenant for entry in drain(queue, 4)]
+    assert admitted.count("quiet") == 2
+    assert len(queue) == 98
+
+def test_weights_split_slots_proportionally():
+    queue = AdmissionQueue(max_concurrency=30, tenant_weights={"gold": 2.0})
+    for i in range(50):
+        queue.submit(AdmissionEntry(f"gold-{i}", "gold"))
+        queue.submit(AdmissionEntry(f"basic-{i}", "basic"))
+
+    admitted = [entry.tenant for entry in drain(queue, 30)]
+    assert admitted.count("gold") == 20
+    assert admitted.count("basic") == 10
+
+def test_priority_order_within_tenant():
+    queue = AdmissionQueue(max_concurrency=3)
+    queue.submit(AdmissionEntry("low", "t", priority=0))
+    queue.submit(AdmissionEntry("high", "t", priority=5))
+    queue.submit(AdmissionEntry("low-2", "t", priority=0))
+
+    assert [entry.workflow_id for entry in drain(queue, 3)] == ["high", "low", "low-2"]
+
+def test_tenant_cap_and_release():
+    queue = AdmissionQueue(max_concurrency=10, tenant_max_concurrency=2, tenant_limits={"big": 3})
+    for i in range(5):
+        queue.submit(AdmissionEntry(f"a-{i}", "a"))
+        queue.submit(AdmissionEntry(f"big-{i}", "big"))
+
+    admitted = [entry.tenant for entry in drain(queue, 10)]
+    assert admitted.count("a") == 2
+    assert admitted.count("big") == 3
+
+    queue.release("a")
+    assert queue._pick().tenant == "a"
+    assert queue.stats()["running"] == 5
+
+def test_duplicates_and_discard():
+    queue = AdmissionQueue(max_concurrency=1)
+    assert queue.submit(AdmissionEntry("wf", "t"))
+    assert not queue.submit(AdmissionEntry("wf", "t"))
+    assert "wf" in queue
+    assert queue.discard("wf")
+    assert len(queue) == 0
+    assert queue._pick() is None
+
+@pytest.mark.asyncio
+async def test_queued_work_waits_for_a_slot():
+    queue = AdmissionQueue(max_concurrency=1)
+    queue.submit(AdmissionEntry("first", "t"))
+    queue.submit(AdmissionEntry("second", "t"))
+
+    first = await queue.next()
+    waiter = asyncio.ensure_future(queue.next())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    queue.release(first.tenant)
+    second = await asyncio.wait_for(waiter, timeout=1)
+    assert second.workflow_id == "second"
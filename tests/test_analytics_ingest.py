@@ -0,0 +1,58 @@
+"""
+Tests for the bulk analytics ingest path
+"""
+
+import csv
+import json
+import pytest
+from datetime import datetime
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from aetheriq.core.ingest import BulkIngestor
+from aetheriq.db.models import Analytics as AnalyticsModel
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    AnalyticsModel.__table__.create(engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+def rows(count):
+    return [
+        {"metric_name": "system_metrics", "metric_value": {"cpu_usage": i}, "timestamp": datetime(2026, 1, 1, 0, 0, i % 60)}
+        for i in range(count)
+    ]
+
+def test_multi_row_insert_returns_ids_in_order(db):
+    ingestor = BulkIngestor(AnalyticsModel, method="auto", chunk_size=100)
+    ids = ingestor.ingest(db, rows(250))
+    db.commit()
+
+    assert len(ids) == len(set(ids)) == 250
+    assert db.scalar(select(func.count()).select_from(AnalyticsModel)) == 250
+    stored = db.scalars(select(AnalyticsModel).where(AnalyticsModel.id == ids[42])).one()
+    assert stored.metric_value == {"cpu_usage": 42}
+
+def test_rows_roll_back_with_the_session(db):
+    BulkIngestor(AnalyticsModel, method="insert").ingest(db, rows(10))
+    db.rollback()
+    assert db.scalar(select(func.count()).select_from(AnalyticsModel)) == 0
+
+def test_copy_payload_encodes_json_and_nulls():
+    ingestor = BulkIngestor(AnalyticsModel, method="copy")
+    row = {"id": "a", "metric_name": "x,y", "metric_value": {"note": "say \"hi\""}, "timestamp": datetime(2026, 1, 1), "workflow_id": None}
+    payload = ingestor.encode_csv([row], ["id", "metric_name", "metric_value", "timestamp", "workflow_id"])
+
+    text = payload.getvalue()
+    assert text.rstrip().endswith(",\\N")
+    fields = next(csv.reader(payload))
+    assert fields[1] == "x,y"
+    assert json.loads(fields[2]) == {"note": "say \"hi\""}
+    assert fields[3] == "2026-01-01T00:00:00"
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        BulkIngestor(AnalyticsModel, method="bulk")
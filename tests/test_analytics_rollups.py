@@ -0,0 +1,109 @@
+"""
+Tests for pre-aggregated analytics rollups
+"""
+
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from aetheriq.core.rollups import RollupStore, cover
+from aetheriq.db.models import AnalyticsRollup
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    AnalyticsRollup.__table__.create(engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+def item(ts, **values):
+    return {"type": "system_metrics", "timestamp": ts, "data": {"raw_data": values, "data_type": "system_metrics", **values}}
+
+def test_cover_uses_coarsest_buckets_that_fit():
+    start, end = datetime(2026, 1, 1, 22, 30), datetime(2026, 1, 4, 1, 15)
+    segments = cover(start, end)
+    assert segments == [
+        ("minute", datetime(2026, 1, 1, 22, 30), datetime(2026, 1, 1, 23)),
+        ("hour", datetime(2026, 1, 1, 23), datetime(2026, 1, 2)),
+        ("day", datetime(2026, 1, 2), datetime(2026, 1, 4)),
+        ("hour", datetime(2026, 1, 4), datetime(2026, 1, 4, 1)),
+        ("minute", datetime(2026, 1, 4, 1), datetime(2026, 1, 4, 1, 15))
+    ]
+
+def test_batches_merge_into_existing_buckets(db):
+    store = RollupStore(AnalyticsRollup)
+    base = datetime(2026, 1, 1, 12, 0, 10)
+    store.apply(db, [item(base, cpu_usage=10), item(base + timedelta(seconds=5), cpu_usage=30)])
+    store.apply(db, [item(base + timedelta(seconds=20), cpu_usage=20, status="ok")])
+    db.commit()
+
+    row = db.get(AnalyticsRollup, ("minute", datetime(2026, 1, 1, 12), "system_metrics", "cpu_usage"))
+    assert (row.count, row.sum, row.min, row.max) == (3, 60, 10, 30)
+    assert db.scalar(select(func.count()).select_from(AnalyticsRollup)) == 6
+
+def test_std_survives_large_values_with_small_spread(db):
+    store = RollupStore(AnalyticsRollup)
+    start = datetime(2026, 1, 1)
+    values = [1e9 + (i * 7919) % 13 for i in range(3 * 60)]
+    # Several batches per bucket so the stored moments go through the upsert merge
+    for offset in range(0, len(values), 17):
+        store.apply(db, [item(start + timedelta(minutes=i), bytes_sent=values[i]) for i in range(offset, min(offset + 17, len(values)))])
+    db.commit()
+
+    field = store.report(db, start, start + timedelta(hours=3))["metrics"]["system_metrics"]["fields"]["bytes_sent"]
+    assert field["mean"] == pytest.approx(np.mean(values), abs=1e-6)
+    assert field["std"] == pytest.approx(np.std(values, ddof=1), rel=1e-6)
+
+def test_report_over_long_range_is_not_truncated(db):
+    store = RollupStore(AnalyticsRollup)
+    start = datetime(2026, 1, 1)
+    # 20 days of one event per minute, far more than any batch_size limit
+    items = [item(start + timedelta(minutes=i), cpu_usage=i % 100) for i in range(20 * 24 * 60)]
+    store.apply(db, items)
+    db.commit()
+
+    report = store.report(db, start, start + timedelta(days=20))
+    metric = report["metrics"]["system_metrics"]
+    assert metric["events"] == len(items)
+    cpu = metric["fields"]["cpu_usage"]
+    assert cpu["count"] == len(items)
+    assert cpu["mean"] == pytest.approx(sum(i % 100 for i in range(len(items))) / len(items))
+    assert (cpu["min"], cpu["max"]) == (0, 99)
+    assert cpu["p50"] == pytest.approx(49.5, abs=1.5)
+    assert cpu["p99"] == pytest.approx(98, abs=1.5)
+    assert len(report["trends"]["daily"]["system_metrics.cpu_usage"]) == 20
+
+    # Whole days are read from day buckets only
+    assert len(store.buckets(db, start, start + timedelta(days=20))) == 20 * 2
+
+    partial = store.report(db, start + timedelta(minutes=30), start + timedelta(hours=2))
+    assert partial["metrics"]["system_metrics"]["events"] == 90
+
+def test_cover_widens_edges_past_retention_to_coarser_buckets():
+    horizons = {"minute": datetime(2026, 9, 9), "hour": datetime(2026, 9, 16)}
+    assert cover(datetime(2026, 9, 1, 10, 30), datetime(2026, 9, 3), horizons=horizons) == [
+        ("day", datetime(2026, 9, 1), datetime(2026, 9, 3))
+    ]
+
+    # Hours are still kept, minutes are not
+    horizons = {"minute": datetime(2026, 9, 3), "hour": datetime(2026, 8, 11)}
+    assert cover(datetime(2026, 9, 1, 10, 30), datetime(2026, 9, 3), horizons=horizons) == [
+        ("hour", datetime(2026, 9, 1, 10), datetime(2026, 9, 2)),
+        ("day", datetime(2026, 9, 2), datetime(2026, 9, 3))
+    ]
+
+def test_report_of_expired_fine_buckets_reads_coarser_ones(db):
+    store = RollupStore(AnalyticsRollup, retention_days={"minute": 7, "hour": 30, "day": 90})
+    day = datetime.combine((datetime.utcnow() - timedelta(days=40)).date(), datetime.min.time())
+    store.apply(db, [item(day + timedelta(hours=10, minutes=45), cpu_usage=5)])
+    # What retention leaves of a 40 day old range
+    db.query(AnalyticsRollup).filter(AnalyticsRollup.resolution != "day").delete()
+    db.commit()
+
+    report = store.report(db, day + timedelta(hours=10, minutes=30), day + timedelta(days=2))
+
+    assert report["metrics"]["system_metrics"]["events"] == 1
+    assert report["period"]["start"] == day.isoformat()
@@ -0,0 +1,63 @@
+"""
+Tests for compiled streaming automation pipelines
+"""
+
+import pytest
+
+from aetheriq.core.automation import AutomationEngine
+from aetheriq.core.pipeline import batch_stage
+
+STEPS = [
+    {"type": "ai_analysis"},
+    {"type": "data_transformation", "filter": {"active": True}, "mapping": {"amount": "total"}, "fields": ["id", "total"]},
+    {"type": "system_integration"}
+]
+
+@pytest.mark.asyncio
+async def test_steps_compiled_once_at_creation():
+    engine = AutomationEngine({})
+    workflow_id = await engine.create_workflow({"steps": STEPS + [{"type": "unknown"}]})
+    assert len(engine.active_workflows[workflow_id]["pipeline"]) == 3
+
+@pytest.mark.asyncio
+async def test_record_list_is_transformed_and_collected():
+    engine = AutomationEngine({"batch_size": 2})
+    workflow_id = await engine.create_workflow({"steps": STEPS})
+    records = [{"id": i, "amount": i, "active": i % 2 == 0} for i in range(5)]
+
+    result = await engine.execute_workflow(workflow_id, {"records": records, "source": "crm"})
+
+    assert result["source"] == "crm"
+    assert result["records"] == [{"id": 0, "total": 0}, {"id": 2, "total": 2}, {"id": 4, "total": 4}]
+    assert result["records_processed"] == 3
+
+@pytest.mark.asyncio
+async def test_generators_stream_in_bounded_batches():
+    engine = AutomationEngine({"batch_size": 100})
+    largest = 0
+
+    def track(batch):
+        nonlocal largest
+        largest = max(largest, len(batch))
+        return batch
+
+    engine.register_step("track", lambda step: batch_stage(track))
+    workflow_id = await engine.create_workflow({"steps": [{"type": "track"}]})
+
+    records = ({"id": i} for i in range(10_000))
+    result = await engine.execute_workflow(workflow_id, {"records": records})
+    assert result == {"records_processed": 10_000}
+    assert largest == 100
+
+    total = 0
+    async for batch in engine.stream_workflow(workflow_id, ({"id": i} for i in range(250))):
+        total += len(batch)
+    assert total == 250
+
+@pytest.mark.asyncio
+async def test_input_without_records_is_a_single_record():
+    engine = AutomationEngine({})
+    workflow_id = await engine.create_workflow({
+        "steps": [{"type": "data_transformation", "defaults": {"region": "eu"}}]
+    })
+    assert await engine.execute_workflow(workflow_id, {"id": 1}) == {"region": "eu", "id": 1}
@@ -0,0 +1,133 @@
+"""
+Tests for the bounded automation workflow registry and rolling statistics
+"""
+
+import pytest
+
+from aetheriq.core.automation import AutomationEngine
+from aetheriq.core.registry import FileWorkflowStore, WorkflowRegistry
+from aetheriq.core.rolling import RollingStats
+
+STEPS = [{"type": "data_transformation", "defaults": {"region": "eu"}}]
+
+@pytest.mark.asyncio
+async def test_workflow_ids_do_not_collide():
+    engine = AutomationEngine({})
+    ids = {await engine.create_workflow({"steps": STEPS}) for _ in range(500)}
+    assert len(ids) == 500
+
+@pytest.mark.asyncio
+async def test_finished_workflows_are_evicted_and_reloaded(tmp_path):
+    engine = AutomationEngine({"max_workflows": 4, "registry_shards": 1, "workflow_store_dir": str(tmp_path)})
+    first = await engine.create_workflow({"steps": STEPS})
+    await engine.execute_workflow(first, {"id": 1})
+    for _ in range(10):
+        await engine.create_workflow({"steps": STEPS})
+
+    # Only the finished workflow may leave memory; the others have not run yet
+    assert engine.active_workflows.evictions == 1
+    assert first not in set(engine.active_workflows.ids())
+
+    # Evicted workflows come back from storage with a recompiled pipeline
+    assert await engine.execute_workflow(first, {"id": 2}) == {"region": "eu", "id": 2}
+    assert engine.get_workflow_status(first)["stats"]["runs"] == 2
+
+@pytest.mark.asyncio
+async def test_workflows_that_never_ran_stay_executable(tmp_path):
+    engine = AutomationEngine({"max_workflows": 4, "registry_shards": 1, "workflow_store_dir": str(tmp_path)})
+    first = await engine.create_workflow({"steps": STEPS})
+    for _ in range(10):
+        await engine.create_workflow({"steps": STEPS})
+
+    assert await engine.execute_workflow(first, {"id": 1}) == {"region": "eu", "id": 1}
+
+def test_unfinished_workflows_are_never_evicted(tmp_path):
+    registry = WorkflowRegistry(max_entries=2, shards=1, store=FileWorkflowStore(str(tmp_path)))
+    registry["a"] = {"status": "running"}
+    registry["b"] = {"status": "created"}
+    registry["c"] = {"status": "completed"}
+    registry["d"] = {"status": "failed"}
+    # The entry just written stays for its caller even though it is finished
+    assert sorted(registry.ids()) == ["a", "b", "d"]
+    assert registry.evictions == 1
+    assert registry.get("c") == {"status": "completed"}
+    assert "d" not in set(registry.ids())
+
+@pytest.mark.asyncio
+async def test_engine_evicts_to_the_default_store(tmp_path, monkeypatch):
+    monkeypatch.setattr("aetheriq.core.automation.DEFAULT_WORKFLOW_STORE_DIR", str(tmp_path / "workflows"))
+    # Configured like main.py, without a workflow_store_dir
+    engine = AutomationEngine({"max_workflows": 2, "registry_shards": 1})
+    first = await engine.create_workflow({"steps": STEPS})
+    await engine.execute_workflow(first, {"id": 1})
+    for _ in range(3):
+        await engine.create_workflow({"steps": STEPS})
+
+    assert engine.active_workflows.evictions == 1
+    assert (tmp_path / "workflows" / f"{first}.json").exists()
+
+def test_eviction_scan_is_bounded_when_everything_is_pinned(tmp_path):
+    pinned_checks = []
+
+    def pinned(workflow):
+        pinned_checks.append(workflow)
+        return workflow["status"] == "created"
+
+    registry = WorkflowRegistry(max_entries=100, shards=1, store=FileWorkflowStore(str(tmp_path)), pinned=pinned, scan_limit=4)
+    for i in range(200):
+        registry[str(i)] = {"status": "created"}
+    assert len(pinned_checks) <= 4 * 200
+
+    # Finished workflows are still found once the scan reaches them
+    registry["done"] = {"status": "completed"}
+    for i in range(200, 260):
+        registry[str(i)] = {"status": "created"}
+    assert registry.evictions == 1
+
+def test_nothing_is_evicted_without_a_store():
+    registry = WorkflowRegistry(max_entries=2, shards=1)
+    for workflow_id in "abcd":
+        registry[workflow_id] = {"status": "completed"}
+    assert sorted(registry.ids()) == ["a", "b", "c", "d"]
+    assert registry.evictions == 0
+
+def test_rolling_stats_slide_out_of_the_window():
+    stats = RollingStats(window_seconds=60, buckets=6)
+    for i in range(9):
+        stats.record(0.02, success=i % 3 != 0, now=0)
+    stats.record(2.0, success=True, now=30)
+
+    summary = stats.summary(now=30)
+    assert summary["executions"] == 10
+    assert summary["success_rate"] == pytest.approx(70.0)
+    assert summary["p50_latency"] == 0.025
+    assert summary["p99_latency"] == 2.5
+
+    # The first bucket has left the window, only the slow run remains
+    later = stats.summary(now=65)
+    assert later["executions"] == 1
+    assert later["success_rate"] == 100.0
+
+@pytest.mark.asyncio
+async def test_engine_tracks_failures_and_average_time():
+    engine = AutomationEngine({})
+
+    async def broken(batches):
+        async for batch in batches:
+            raise RuntimeError("boom")
+            yield batch
+
+    engine.register_step("broken", lambda step: broken)
+    good = await engine.create_workflow({"steps": STEPS})
+    bad = await engine.create_workflow({"steps": [{"type": "broken"}]})
+
+    await engine.execute_workflow(good, {"id": 1})
+    with pytest.raises(RuntimeError):
+        await engine.execute_workflow(bad, {"id": 1})
+
+    stats = engine.get_automation_stats()
+    assert stats["total_tasks"] == 2
+    assert stats["failed_tasks"] == 1
+    assert stats["average_processing_time"] > 0
+    assert stats["window"]["success_rate"] == pytest.approx(50.0)
+    assert engine.get_workflow_status(bad)["stats"]["success_rate"] == 0.0
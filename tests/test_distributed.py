@@ -0,0 +1,91 @@
+"""
+Tests for distributed task execution through the work queue
+"""
+
+import pytest
+import asyncio
+import time
+
+from aetheriq.core.distributed import (
+    InMemoryWorkQueue, RemoteTaskRunner, TaskMessage, TaskOutcome, TaskWorker
+)
+
+def message(origin: str, task_id: str = "t") -> TaskMessage:
+    return TaskMessage("wf", task_id, "echo", {"value": task_id}, origin=origin)
+
+def test_own_work_first_then_steal_from_the_busiest_tail():
+    queue = InMemoryWorkQueue()
+    for i in range(3):
+        queue.publish(message("a", f"a{i}"))
+    queue.publish(message("b", "b0"))
+
+    assert queue.claim("a", "wa", 30).task_id == "a0"
+    # Node c has nothing of its own and steals the newest task of the longest backlog
+    assert queue.claim("c", "wc", 30).task_id == "a2"
+    assert queue.claim("b", "wb", 30).task_id == "b0"
+    assert queue.depth() == 1
+
+def test_expired_lease_is_reclaimed_and_old_worker_loses_it():
+    queue = InMemoryWorkQueue()
+    queue.publish(message("a"))
+    first = queue.claim("a", "w1", lease_seconds=0.01)
+    time.sleep(0.02)
+
+    second = queue.claim("b", "w2", lease_seconds=30)
+    assert second.id == first.id
+    assert second.attempts == 2
+    assert queue.heartbeat("w1", [first.id], 30) == {first.id}
+    assert not queue.complete("w1", TaskOutcome(first.id, True, "late"))
+    assert queue.complete("w2", TaskOutcome(first.id, True, "ok"))
+    assert queue.outcomes([first.id])[first.id].result == "ok"
+
+def test_message_fails_after_max_attempts():
+    queue = InMemoryWorkQueue(max_attempts=1)
+    queue.publish(message("a"))
+    claimed = queue.claim("a", "w1", lease_seconds=0)
+    assert queue.claim("a", "w2", 30) is None
+    outcome = queue.outcomes([claimed.id])[claimed.id]
+    assert not outcome.ok
+
+@pytest.mark.asyncio
+async def test_tasks_run_on_remote_workers():
+    queue = InMemoryWorkQueue()
+    handled_by = {}
+
+    def make_handler(node):
+        async def handler(config):
+            await asyncio.sleep(0.01)
+            handled_by[config["value"]] = node
+            return config["value"] * 2
+        return handler
+
+    workers = [
+        TaskWorker(queue, {"double": make_handler(node)}, node_id=node, concurrency=2, idle_interval=0.005)
+        for node in ("node-1", "node-2")
+    ]
+    for worker in workers:
+        await worker.start()
+    runner = RemoteTaskRunner(queue, "coordinator", poll_interval=0.005)
+    try:
+        results = await asyncio.gather(*[
+            runner.run("wf", i, "double", {"value": i}) for i in range(20)
+        ])
+    finally:
+        for worker in workers:
+            await worker.stop()
+
+    assert results == [i * 2 for i in range(20)]
+    # Both idle nodes stole work from the coordinator's backlog
+    assert set(handled_by.values()) == {"node-1", "node-2"}
+    assert queue.depth() == 0
+
+@pytest.mark.asyncio
+async def test_remote_failure_raises():
+    queue = InMemoryWorkQueue()
+    worker = TaskWorker(queue, {}, node_id="n", idle_interval=0.005)
+    await worker.start()
+    try:
+        with pytest.raises(RuntimeError):
+            await RemoteTaskRunner(queue, "c", poll_interval=0.005).run("wf", "t", "missing", {})
+    finally:
+        await worker.stop()
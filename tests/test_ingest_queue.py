@@ -0,0 +1,125 @@
+"""
+Tests for the bounded ingest queue and its overflow policies
+"""
+
+import asyncio
+import json
+import pytest
+from datetime import datetime
+
+from aetheriq.core.backpressure import BoundedIngestQueue, QueueFullError
+
+def item(i):
+    return {"data": {"n": i}, "type": "system_metrics", "timestamp": datetime.utcnow()}
+
+def test_reject_policy_raises_when_full():
+    queue = BoundedIngestQueue("t-reject", maxsize=3)
+    for i in range(3):
+        assert queue.put(item(i)) == "queued"
+    with pytest.raises(QueueFullError) as excinfo:
+        queue.put(item(3))
+    assert excinfo.value.retry_after == 1.0
+    assert queue.stats()["items"] == {"queued": 3, "rejected": 1}
+
+@pytest.mark.asyncio
+async def test_spilled_items_are_drained_after_memory(tmp_path):
+    path = tmp_path / "spill.jsonl"
+    queue = BoundedIngestQueue("t-spill", maxsize=2, overflow="spill", spill_path=str(path))
+    outcomes = [queue.put(item(i)) for i in range(5)]
+    assert outcomes == ["queued", "queued", "spilled", "spilled", "spilled"]
+    assert queue.qsize() == 5
+
+    batch = await queue.get_batch(4, timeout=0.1)
+    assert [entry["data"]["n"] for entry in batch] == [0, 1, 2, 3]
+    assert isinstance(batch[-1]["timestamp"], datetime)
+
+    # Until the batch is stored, a restart would replay its spilled items
+    restarted = BoundedIngestQueue("t-spill", maxsize=2, overflow="spill", spill_path=str(path))
+    assert restarted.qsize() == 3
+    queue.ack(batch)
+    restarted = BoundedIngestQueue("t-spill", maxsize=2, overflow="spill", spill_path=str(path))
+    assert restarted.qsize() == 1
+
+    batch = await queue.get_batch(4, timeout=0.1)
+    assert [entry["data"]["n"] for entry in batch] == [4]
+    assert path.exists()
+    queue.ack(batch)
+    assert not path.exists()
+
+def test_sample_policy_sheds_load_above_watermark():
+    draws = iter([0.05, 0.5, 0.05, 0.5])
+    queue = BoundedIngestQueue("t-sample", maxsize=4, overflow="sample", sample_rate=0.1, sample_watermark=0.5, rng=lambda: next(draws))
+    outcomes = [queue.put(item(i)) for i in range(6)]
+    assert outcomes == ["queued", "queued", "queued", "sampled_out", "queued", "dropped"]
+
+@pytest.mark.asyncio
+async def test_parallel_consumers_share_the_queue():
+    queue = BoundedIngestQueue("t-consumers", maxsize=1000)
+    taken = []
+
+    async def consumer():
+        while True:
+            batch = await queue.get_batch(10, timeout=0.05)
+            if not batch:
+                return
+            taken.extend(entry["data"]["n"] for entry in batch)
+            await asyncio.sleep(0)
+
+    for i in range(200):
+        queue.put(item(i))
+    await asyncio.gather(*(consumer() for _ in range(4)))
+    assert sorted(taken) == list(range(200))
+    assert queue.qsize() == 0
+
+@pytest.mark.asyncio
+async def test_linger_collects_items_arriving_shortly_after():
+    queue = BoundedIngestQueue("t-linger", maxsize=100)
+
+    async def produce():
+        for i in range(5):
+            queue.put(item(i))
+            await asyncio.sleep(0.01)
+
+    producer = asyncio.create_task(produce())
+    batch = await queue.get_batch(50, timeout=1, linger=0.2)
+    await producer
+    assert len(batch) == 5
+
+@pytest.mark.asyncio
+async def test_items_that_keep_failing_are_dead_lettered(tmp_path):
+    queue = BoundedIngestQueue("t-dead", maxsize=10, overflow="spill", spill_path=str(tmp_path / "spill.jsonl"), max_attempts=3)
+    queue.put(item(0))
+
+    for attempt in range(3):
+        batch = await queue.get_batch(10, timeout=0.1)
+        assert [entry["data"]["n"] for entry in batch] == [0]
+        queue.retry(batch)
+
+    # The third failure moves the item out of the queue for good
+    assert queue.qsize() == 0
+    assert await queue.get_batch(10, timeout=0.05) == []
+    assert queue.stats()["items"]["dead_lettered"] == 1
+    with open(queue.dead_letter_path) as f:
+        dead = [json.loads(line) for line in f]
+    assert dead[0]["attempts"] == 3 and dead[0]["data"] == {"n": 0}
+
+@pytest.mark.asyncio
+async def test_out_of_order_acks_and_torn_lines(tmp_path):
+    path = tmp_path / "spill.jsonl"
+    queue = BoundedIngestQueue("t-ack", maxsize=0, overflow="spill", spill_path=str(path))
+    for i in range(2):
+        queue.put(item(i))
+    with open(path, "a") as f:
+        f.write('{"data": {"n": 9}, "ty')
+    queue._spill_pending += 1
+
+    first = await queue.get_batch(1, timeout=0.1)
+    rest = await queue.get_batch(5, timeout=0.1)
+    # The torn line is skipped without losing the item read with it
+    assert [entry["data"]["n"] for entry in first + rest] == [0, 1]
+
+    queue.ack(rest)
+    # The first batch is not stored yet, so a restart replays everything
+    assert BoundedIngestQueue("t-ack", maxsize=0, overflow="spill", spill_path=str(path)).qsize() == 3
+    queue.ack(first)
+    assert not path.exists()
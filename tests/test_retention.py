@@ -0,0 +1,117 @@
+"""
+Tests for partition-based retention
+"""
+
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from aetheriq.core.retention import (
+    RetentionManager, RetentionPolicy, next_partition_start, parse_partition, partition_name, partition_start
+)
+from aetheriq.db.models import Analytics as AnalyticsModel, AnalyticsRollup
+
+def test_partition_names_round_trip():
+    start = partition_start(datetime(2026, 12, 31, 17, 5), "month")
+    assert start == datetime(2026, 12, 1)
+    assert next_partition_start(start, "month") == datetime(2027, 1, 1)
+    assert partition_name("audit_logs", start, "month") == "audit_logs_p202612"
+    assert parse_partition("audit_logs", "audit_logs_p202612", "month") == (datetime(2026, 12, 1), datetime(2027, 1, 1))
+
+    day = partition_start(datetime(2026, 2, 28, 23, 59), "day")
+    assert partition_name("analytics", day, "day") == "analytics_p20260228"
+    assert parse_partition("analytics", "analytics_p20260228", "day")[1] == datetime(2026, 3, 1)
+
+def test_parse_partition_ignores_other_children():
+    assert parse_partition("analytics", "analytics_default", "day") is None
+    assert parse_partition("analytics", "audit_logs_p202601", "month") is None
+
+def test_rejects_unknown_mode_and_interval():
+    with pytest.raises(ValueError):
+        RetentionManager(lambda: None, [], mode="truncate")
+    with pytest.raises(ValueError):
+        RetentionManager(lambda: None, [RetentionPolicy("analytics", "timestamp", 30, interval="week")])
+
+def test_unpartitioned_table_falls_back_to_set_based_delete():
+    engine = create_engine("sqlite://")
+    AnalyticsModel.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        for day in (1, 10, 20):
+            db.add(AnalyticsModel(metric_name="m", metric_value={"v": day}, timestamp=datetime(2026, 1, day)))
+        db.commit()
+
+    manager = RetentionManager(factory, [RetentionPolicy("analytics", "timestamp", 15, interval="day")])
+    report = manager.run_once(now=datetime(2026, 1, 26))
+
+    assert report["analytics"]["rows_deleted"] == 2
+    assert report["analytics"]["partitions"] == [] and report["analytics"]["created"] == []
+    with factory() as db:
+        assert db.scalar(select(func.count()).select_from(AnalyticsModel)) == 1
+
+def test_filtered_policies_expire_rows_per_resolution():
+    engine = create_engine("sqlite://")
+    AnalyticsRollup.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        for resolution in ("minute", "hour", "day"):
+            for day in (1, 20):
+                db.add(AnalyticsRollup(
+                    resolution=resolution, bucket_start=datetime(2026, 1, day), metric_name="m", field="v",
+                    count=1, sum=1.0, mean=1.0, m2=0.0, min=1.0, max=1.0
+                ))
+        db.commit()
+
+    manager = RetentionManager(factory, [
+        RetentionPolicy("analytics_rollups", "bucket_start", days, where={"resolution": resolution})
+        for resolution, days in (("minute", 7), ("hour", 30), ("day", 90))
+    ])
+    report = manager.run_once(now=datetime(2026, 1, 26))
+
+    assert report["analytics_rollups[resolution=minute]"]["rows_deleted"] == 1
+    assert report["analytics_rollups[resolution=hour]"]["rows_deleted"] == 0
+    with factory() as db:
+        remaining = db.execute(select(AnalyticsRollup.resolution, AnalyticsRollup.bucket_start)).all()
+    assert sorted(remaining) == [
+        ("day", datetime(2026, 1, 1)), ("day", datetime(2026, 1, 20)),
+        ("hour", datetime(2026, 1, 1)), ("hour", datetime(2026, 1, 20)),
+        ("minute", datetime(2026, 1, 20))
+    ]
+
+def test_expiry_runs_when_partition_creation_fails(monkeypatch):
+    engine = create_engine("sqlite://")
+    AnalyticsModel.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        for day in (1, 20):
+            db.add(AnalyticsModel(metric_name="m", metric_value={"v": day}, timestamp=datetime(2026, 1, day)))
+        db.commit()
+
+    def refuse(policy, db, now):
+        raise RuntimeError("updated partition constraint for default partition would be violated")
+
+    manager = RetentionManager(factory, [RetentionPolicy("analytics", "timestamp", 15, interval="day")])
+    # Partitioned when partitions are ensured, plain when SQLite expires the rows
+    answers = iter([True, False])
+    monkeypatch.setattr(manager, "_is_partitioned", lambda db, table: next(answers))
+    monkeypatch.setattr(manager, "ensure_partitions", refuse)
+    report = manager.run_once(now=datetime(2026, 1, 26))
+
+    assert "default partition" in report["analytics"]["partition_error"]
+    assert report["analytics"]["rows_deleted"] == 1
+
+def test_rows_stranded_in_default_partition_move_to_new_partition():
+    db = MagicMock()
+    statements = []
+    db.execute.side_effect = lambda statement, params=None: statements.append(str(statement)) or MagicMock()
+    manager = RetentionManager(lambda: db, [])
+    policy = RetentionPolicy("analytics", "timestamp", 15, interval="day")
+
+    manager._create_partition(policy, db, "analytics_p20260126", datetime(2026, 1, 26), datetime(2026, 1, 27), "analytics_default")
+
+    assert [statement.split(" ")[0] for statement in statements] == ["SELECT", "ALTER", "CREATE", "WITH", "ALTER"]
+    assert "DETACH PARTITION" in statements[1] and "ATTACH PARTITION" in statements[4]
+    db.commit.assert_called_once()
@@ -0,0 +1,123 @@
+"""
+Tests for write-behind workflow state persistence
+"""
+
+import pytest
+import enum
+import os
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Enum as SQLEnum, String, create_engine, event
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from aetheriq.core.state import StateWriter
+
+Base = declarative_base()
+
+class Status(enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+
+class Item(Base):
+    __tablename__ = "items"
+    id = Column(String, primary_key=True)
+    status = Column(SQLEnum(Status), default=Status.PENDING)
+    error_message = Column(String)
+    completed_at = Column(DateTime)
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add_all([Item(id=str(i)) for i in range(200)])
+        db.commit()
+    factory.engine = engine
+    return factory
+
+def statuses(session_factory):
+    with session_factory() as db:
+        return {item.id: item.status for item in db.query(Item).all()}
+
+def test_transitions_are_coalesced_into_one_transaction(session_factory, tmp_path):
+    commits = []
+    event.listen(session_factory.engine, "commit", lambda conn: commits.append(1))
+    writer = StateWriter(session_factory, {"item": Item}, log_dir=str(tmp_path))
+
+    for i in range(200):
+        writer.record("item", i, status=Status.RUNNING)
+        writer.record("item", i, status=Status.COMPLETED, completed_at=datetime(2024, 1, 1))
+    assert writer.pending() == 200
+
+    assert writer.flush() == 200
+    assert len(commits) == 1
+    assert set(statuses(session_factory).values()) == {Status.COMPLETED}
+    # Flushed segments are removed
+    assert os.listdir(tmp_path) == []
+
+def test_intent_log_replayed_after_crash(session_factory, tmp_path):
+    crashed = StateWriter(session_factory, {"item": Item}, log_dir=str(tmp_path))
+    crashed.record("item", "1", status=Status.RUNNING)
+    crashed.record("item", "1", status=Status.COMPLETED, completed_at=datetime(2024, 1, 1))
+    crashed.record("item", "2", error_message="boom")
+    # Simulate a torn write at the moment of the crash
+    crashed._log.write('{"kind": "item", "id"')
+    crashed._log.flush()
+
+    restarted = StateWriter(session_factory, {"item": Item}, log_dir=str(tmp_path))
+    assert restarted.recover() == 3
+    restarted.flush()
+
+    with session_factory() as db:
+        assert db.get(Item, "1").status == Status.COMPLETED
+        assert db.get(Item, "1").completed_at == datetime(2024, 1, 1)
+        assert db.get(Item, "2").error_message == "boom"
+    assert os.listdir(tmp_path) == []
+
+def test_failed_flush_keeps_transitions(session_factory, tmp_path):
+    writer = StateWriter(session_factory, {"item": Item}, log_dir=str(tmp_path))
+    writer.record("item", "1", status=Status.RUNNING)
+
+    healthy = writer.session_factory
+    def broken():
+        raise RuntimeError("database down")
+    writer.session_factory = broken
+    with pytest.raises(RuntimeError):
+        writer.flush()
+
+    writer.record("item", "1", status=Status.COMPLETED)
+    writer.session_factory = healthy
+    writer.flush()
+    assert statuses(session_factory)["1"] == Status.COMPLETED
+    assert os.listdir(tmp_path) == []
+
+def test_unknown_kind_rejected(session_factory, tmp_path):
+    writer = StateWriter(session_factory, {"item": Item}, log_dir=str(tmp_path))
+    with pytest.raises(ValueError):
+        writer.record("missing", "1", status=Status.RUNNING)
+
+class Note(Base):
+    __tablename__ = "notes"
+    id = Column(String, primary_key=True)
+    body = Column(String)
+    created_at = Column(DateTime)
+
+def test_appended_rows_are_inserted_once(session_factory, tmp_path):
+    writer = StateWriter(session_factory, {"item": Item, "note": Note}, log_dir=str(tmp_path))
+    writer.append("note", {"id": "n1", "body": "done", "created_at": datetime(2024, 1, 1)})
+    writer.record("item", "1", status=Status.COMPLETED)
+    # Keep a copy of the intent log as if the process died right after the commit
+    segment = os.listdir(tmp_path)[0]
+    log = (tmp_path / segment).read_text()
+    assert writer.flush() == 2
+
+    (tmp_path / segment).write_text(log)
+    restarted = StateWriter(session_factory, {"item": Item, "note": Note}, log_dir=str(tmp_path))
+    restarted.recover()
+    restarted.flush()
+
+    with session_factory() as db:
+        notes = db.query(Note).all()
+        assert [(note.id, note.created_at) for note in notes] == [("n1", datetime(2024, 1, 1))]
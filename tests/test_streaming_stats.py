@@ -0,0 +1,60 @@
+"""
+Tests for single-pass streaming statistics and t-digest sketches
+"""
+
+import numpy as np
+import pytest
+
+from aetheriq.core.stats import RunningStats, TDigest
+
+def test_incremental_and_vectorized_updates_match_numpy():
+    rng = np.random.default_rng(1)
+    values = rng.normal(10, 3, size=5000) + np.arange(5000) * 0.01
+
+    stepwise = RunningStats()
+    for value in values[:1000]:
+        stepwise.update(value)
+    stepwise.update_many(values[1000:3000])
+    other = RunningStats()
+    other.update_many(values[3000:], xs=np.arange(3000, 5000))
+    stepwise.merge(other)
+
+    assert stepwise.count == 5000
+    assert stepwise.mean == pytest.approx(values.mean())
+    assert stepwise.std == pytest.approx(values.std(ddof=1))
+    assert (stepwise.min, stepwise.max) == (values.min(), values.max())
+    assert stepwise.slope == pytest.approx(np.polyfit(np.arange(5000), values, 1)[0])
+
+def test_from_moments_merges_like_raw_values():
+    values = np.array([1.0, 4.0, 2.0, 8.0, 5.0])
+    merged = RunningStats.from_moments(2, 2.5, 4.5, 1.0, 4.0)
+    merged.merge(RunningStats.from_moments(3, 5.0, 18.0, 2.0, 8.0))
+    assert merged.mean == pytest.approx(values.mean())
+    assert merged.variance == pytest.approx(values.var(ddof=1))
+
+def test_tdigest_quantiles_and_merge():
+    rng = np.random.default_rng(2)
+    values = rng.lognormal(size=200_000)
+    left, right = TDigest(), TDigest()
+    for chunk in np.array_split(values[:100_000], 50):
+        left.update_many(chunk)
+    right.update_many(values[100_000:])
+    restored = TDigest.from_dict(right.to_dict())
+    left.merge(restored)
+
+    assert left.count == len(values)
+    assert len(left.means) <= 100
+    for q in (0.01, 0.5, 0.9, 0.99):
+        assert left.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.02)
+    assert left.quantile(0) == values.min()
+    assert left.quantile(1) == values.max()
+
+def test_anomaly_count_is_estimated_from_the_digest():
+    rng = np.random.default_rng(3)
+    values = rng.normal(size=100_000)
+    stats, digest = RunningStats(), TDigest()
+    stats.update_many(values)
+    digest.update_many(values)
+
+    exact = np.sum(np.abs(values - values.mean()) > 2 * values.std(ddof=1))
+    assert stats.anomaly_count(digest) == pytest.approx(exact, rel=0.05)
@@ -0,0 +1,80 @@
+"""
+Tests for memoization of idempotent task results
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from aetheriq.core.memo import MISSING, TaskResultCache
+
+def test_key_depends_on_type_config_and_upstream():
+    cache = TaskResultCache()
+    key = cache.key("transform", {"a": 1, "b": [1, 2]}, [{"rows": 10}])
+    assert key == cache.key("transform", {"b": [1, 2], "a": 1}, [{"rows": 10}])
+    assert key != cache.key("transform", {"a": 2, "b": [1, 2]}, [{"rows": 10}])
+    assert key != cache.key("transform", {"a": 1, "b": [1, 2]}, [{"rows": 11}])
+    assert key != cache.key("load", {"a": 1, "b": [1, 2]}, [{"rows": 10}])
+
+def test_key_hashes_array_contents():
+    cache = TaskResultCache()
+    a = np.zeros(10000)
+    b = np.zeros(10000)
+    b[5000] = 1
+    # repr() of both arrays is identical
+    assert repr(a) == repr(b)
+    assert cache.key("t", {}, [a]) != cache.key("t", {}, [b])
+
+def test_key_hashes_frame_contents():
+    cache = TaskResultCache()
+    a = pd.DataFrame({"x": np.zeros(1000), "y": range(1000)})
+    b = a.copy()
+    b.loc[500, "x"] = 1
+    # repr() elides the middle rows of both frames
+    assert repr(a) == repr(b)
+    assert cache.key("t", {}, [a]) != cache.key("t", {}, [b])
+    assert cache.key("t", {}, [a]) == cache.key("t", {}, [a.copy()])
+    assert cache.key("t", {}, [a["x"]]) != cache.key("t", {}, [b["x"]])
+
+def test_inputs_without_canonical_form_are_not_cached():
+    class Opaque:
+        pass
+
+    cache = TaskResultCache()
+    assert cache.key("t", {"handle": Opaque()}, []) is None
+
+def test_results_are_copied():
+    cache = TaskResultCache()
+    result = {"items": [1, 2]}
+    cache.put("k", result)
+    result["items"].append(3)
+
+    cached = cache.get("k")
+    assert cached == {"items": [1, 2]}
+    cached["items"].append(4)
+    assert cache.get("k") == {"items": [1, 2]}
+    assert cache.stats()["hits"] == 2
+
+def test_lru_and_ttl_eviction():
+    cache = TaskResultCache(max_entries=2, ttl=0.05)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+
+    time.sleep(0.06)
+    assert cache.get("a") is MISSING
+    assert len(cache) == 1
+
+def test_disk_persistence_survives_restart_and_is_bounded(tmp_path):
+    cache = TaskResultCache(max_entries=10, path=str(tmp_path))
+    for i in range(25):
+        cache.put(f"k{i}", {"value": i})
+    assert len(list(tmp_path.glob("*.pkl"))) <= 10
+
+    restarted = TaskResultCache(max_entries=10, path=str(tmp_path))
+    assert restarted.get("k24") == {"value": 24}
+    assert restarted.get("k0") is MISSING
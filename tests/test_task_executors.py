@@ -0,0 +1,85 @@
+"""
+Tests for workflow task execution pools
+"""
+
+import pytest
+import asyncio
+import os
+import threading
+
+import numpy as np
+
+from aetheriq.core.executors import TaskExecutionPolicy, TaskExecutorPools
+
+def cpu_task(config):
+    return {"pid": os.getpid(), "total": sum(i * i for i in range(config["n"]))}
+
+def large_array_task(config):
+    return {"values": np.arange(config["n"], dtype=np.float64), "small": np.zeros(4)}
+
+@pytest.fixture
+def pools():
+    pools = TaskExecutorPools(
+        {"process": {"mode": "process", "max_workers": 2}},
+        shared_memory_threshold=1024
+    )
+    yield pools
+    pools.shutdown()
+
+@pytest.mark.asyncio
+async def test_inline_and_thread_modes(pools):
+    async def async_handler(config):
+        return threading.current_thread().name
+
+    def blocking_handler(config):
+        return threading.current_thread().name
+
+    assert await pools.run(async_handler, {}) == threading.current_thread().name
+    name = await pools.run(blocking_handler, {}, TaskExecutionPolicy("thread"))
+    assert name.startswith("task-thread")
+
+@pytest.mark.asyncio
+async def test_process_mode_runs_in_worker(pools):
+    result = await pools.run(cpu_task, {"n": 1000}, TaskExecutionPolicy("process"))
+    assert result["total"] == sum(i * i for i in range(1000))
+    assert result["pid"] != os.getpid()
+
+@pytest.mark.asyncio
+async def test_large_arrays_come_back_through_shared_memory(pools):
+    result = await pools.run(large_array_task, {"n": 100000}, TaskExecutionPolicy("process"))
+    values = result["values"]
+    assert values[-1] == 99999
+    # Views into shared memory rather than owned copies
+    assert not values.flags.owndata
+    assert result["small"].flags.owndata
+
+    segment_name = pools._shared_results[id(result)].segments[0].name
+    del values, result["values"]
+    pools.release(result)
+    assert not os.path.exists(f"/dev/shm/{segment_name}")
+
+@pytest.mark.asyncio
+async def test_unpicklable_config_rejected(pools):
+    with pytest.raises(ValueError):
+        await pools.run(cpu_task, {"n": 1, "lock": threading.Lock()}, TaskExecutionPolicy("process"))
+
+@pytest.mark.asyncio
+async def test_per_pool_concurrency_limit():
+    pools = TaskExecutorPools({"io": {"mode": "inline", "max_concurrency": 2}})
+    running = 0
+    peak = 0
+
+    async def handler(config):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*[pools.run(handler, {}, TaskExecutionPolicy("io")) for _ in range(6)])
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_unknown_pool_rejected(pools):
+    with pytest.raises(ValueError):
+        await pools.run(cpu_task, {"n": 1}, TaskExecutionPolicy("gpu"))
@@ -0,0 +1,93 @@
+"""
+Tests for workflow task dependency scheduling
+"""
+
+import pytest
+import asyncio
+from dataclasses import dataclass, field
+from typing import List
+
+from aetheriq.core.dag import TaskGraph, WorkflowCycleError, run_task_graph
+
+@dataclass
+class Task:
+    id: str
+    name: str
+    dependencies: List[str] = field(default_factory=list)
+
+def test_graph_resolves_names_and_orders_tasks():
+    graph = TaskGraph([
+        Task("3", "report", ["transform"]),
+        Task("1", "extract"),
+        Task("2", "transform", ["1"])
+    ])
+    assert graph.roots == ["1"]
+    assert graph.order == ["1", "2", "3"]
+    assert graph.dependents["2"] == ["3"]
+
+def test_cycle_detected_up_front():
+    with pytest.raises(WorkflowCycleError) as exc_info:
+        TaskGraph([
+            Task("1", "a", ["c"]),
+            Task("2", "b", ["a"]),
+            Task("3", "c", ["b"]),
+            Task("4", "d")
+        ])
+    assert set(exc_info.value.cycle) == {"a", "b", "c"}
+    assert exc_info.value.cycle[0] == exc_info.value.cycle[-1]
+
+def test_unknown_dependency_rejected():
+    with pytest.raises(ValueError):
+        TaskGraph([Task("1", "a", ["missing"])])
+
+@pytest.mark.asyncio
+async def test_dependents_start_without_waiting_for_unrelated_tasks():
+    started = {}
+    loop = asyncio.get_running_loop()
+
+    async def execute(task):
+        started[task.name] = loop.time()
+        await asyncio.sleep(0.2 if task.name == "slow" else 0.01)
+        return task.name
+
+    graph = TaskGraph([
+        Task("1", "slow"),
+        Task("2", "fast"),
+        Task("3", "after_fast", ["fast"]),
+        Task("4", "after_both", ["slow", "after_fast"])
+    ])
+    results = await run_task_graph(graph, execute)
+
+    assert results == {"1": "slow", "2": "fast", "3": "after_fast", "4": "after_both"}
+    # The fast branch continues while the slow task is still running
+    assert started["after_fast"] - started["slow"] < 0.1
+    assert started["after_both"] - started["slow"] >= 0.2
+
+@pytest.mark.asyncio
+async def test_failures_are_returned_and_release_dependents():
+    async def execute(task):
+        if task.name == "bad":
+            raise RuntimeError("boom")
+        return "ok"
+
+    graph = TaskGraph([Task("1", "bad"), Task("2", "next", ["bad"])])
+    results = await run_task_graph(graph, execute)
+
+    assert isinstance(results["1"], RuntimeError)
+    assert results["2"] == "ok"
+
+@pytest.mark.asyncio
+async def test_max_concurrency():
+    running = 0
+    peak = 0
+
+    async def execute(task):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    graph = TaskGraph([Task(str(i), f"t{i}") for i in range(10)])
+    await run_task_graph(graph, execute, max_concurrency=3)
+    assert peak == 3
@@ -0,0 +1,80 @@
+"""
+Tests for workflow dispatch channels
+"""
+
+import pytest
+import asyncio
+import threading
+
+from aetheriq.core.dispatch import LocalDispatcher, PostgresDispatcher, create_dispatcher
+from aetheriq.db.models import Workflow as WorkflowModel, WorkflowStatus
+
+@pytest.mark.asyncio
+async def test_local_dispatch_wakes_consumer_immediately():
+    dispatcher = LocalDispatcher()
+    await dispatcher.start()
+
+    waiter = asyncio.create_task(dispatcher.next_workflow())
+    await asyncio.sleep(0)
+    dispatcher.publish(None, "wf-1")
+
+    assert await asyncio.wait_for(waiter, timeout=1) == "wf-1"
+
+@pytest.mark.asyncio
+async def test_publish_from_worker_thread():
+    dispatcher = LocalDispatcher()
+    await dispatcher.start()
+
+    thread = threading.Thread(target=dispatcher.publish, args=(None, "wf-2"))
+    thread.start()
+    thread.join()
+
+    assert await asyncio.wait_for(dispatcher.next_workflow(), timeout=1) == "wf-2"
+
+@pytest.mark.asyncio
+async def test_publish_before_start_is_dropped():
+    # The reconciliation sweep picks these workflows up
+    dispatcher = LocalDispatcher()
+    dispatcher.publish(None, "wf-3")
+    await dispatcher.start()
+    dispatcher.publish(None, "wf-4")
+
+    assert await asyncio.wait_for(dispatcher.next_workflow(), timeout=1) == "wf-4"
+    assert dispatcher._queue.empty()
+
+def test_create_dispatcher():
+    assert isinstance(create_dispatcher({}), LocalDispatcher)
+    dispatcher = create_dispatcher({"dispatch_backend": "postgres", "database_url": "postgresql://localhost/db"})
+    assert isinstance(dispatcher, PostgresDispatcher)
+    with pytest.raises(ValueError):
+        create_dispatcher({"dispatch_backend": "kafka"})
+    with pytest.raises(ValueError):
+        PostgresDispatcher("postgresql://localhost/db", channel="bad; DROP TABLE")
+
+@pytest.mark.asyncio
+async def test_claimed_workflow_runs_its_tasks(workflow_engine, add_workflow):
+    factory = workflow_engine.session_factory
+    workflow_id = add_workflow([("extract", []), ("load", ["extract"])])
+    ran = []
+    workflow_engine.register_task_handler("echo", lambda config: ran.append(config["name"]) or config, pool="inline")
+
+    workflow = workflow_engine._claim_workflow(workflow_id)
+    assert workflow is not None
+    # A second worker finds nothing to claim
+    assert workflow_engine._claim_workflow(workflow_id) is None
+
+    await workflow_engine._execute_workflow_tasks(workflow)
+
+    assert ran == ["extract", "load"]
+    with factory() as db:
+        assert db.get(WorkflowModel, workflow_id).status == WorkflowStatus.COMPLETED
+        assert {task.status for task in db.get(WorkflowModel, workflow_id).tasks} == {WorkflowStatus.COMPLETED}
+
+def test_pending_workflows_are_offered_for_admission(workflow_engine, add_workflow):
+    workflow_id = add_workflow([("extract", [])])
+
+    entries = workflow_engine._pending_admission_entries([workflow_id])
+
+    assert [entry.workflow_id for entry in entries] == [str(workflow_id)]
+    workflow_engine._claim_workflow(workflow_id)
+    assert workflow_engine._pending_admission_entries([workflow_id]) == []
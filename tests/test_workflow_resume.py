@@ -0,0 +1,65 @@
+"""
+Tests for resuming interrupted workflows from task checkpoints
+"""
+
+import pytest
+import asyncio
+from datetime import datetime, timedelta
+
+from aetheriq.db.models import Workflow as WorkflowModel, WorkflowStatus
+
+def set_heartbeat(factory, workflow_id, updated_at):
+    with factory() as db:
+        db.query(WorkflowModel).filter(WorkflowModel.id == workflow_id).update(
+            {WorkflowModel.updated_at: updated_at}, synchronize_session=False
+        )
+        db.commit()
+
+@pytest.mark.asyncio
+async def test_resumed_workflow_skips_checkpointed_tasks(workflow_engine, add_workflow):
+    factory = workflow_engine.session_factory
+    workflow_id = add_workflow([("extract", []), ("load", ["extract"])])
+    ran = []
+    interrupted = asyncio.Event()
+
+    async def handler(config):
+        ran.append(config["name"])
+        if config["name"] == "load" and not interrupted.is_set():
+            interrupted.set()
+            await asyncio.sleep(60)
+        return {"rows": len(ran)}
+
+    workflow_engine.register_task_handler("echo", handler, pool="inline")
+
+    # The node dies while "load" runs; "extract" is already checkpointed
+    run = asyncio.create_task(workflow_engine._execute_workflow_tasks(workflow_engine._claim_workflow(workflow_id)))
+    await asyncio.wait_for(interrupted.wait(), timeout=5)
+    run.cancel()
+    await asyncio.gather(run, return_exceptions=True)
+
+    set_heartbeat(factory, workflow_id, datetime.utcnow() - timedelta(hours=1))
+    assert workflow_engine._requeue_interrupted_workflows() == 1
+
+    await workflow_engine._execute_workflow_tasks(workflow_engine._claim_workflow(workflow_id))
+
+    assert ran == ["extract", "load", "load"]
+    with factory() as db:
+        assert db.get(WorkflowModel, workflow_id).status == WorkflowStatus.COMPLETED
+
+def test_heartbeat_keeps_long_running_workflow_claimed(workflow_engine, add_workflow):
+    factory = workflow_engine.session_factory
+    workflow_id = add_workflow([("extract", [])])
+    workflow_engine._claim_workflow(workflow_id)
+    with factory() as db:
+        db.get(WorkflowModel, workflow_id).started_at = datetime.utcnow() - timedelta(hours=1)
+        db.commit()
+    set_heartbeat(factory, workflow_id, datetime.utcnow() - timedelta(hours=1))
+
+    # Another node keeps heartbeating: a long task is not a dead node
+    assert workflow_engine._touch_workflows([str(workflow_id)]) == 1
+    assert workflow_engine._requeue_interrupted_workflows() == 0
+
+    set_heartbeat(factory, workflow_id, datetime.utcnow() - timedelta(hours=1))
+    assert workflow_engine._requeue_interrupted_workflows() == 1
+    with factory() as db:
+        assert db.get(WorkflowModel, workflow_id).status == WorkflowStatus.PENDING